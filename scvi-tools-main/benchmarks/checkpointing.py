@@ -0,0 +1,222 @@
+"""Epoch time benchmarks of best-state checkpointing callbacks.
+
+Trains :class:`~scvi.model.SCVI` on synthetic data without checkpointing and with each of
+:class:`~scvi.train.SaveBestState`, :class:`~scvi.train.SaveCheckpoint` and
+:class:`~scvi.train.AsyncCheckpoint`, and reports the mean epoch time and its overhead with
+respect to training without checkpointing as a JSON file. The monitored metric is the training
+ELBO, which improves in most epochs, so that most epochs save a checkpoint.
+
+Examples
+--------
+Run all cases with a large module and write the results::
+
+    python benchmarks/checkpointing.py --n-hidden 1024 --n-layers 3 --output results.json
+
+Write checkpoints to a slow filesystem::
+
+    python benchmarks/checkpointing.py --dirpath /mnt/network/checkpoints
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+
+import lightning.pytorch as pl
+import numpy as np
+import torch
+
+import scvi
+from scvi.model import SCVI
+from scvi.train import AsyncCheckpoint, SaveBestState, SaveCheckpoint
+
+SCHEMA_VERSION = 1
+REFERENCE_CASE = "none"
+MONITOR = "elbo_train"
+
+
+@dataclass
+class BenchmarkConfig:
+    """Scale and repetitions of the benchmark.
+
+    Attributes
+    ----------
+    n_obs
+        Number of generated cells.
+    n_vars
+        Number of generated genes.
+    n_hidden
+        Number of nodes per hidden layer of the model, which sets the size of checkpoints.
+    n_layers
+        Number of hidden layers of the model.
+    batch_size
+        Minibatch size used for training.
+    n_epochs
+        Number of training epochs. The first epoch is excluded from the epoch time.
+    callbacks
+        Checkpointing callbacks to benchmark, ``"none"`` for training without checkpointing.
+    dirpath
+        Directory to write checkpoints into. Defaults to a temporary directory.
+    seed
+        Seed of the data and of the initialization of the models.
+    """
+
+    n_obs: int = 2_000
+    n_vars: int = 2_000
+    n_hidden: int = 512
+    n_layers: int = 2
+    batch_size: int = 512
+    n_epochs: int = 10
+    callbacks: list[str] = field(
+        default_factory=lambda: ["none", "SaveBestState", "SaveCheckpoint", "AsyncCheckpoint"]
+    )
+    dirpath: str | None = None
+    seed: int = 0
+
+
+class EpochTimer(pl.Callback):
+    """Record the wall time of every training epoch, including validation and checkpoints."""
+
+    def __init__(self):
+        self.epoch_times = []
+
+    def on_train_epoch_start(self, trainer, pl_module):
+        """Start timing the epoch."""
+        self._start = time.perf_counter()
+
+    def on_train_epoch_end(self, trainer, pl_module):
+        """Record the time of the epoch."""
+        self.epoch_times.append(time.perf_counter() - self._start)
+
+
+def _checkpoint_callback(name: str, dirpath: str) -> pl.Callback | None:
+    if name == "none":
+        return None
+    if name == "SaveBestState":
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return SaveBestState(monitor=MONITOR)
+    if name == "SaveCheckpoint":
+        return SaveCheckpoint(dirpath=dirpath, monitor=MONITOR)
+    if name == "AsyncCheckpoint":
+        return AsyncCheckpoint(dirpath=dirpath, monitor=MONITOR)
+    raise ValueError(f"Unknown checkpointing callback {name}.")
+
+
+def run_case(config: BenchmarkConfig, name: str, dirpath: str) -> dict:
+    """Train one model with a checkpointing callback and measure its epoch time."""
+    scvi.settings.seed = config.seed
+    adata = scvi.data.synthetic_iid(
+        batch_size=config.n_obs // 2, n_genes=config.n_vars, n_batches=2
+    )
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata, n_hidden=config.n_hidden, n_layers=config.n_layers)
+
+    timer = EpochTimer()
+    callbacks = [timer]
+    checkpoint = _checkpoint_callback(name, os.path.join(dirpath, name))
+    if checkpoint is not None:
+        callbacks.append(checkpoint)
+    model.train(
+        max_epochs=config.n_epochs,
+        batch_size=config.batch_size,
+        check_val_every_n_epoch=1,
+        callbacks=callbacks,
+        enable_progress_bar=False,
+    )
+    timed_epochs = timer.epoch_times[1:] or timer.epoch_times
+    return {
+        "name": name,
+        "n_parameters": sum(p.numel() for p in model.module.parameters()),
+        "epoch_seconds": float(np.mean(timed_epochs)),
+        "n_improving_epochs": int(
+            np.sum(np.diff(model.history[MONITOR].to_numpy(dtype=float)[:, 0]) < 0) + 1
+        ),
+    }
+
+
+def run_benchmarks(config: BenchmarkConfig) -> dict:
+    """Run all cases and collect their results with the environment.
+
+    Returns
+    -------
+    Dictionary with the ``environment``, the ``config`` and the list of ``results``. Results
+    report their ``overhead_seconds`` per epoch with respect to training without checkpointing if
+    it is among the cases.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dirpath = config.dirpath or tmp_dir
+        for name in config.callbacks:
+            try:
+                result = run_case(config, name, dirpath)
+            except Exception as e:  # noqa: BLE001
+                result = {"name": name, "error": repr(e)}
+            results.append(result)
+
+    reference = next((r for r in results if r["name"] == REFERENCE_CASE), None)
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']}: {result['error']}", file=sys.stderr)
+            continue
+        if reference is not None and "error" not in reference:
+            result["overhead_seconds"] = result["epoch_seconds"] - reference["epoch_seconds"]
+        print(f"{result['name']}: {result['epoch_seconds']:.3f} s/epoch", file=sys.stderr)
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scvi-tools": scvi.__version__,
+            "torch": torch.__version__,
+            "cuda": torch.cuda.is_available(),
+        },
+        "config": asdict(config),
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    defaults = BenchmarkConfig()
+    parser.add_argument("--n-obs", type=int, default=defaults.n_obs)
+    parser.add_argument("--n-vars", type=int, default=defaults.n_vars)
+    parser.add_argument("--n-hidden", type=int, default=defaults.n_hidden)
+    parser.add_argument("--n-layers", type=int, default=defaults.n_layers)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--n-epochs", type=int, default=defaults.n_epochs)
+    parser.add_argument("--callbacks", nargs="+", default=defaults.callbacks)
+    parser.add_argument("--dirpath", default=None, help="Directory to write checkpoints into.")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", default="checkpointing_benchmarks.json")
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        n_obs=args.n_obs,
+        n_vars=args.n_vars,
+        n_hidden=args.n_hidden,
+        n_layers=args.n_layers,
+        batch_size=args.batch_size,
+        n_epochs=args.n_epochs,
+        callbacks=args.callbacks,
+        dirpath=args.dirpath,
+        seed=args.seed,
+    )
+    results = run_benchmarks(config)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    return 1 if any("error" in result for result in results["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
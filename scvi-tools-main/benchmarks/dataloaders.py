@@ -0,0 +1,374 @@
+"""Throughput benchmarks for :mod:`scvi.data` and :mod:`scvi.dataloaders`.
+
+Measures the number of cells loaded per second and the peak resident set size of iterating
+over synthetic data with :class:`~scvi.dataloaders.AnnDataLoader` and
+:class:`~scvi.dataloaders.DeviceBackedDataSplitter`, and writes the results to a JSON file.
+
+Examples
+--------
+Run all cases and write the results::
+
+    python benchmarks/dataloaders.py --n-obs 20000 --n-vars 2000 --output results.json
+
+Compare against a previous run, failing if a case is more than 20% slower::
+
+    python benchmarks/dataloaders.py --output new.json --baseline results.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from queue import Empty
+
+import anndata
+import numpy as np
+import scipy
+import torch
+
+import scvi
+from scvi.data import AnnDataManager
+from scvi.data.fields import CategoricalObsField, LayerField
+from scvi.dataloaders import AnnDataLoader, DeviceBackedDataSplitter
+
+SCHEMA_VERSION = 1
+# interval at which the parent checks that a case process is still running
+POLL_SECONDS = 1.0
+
+
+@dataclass
+class BenchmarkConfig:
+    """Scale and repetitions of the benchmark.
+
+    Attributes
+    ----------
+    n_obs
+        Number of generated cells.
+    n_vars
+        Number of generated genes.
+    dropout_ratio
+        Fraction of entries set to zero in the generated counts.
+    batch_size
+        Minibatch size of the data loaders.
+    n_epochs
+        Number of passes over the data that are timed, after one warm-up pass.
+    num_workers
+        Numbers of data loader workers to benchmark.
+    """
+
+    n_obs: int = 10_000
+    n_vars: int = 2_000
+    dropout_ratio: float = 0.9
+    batch_size: int = 128
+    n_epochs: int = 2
+    num_workers: list[int] = field(default_factory=lambda: [0, 2])
+
+
+@dataclass
+class BenchmarkCase:
+    """Data layout and loader settings of a benchmark case."""
+
+    data_format: str
+    loader: str = "AnnDataLoader"
+    backed: bool = False
+    load_sparse_tensor: bool = False
+    num_workers: int = 0
+    shared_memory: bool = False
+
+    @property
+    def name(self) -> str:
+        """Unique name of the case, used to match results across runs."""
+        backed = "backed_" if self.backed else ""
+        shared_memory = "/shared_memory" if self.shared_memory else ""
+        return (
+            f"{self.loader}/{backed}{self.data_format}/sparse_tensor={self.load_sparse_tensor}"
+            f"/num_workers={self.num_workers}{shared_memory}"
+        )
+
+
+def default_cases(config: BenchmarkConfig) -> list[BenchmarkCase]:
+    """All combinations of data layouts and loader settings covered by the benchmark."""
+    cases = []
+    for num_workers in config.num_workers:
+        cases.append(BenchmarkCase("dense", num_workers=num_workers))
+        for data_format in ["csr", "csc"]:
+            for load_sparse_tensor in [False, True]:
+                cases.append(
+                    BenchmarkCase(
+                        data_format,
+                        load_sparse_tensor=load_sparse_tensor,
+                        num_workers=num_workers,
+                    )
+                )
+        cases.append(BenchmarkCase("dense", backed=True, num_workers=num_workers))
+        cases.append(BenchmarkCase("csr", backed=True, num_workers=num_workers))
+        if num_workers > 0:
+            for data_format in ["dense", "csr"]:
+                cases.append(
+                    BenchmarkCase(data_format, num_workers=num_workers, shared_memory=True)
+                )
+    for data_format, load_sparse_tensor in [("dense", False), ("csr", False), ("csr", True)]:
+        cases.append(
+            BenchmarkCase(
+                data_format,
+                loader="DeviceBackedDataSplitter",
+                load_sparse_tensor=load_sparse_tensor,
+            )
+        )
+    return cases
+
+
+def make_adata(config: BenchmarkConfig, data_format: str) -> anndata.AnnData:
+    """Generate synthetic counts with :func:`~scvi.data.synthetic_iid`."""
+    n_batches = 2
+    adata = scvi.data.synthetic_iid(
+        batch_size=config.n_obs // n_batches,
+        n_genes=config.n_vars,
+        n_proteins=1,
+        n_regions=1,
+        n_batches=n_batches,
+        dropout_ratio=config.dropout_ratio,
+        sparse_format=None if data_format == "dense" else f"{data_format}_matrix",
+    )
+    del adata.obsm["protein_expression"], adata.obsm["accessibility"]
+    return adata
+
+
+def _setup_manager(adata: anndata.AnnData) -> AnnDataManager:
+    manager = AnnDataManager(
+        fields=[
+            LayerField(scvi.REGISTRY_KEYS.X_KEY, None, is_count_data=True),
+            CategoricalObsField(scvi.REGISTRY_KEYS.BATCH_KEY, "batch"),
+        ]
+    )
+    manager.register_fields(adata)
+    return manager
+
+
+def _iterate(loader, n_epochs: int) -> tuple[int, float]:
+    """Iterate over a warm-up pass and ``n_epochs`` timed passes of ``loader``."""
+    for _ in loader:
+        pass
+    n_cells = 0
+    start = time.perf_counter()
+    for _ in range(n_epochs):
+        for batch in loader:
+            n_cells += batch[scvi.REGISTRY_KEYS.X_KEY].shape[0]
+    return n_cells, time.perf_counter() - start
+
+
+def _max_rss_mb() -> float:
+    """Peak resident set size of this process and its terminated children in megabytes."""
+    # kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak_rss * scale / 1024**2
+
+
+def run_case(case: BenchmarkCase, config: BenchmarkConfig, tmp_dir: str) -> dict:
+    """Run one benchmark case in the current process."""
+    baseline_rss = _max_rss_mb()
+    adata = make_adata(config, case.data_format)
+    if case.backed:
+        path = os.path.join(tmp_dir, f"{case.data_format}.h5ad")
+        adata.write_h5ad(path)
+        adata = anndata.read_h5ad(path, backed="r")
+    manager = _setup_manager(adata)
+
+    if case.loader == "DeviceBackedDataSplitter":
+        splitter = DeviceBackedDataSplitter(
+            manager,
+            train_size=1.0,
+            accelerator="auto",
+            batch_size=config.batch_size,
+            shuffle=True,
+            load_sparse_tensor=case.load_sparse_tensor,
+        )
+        splitter.setup()
+        loader = splitter.train_dataloader()
+    else:
+        loader = AnnDataLoader(
+            manager,
+            batch_size=config.batch_size,
+            shuffle=True,
+            load_sparse_tensor=case.load_sparse_tensor,
+            num_workers=case.num_workers,
+            persistent_workers=case.num_workers > 0,
+            shared_memory=case.shared_memory,
+        )
+
+    n_cells, seconds = _iterate(loader, config.n_epochs)
+    del loader  # shut down persistent workers so that they count as terminated children
+    return {
+        "name": case.name,
+        **asdict(case),
+        "n_cells": n_cells,
+        "seconds": seconds,
+        "cells_per_sec": n_cells / seconds,
+        "peak_rss_mb": _max_rss_mb(),
+        "baseline_rss_mb": baseline_rss,
+    }
+
+
+def _run_case_in_subprocess(case: BenchmarkCase, config: BenchmarkConfig, tmp_dir: str, queue):
+    try:
+        queue.put(run_case(case, config, tmp_dir))
+    except Exception as e:  # noqa: BLE001
+        queue.put({"name": case.name, **asdict(case), "error": repr(e)})
+
+
+def _wait_for_result(case: BenchmarkCase, process, queue) -> dict:
+    """Result posted by a case process, or an error if it exited without posting one.
+
+    Processes killed by a signal, e.g. by the out-of-memory killer, or crashing in native code
+    never post a result, so the queue is polled while the process is alive.
+    """
+    result = None
+    while result is None:
+        alive = process.is_alive()
+        try:
+            result = queue.get(timeout=POLL_SECONDS)
+        except Empty:
+            # a result posted right before exiting is received by the last poll
+            if not alive:
+                break
+    process.join()
+    if result is None:
+        result = {"name": case.name, **asdict(case), "error": f"exit code {process.exitcode}"}
+    return result
+
+
+def run_benchmarks(
+    config: BenchmarkConfig,
+    cases: list[BenchmarkCase] | None = None,
+    isolate: bool = True,
+) -> dict:
+    """Run benchmark cases and collect their results with the environment.
+
+    Parameters
+    ----------
+    config
+        Scale and repetitions of the benchmark.
+    cases
+        Cases to run. Defaults to :func:`default_cases`.
+    isolate
+        Whether to run each case in a separate process, so that peak memory usage is measured
+        per case. ``baseline_rss_mb`` reports the peak memory usage of that process before the
+        case started.
+
+    Returns
+    -------
+    Dictionary with the ``environment``, the ``config`` and the list of ``results``.
+    """
+    cases = default_cases(config) if cases is None else cases
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case in cases:
+            if isolate:
+                # forked processes start from the imported packages, like data loader workers
+                context = multiprocessing.get_context(
+                    "fork" if sys.platform == "linux" else "spawn"
+                )
+                queue = context.Queue()
+                process = context.Process(
+                    target=_run_case_in_subprocess, args=(case, config, tmp_dir, queue)
+                )
+                process.start()
+                result = _wait_for_result(case, process, queue)
+            else:
+                result = run_case(case, config, tmp_dir)
+            results.append(result)
+            print(
+                f"{result['name']}: "
+                + (
+                    f"{result['cells_per_sec']:.0f} cells/s, {result['peak_rss_mb']:.0f} MB"
+                    if "error" not in result
+                    else result["error"]
+                ),
+                file=sys.stderr,
+            )
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scvi-tools": scvi.__version__,
+            "anndata": anndata.__version__,
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "torch": torch.__version__,
+        },
+        "config": asdict(config),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2) -> list[str]:
+    """Cases whose throughput dropped by more than ``tolerance`` relative to ``baseline``."""
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        reference = baseline_results.get(result["name"])
+        if reference is None or "error" in reference:
+            continue
+        if "error" in result:
+            regressions.append(f"{result['name']}: {result['error']}")
+            continue
+        ratio = result["cells_per_sec"] / reference["cells_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{result['name']}: {ratio:.2f}x the baseline throughput")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    defaults = BenchmarkConfig()
+    parser.add_argument("--n-obs", type=int, default=defaults.n_obs)
+    parser.add_argument("--n-vars", type=int, default=defaults.n_vars)
+    parser.add_argument("--dropout-ratio", type=float, default=defaults.dropout_ratio)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--n-epochs", type=int, default=defaults.n_epochs)
+    parser.add_argument("--num-workers", type=int, nargs="+", default=defaults.num_workers)
+    parser.add_argument("--output", default="dataloader_benchmarks.json")
+    parser.add_argument("--baseline", default=None, help="Previous results to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--no-isolate", action="store_true", help="Run cases in this process.")
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        n_obs=args.n_obs,
+        n_vars=args.n_vars,
+        dropout_ratio=args.dropout_ratio,
+        batch_size=args.batch_size,
+        n_epochs=args.n_epochs,
+        num_workers=args.num_workers,
+    )
+    results = run_benchmarks(config, isolate=not args.no_isolate)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(json.load(f), results, tolerance=args.tolerance)
+    for regression in regressions:
+        print(f"Regression in {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Epoch time and ELBO parity benchmarks of mixed precision and compiled training.
+
+Trains :class:`~scvi.model.SCVI` on synthetic data from the same initialization with every
+combination of the ``autocast_dtype`` and ``compile`` options of
+:class:`~scvi.train.TrainingPlan`, and reports the mean epoch time and the float32 ELBO of the
+trained models as a JSON file. The ELBO of every case is compared to the one of float32 eager
+training.
+
+Examples
+--------
+Run all cases and write the results::
+
+    python benchmarks/training.py --n-obs 20000 --n-vars 2000 --output results.json
+
+Fail if the ELBO of a case differs from float32 eager training by more than 1%::
+
+    python benchmarks/training.py --elbo-tolerance 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+import lightning.pytorch as pl
+import numpy as np
+import torch
+
+import scvi
+from scvi.model import SCVI
+
+SCHEMA_VERSION = 1
+REFERENCE_CASE = "autocast_dtype=float32/compile=False"
+
+
+@dataclass
+class BenchmarkConfig:
+    """Scale and repetitions of the benchmark.
+
+    Attributes
+    ----------
+    n_obs
+        Number of generated cells.
+    n_vars
+        Number of generated genes.
+    batch_size
+        Minibatch size used for training.
+    n_epochs
+        Number of training epochs. The first epoch is excluded from the epoch time, as it
+        includes the compilation of compiled modules.
+    autocast_dtypes
+        Autocast data types to benchmark.
+    compile
+        Whether to benchmark eager, compiled modules or both.
+    seed
+        Seed of the data and of the initialization of the models.
+    """
+
+    n_obs: int = 10_000
+    n_vars: int = 2_000
+    batch_size: int = 512
+    n_epochs: int = 10
+    autocast_dtypes: list[str] = field(default_factory=lambda: ["float32", "bfloat16"])
+    compile: list[bool] = field(default_factory=lambda: [False, True])
+    seed: int = 0
+
+
+class EpochTimer(pl.Callback):
+    """Record the wall time of every training epoch."""
+
+    def __init__(self):
+        self.epoch_times = []
+
+    def on_train_epoch_start(self, trainer, pl_module):
+        """Start timing the epoch."""
+        self._start = time.perf_counter()
+
+    def on_train_epoch_end(self, trainer, pl_module):
+        """Record the time of the epoch."""
+        self.epoch_times.append(time.perf_counter() - self._start)
+
+
+def run_case(config: BenchmarkConfig, autocast_dtype: str, compile: bool) -> dict:
+    """Train one model and measure its epoch time and float32 ELBO."""
+    scvi.settings.seed = config.seed
+    adata = scvi.data.synthetic_iid(
+        batch_size=config.n_obs // 2, n_genes=config.n_vars, n_batches=2
+    )
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata)
+
+    timer = EpochTimer()
+    model.train(
+        max_epochs=config.n_epochs,
+        batch_size=config.batch_size,
+        train_size=1.0,
+        autocast_dtype=autocast_dtype,
+        plan_kwargs={"compile": compile},
+        callbacks=[timer],
+        enable_progress_bar=False,
+    )
+    timed_epochs = timer.epoch_times[1:] or timer.epoch_times
+    return {
+        "name": f"autocast_dtype={autocast_dtype}/compile={compile}",
+        "autocast_dtype": autocast_dtype,
+        "compile": compile,
+        "first_epoch_seconds": timer.epoch_times[0],
+        "epoch_seconds": float(np.mean(timed_epochs)),
+        "elbo_train": float(model.history["elbo_train"].iloc[-1, 0]),
+        # evaluated in float32 eager mode for all cases
+        "elbo": float(model.get_elbo(batch_size=config.batch_size)),
+    }
+
+
+def run_benchmarks(config: BenchmarkConfig) -> dict:
+    """Run all cases and collect their results with the environment.
+
+    Returns
+    -------
+    Dictionary with the ``environment``, the ``config`` and the list of ``results``. Results
+    report their ``speedup`` and ``elbo_relative_difference`` with respect to float32 eager
+    training if it is among the cases.
+    """
+    results = []
+    for autocast_dtype in config.autocast_dtypes:
+        for compile in config.compile:
+            try:
+                result = run_case(config, autocast_dtype, compile)
+            except Exception as e:  # noqa: BLE001
+                result = {
+                    "name": f"autocast_dtype={autocast_dtype}/compile={compile}",
+                    "autocast_dtype": autocast_dtype,
+                    "compile": compile,
+                    "error": repr(e),
+                }
+            results.append(result)
+
+    reference = next((r for r in results if r["name"] == REFERENCE_CASE), None)
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']}: {result['error']}", file=sys.stderr)
+            continue
+        if reference is not None and "error" not in reference:
+            result["speedup"] = reference["epoch_seconds"] / result["epoch_seconds"]
+            result["elbo_relative_difference"] = abs(result["elbo"] - reference["elbo"]) / abs(
+                reference["elbo"]
+            )
+        print(
+            f"{result['name']}: {result['epoch_seconds']:.3f} s/epoch, ELBO {result['elbo']:.3f}",
+            file=sys.stderr,
+        )
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scvi-tools": scvi.__version__,
+            "torch": torch.__version__,
+            "cuda": torch.cuda.is_available(),
+        },
+        "config": asdict(config),
+        "results": results,
+    }
+
+
+def elbo_mismatches(results: dict, tolerance: float = 0.01) -> list[str]:
+    """Cases whose ELBO differs from float32 eager training by more than ``tolerance``."""
+    mismatches = []
+    for result in results["results"]:
+        if "error" in result:
+            mismatches.append(f"{result['name']}: {result['error']}")
+        elif result.get("elbo_relative_difference", 0.0) > tolerance:
+            mismatches.append(
+                f"{result['name']}: {result['elbo_relative_difference']:.2%} ELBO difference"
+            )
+    return mismatches
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    defaults = BenchmarkConfig()
+    parser.add_argument("--n-obs", type=int, default=defaults.n_obs)
+    parser.add_argument("--n-vars", type=int, default=defaults.n_vars)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--n-epochs", type=int, default=defaults.n_epochs)
+    parser.add_argument("--autocast-dtypes", nargs="+", default=defaults.autocast_dtypes)
+    parser.add_argument("--no-compile", action="store_true", help="Only run eager cases.")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", default="training_benchmarks.json")
+    parser.add_argument("--elbo-tolerance", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        n_obs=args.n_obs,
+        n_vars=args.n_vars,
+        batch_size=args.batch_size,
+        n_epochs=args.n_epochs,
+        autocast_dtypes=args.autocast_dtypes,
+        compile=[False] if args.no_compile else defaults.compile,
+        seed=args.seed,
+    )
+    results = run_benchmarks(config)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    mismatches = elbo_mismatches(results, tolerance=args.elbo_tolerance)
+    for mismatch in mismatches:
+        print(f"ELBO mismatch in {mismatch}", file=sys.stderr)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
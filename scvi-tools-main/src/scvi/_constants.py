@@ -16,6 +16,8 @@ class _REGISTRY_KEYS_NT(NamedTuple):
     LATENT_QZM_KEY: str = "latent_qzm"
     LATENT_QZV_KEY: str = "latent_qzv"
     OBSERVED_LIB_SIZE: str = "observed_lib_size"
+    # sparse copy of X kept next to the densified minibatch
+    X_SPARSE_KEY: str = "X_sparse"
 
 
 REGISTRY_KEYS = _REGISTRY_KEYS_NT()
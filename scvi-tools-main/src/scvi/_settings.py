@@ -42,6 +42,18 @@ class ScviConfig:
 
     >>> scvi.settings.num_threads = 2
 
+    To prepare two minibatches ahead of the model in a background thread
+
+    >>> scvi.settings.dl_prefetch_depth = 2
+
+    To share the registered data with data loader workers through shared memory
+
+    >>> scvi.settings.dl_shared_memory = True
+
+    To let Monte Carlo inference methods use at most a quarter of the free device memory
+
+    >>> scvi.settings.inference_memory_fraction = 0.25
+
     To prevent Jax from preallocating GPU memory on start (default)
 
     >>> scvi.settings.jax_preallocate_gpu_memory = False
@@ -56,6 +68,9 @@ class ScviConfig:
         logging_dir: str = "./scvi_log/",
         dl_num_workers: int = 0,
         dl_persistent_workers: bool = False,
+        dl_prefetch_depth: int = 0,
+        dl_shared_memory: bool = False,
+        inference_memory_fraction: float = 0.5,
         jax_preallocate_gpu_memory: bool = False,
         warnings_stacklevel: int = 2,
     ):
@@ -68,6 +83,9 @@ class ScviConfig:
         self.logging_dir = logging_dir
         self.dl_num_workers = dl_num_workers
         self.dl_persistent_workers = dl_persistent_workers
+        self.dl_prefetch_depth = dl_prefetch_depth
+        self.dl_shared_memory = dl_shared_memory
+        self.inference_memory_fraction = inference_memory_fraction
         self._num_threads = None
         self.jax_preallocate_gpu_memory = jax_preallocate_gpu_memory
         self.verbosity = verbosity
@@ -110,6 +128,47 @@ class ScviConfig:
         """Whether to use persistent_workers in PyTorch data loaders (Default is False)."""
         self._dl_persistent_workers = dl_persistent_workers
 
+    @property
+    def dl_prefetch_depth(self) -> int:
+        """Number of minibatches prepared ahead in a background thread (Default is 0)."""
+        return self._dl_prefetch_depth
+
+    @dl_prefetch_depth.setter
+    def dl_prefetch_depth(self, dl_prefetch_depth: int):
+        """Number of minibatches prepared ahead in a background thread (Default is 0)."""
+        if dl_prefetch_depth < 0:
+            raise ValueError("`dl_prefetch_depth` must be non-negative.")
+        self._dl_prefetch_depth = dl_prefetch_depth
+
+    @property
+    def dl_shared_memory(self) -> bool:
+        """Whether data loaders share registered data with workers (Default is False).
+
+        Applies to in-memory :class:`~anndata.AnnData` objects.
+        """
+        return self._dl_shared_memory
+
+    @dl_shared_memory.setter
+    def dl_shared_memory(self, dl_shared_memory: bool):
+        """Whether data loaders share registered data with workers (Default is False)."""
+        self._dl_shared_memory = dl_shared_memory
+
+    @property
+    def inference_memory_fraction(self) -> float:
+        """Fraction of the free memory used to plan inference chunks (Default is 0.5).
+
+        Used to pick minibatch and Monte Carlo sample chunk sizes when no ``batch_size`` is passed
+        to methods such as :meth:`~scvi.model.base.VAEMixin.get_marginal_ll`.
+        """
+        return self._inference_memory_fraction
+
+    @inference_memory_fraction.setter
+    def inference_memory_fraction(self, inference_memory_fraction: float):
+        """Fraction of the free memory used to plan inference chunks."""
+        if not 0 < inference_memory_fraction <= 1:
+            raise ValueError("`inference_memory_fraction` must be in (0, 1].")
+        self._inference_memory_fraction = inference_memory_fraction
+
     @property
     def logging_dir(self) -> Path:
         """Directory for training logs (default `'./scvi_log/'`)."""
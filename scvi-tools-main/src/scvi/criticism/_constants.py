@@ -7,6 +7,11 @@ METRIC_ZERO_FRACTION = "zero_fraction"
 DEFAULT_DE_N_TOP_GENES = 2
 DEFAULT_DE_P_VAL_THRESHOLD = 0.001
 DEFAULT_DE_N_TOP_GENES_OVERLAP = 100
+DEFAULT_CALIBRATION_QUANTILES = [
+    p / 100 for p in [2.5, 5, 7.5, 10, 12.5, 15, 17.5, 82.5, 85, 87.5, 90, 92.5, 95, 97.5]
+]
+# number of cells x features x samples above which criticism reports stream the samples
+DEFAULT_STREAMING_MIN_SIZE = 100_000_000
 
 DATA_VAR_RAW = "Raw"
 
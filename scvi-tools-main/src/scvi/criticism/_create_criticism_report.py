@@ -11,6 +11,7 @@ from scvi._types import AnnOrMuData
 from scvi.model._utils import REGISTRY_KEYS
 from scvi.model.base import BaseModelClass
 
+from ._constants import DEFAULT_STREAMING_MIN_SIZE
 from ._ppc import PosteriorPredictiveCheck as PPC
 
 METRIC_CV_CELL = "cv_cell"
@@ -45,6 +46,7 @@ def create_criticism_report(
     n_samples: int = 5,
     label_key: str | None = None,
     save_folder: str | None = None,
+    streaming: bool | None = None,
 ) -> dict:
     """
     Helper function to compute and store criticism metrics for a model.
@@ -64,6 +66,11 @@ def create_criticism_report(
         the model.
     save_folder
         Path to folder for storing the metrics. Preferred to store in save_path folder of model.
+    streaming
+        Whether to reduce the posterior predictive samples into online statistics minibatch by
+        minibatch instead of storing all of them, see
+        :class:`~scvi.criticism.PosteriorPredictiveCheck`. If ``None``, streams if the number of
+        cells times the number of features times ``n_samples`` is larger than ``1e8``.
     """
     adata = model._validate_anndata(adata)
 
@@ -73,14 +80,14 @@ def create_criticism_report(
         md_cell_wise_cv, md_gene_wise_cv, md_de = "", "", ""
         for i in modalities:
             md_cell_wise_cv_, md_gene_wise_cv_, md_de_ = compute_metrics(
-                model, adata, skip_metrics, n_samples, label_key, modality=i
+                model, adata, skip_metrics, n_samples, label_key, modality=i, streaming=streaming
             )
             md_cell_wise_cv += f"Modality: {i}\n\n" + md_cell_wise_cv_ + "\n\n"
             md_gene_wise_cv += f"Modality: {i}\n\n" + md_gene_wise_cv_ + "\n\n"
             md_de += f"Modality: {i}\n\n" + md_de_ + "\n\n"
     else:
         md_cell_wise_cv, md_gene_wise_cv, md_de = compute_metrics(
-            model, adata, skip_metrics, n_samples, label_key
+            model, adata, skip_metrics, n_samples, label_key, streaming=streaming
         )
 
     markdown_dict = {
@@ -95,9 +102,14 @@ def create_criticism_report(
         json.dump(markdown_dict, f, indent=4)
 
 
-def compute_metrics(model, adata, skip_metrics, n_samples, label_key, modality=None):
+def compute_metrics(
+    model, adata, skip_metrics, n_samples, label_key, modality=None, streaming=None
+):
     models_dict = {"model": model}
-    ppc = PPC(adata, models_dict, n_samples=n_samples, modality=modality)
+    if streaming is None:
+        shape = adata[modality].shape if isinstance(adata, MuData) else adata.shape
+        streaming = shape[0] * shape[1] * n_samples > DEFAULT_STREAMING_MIN_SIZE
+    ppc = PPC(adata, models_dict, n_samples=n_samples, modality=modality, streaming=streaming)
     # run ppc+cv
     if METRIC_CV_CELL not in skip_metrics:
         ppc.coefficient_of_variation("features")
@@ -8,7 +8,7 @@ import numpy as np
 import pandas as pd
 from anndata import AnnData
 from mudata import MuData
-from scipy.sparse import issparse
+from scipy.sparse import issparse, vstack
 from scipy.stats import pearsonr, spearmanr
 from sklearn.metrics import (
     average_precision_score,
@@ -22,6 +22,7 @@ from scvi.utils import dependencies
 
 from ._constants import (
     DATA_VAR_RAW,
+    DEFAULT_CALIBRATION_QUANTILES,
     DEFAULT_DE_N_TOP_GENES_OVERLAP,
     DEFAULT_DE_P_VAL_THRESHOLD,
     METRIC_CALIBRATION,
@@ -32,6 +33,7 @@ from ._constants import (
     UNS_NAME_RGG_PPC,
     UNS_NAME_RGG_RAW,
 )
+from ._streaming import OnlinePPCStatistics
 
 if TYPE_CHECKING:
     from scvi._types import AnnOrMuData
@@ -65,6 +67,21 @@ class PosteriorPredictiveCheck:
         samples and computing metrics. If ``None``, defaults to all observations in ``adata``.
     modality
         Modality to use for posterior predictive samples. Needs to be defined if using MuData
+    streaming
+        If ``True``, posterior predictive samples are drawn for ``chunk_size`` cells at a time
+        and immediately reduced into the online accumulators of
+        :class:`~scvi.criticism._streaming.OnlinePPCStatistics`, instead of being stored in
+        :attr:`samples_dataset`, so that memory usage does not grow with the number of cells
+        times the number of samples. Only the first ``n_stored_samples`` samples of each model
+        are kept, as sparse matrices, for :meth:`differential_expression`.
+    chunk_size
+        Only used if ``streaming`` is ``True``. Number of cells sampled at a time.
+    n_stored_samples
+        Only used if ``streaming`` is ``True``. Number of samples of each model kept for
+        :meth:`differential_expression`.
+    confidence_intervals
+        Only used if ``streaming`` is ``True``. Quantiles of the credible intervals accumulated
+        for :meth:`calibration_error`. Defaults to the quantiles of :meth:`calibration_error`.
     """
 
     def __init__(
@@ -75,6 +92,10 @@ class PosteriorPredictiveCheck:
         n_samples: int = 10,
         indices: list | None = None,
         modality: str | None = None,
+        streaming: bool = False,
+        chunk_size: int = 1024,
+        n_stored_samples: int = 1,
+        confidence_intervals: list[float] | None = None,
     ):
         if indices is not None:
             adata = adata[indices]
@@ -100,8 +121,19 @@ class PosteriorPredictiveCheck:
         self.n_samples = n_samples
         self.models = models_dict
         self.metrics = {}
+        self.streaming = streaming
+        self.statistics = None
+        self.stored_samples = None
 
-        self._store_posterior_predictive_samples(indices=indices)
+        if streaming:
+            self._accumulate_posterior_predictive_statistics(
+                indices=indices,
+                chunk_size=chunk_size,
+                n_stored_samples=n_stored_samples,
+                confidence_intervals=confidence_intervals,
+            )
+        else:
+            self._store_posterior_predictive_samples(indices=indices)
 
     def __repr__(self) -> str:
         return (
@@ -171,6 +203,73 @@ class PosteriorPredictiveCheck:
         )
         self.samples_dataset = Dataset(samples_dict)
 
+    def _accumulate_posterior_predictive_statistics(
+        self,
+        batch_size: int = 32,
+        indices: list[int] | None = None,
+        chunk_size: int = 1024,
+        n_stored_samples: int = 1,
+        confidence_intervals: list[float] | None = None,
+    ):
+        """
+        Accumulate the statistics of posterior predictive samples for each model.
+
+        Parameters
+        ----------
+        batch_size
+            Batch size for generating posterior predictive samples.
+        indices
+            Indices to generate posterior predictive samples for.
+        chunk_size
+            Number of cells whose samples are generated and reduced at a time.
+        n_stored_samples
+            Number of samples of each model kept as sparse matrices.
+        confidence_intervals
+            Quantiles of the credible intervals of the calibration.
+        """
+        self.batch_size = batch_size
+        quantiles = (
+            DEFAULT_CALIBRATION_QUANTILES if confidence_intervals is None else confidence_intervals
+        )
+        n_cells, n_features = self.raw_counts.shape
+        n_stored_samples = min(n_stored_samples, self.n_samples)
+
+        self.statistics = {
+            m: OnlinePPCStatistics(n_cells, n_features, self.n_samples, quantiles=quantiles)
+            for m in self.models
+        }
+        self.statistics[DATA_VAR_RAW] = OnlinePPCStatistics(n_cells, n_features)
+        stored_samples = {m: [[] for _ in range(n_stored_samples)] for m in self.models}
+
+        cell_indices = np.arange(n_cells) if indices is None else np.asarray(indices)
+        for start in range(0, n_cells, chunk_size):
+            stop = min(start + chunk_size, n_cells)
+            observed = self.raw_counts[start:stop].todense()
+            self.statistics[DATA_VAR_RAW].update(observed)
+            for m, model in self.models.items():
+                pp_counts = model.posterior_predictive_sample(
+                    model.adata,
+                    n_samples=self.n_samples,
+                    batch_size=self.batch_size,
+                    indices=cell_indices[start:stop],
+                )
+                if isinstance(pp_counts, dict):
+                    pp_counts = pp_counts[self.modality]
+                if pp_counts.ndim == 2:
+                    pp_counts = pp_counts[..., None]
+                for k in range(n_stored_samples):
+                    stored_samples[m][k].append(pp_counts[..., k].to_scipy_sparse().tocsr())
+                self.statistics[m].update(pp_counts.todense(), observed=observed)
+
+        self.stored_samples = {
+            m: [vstack(chunks, format="csr") for chunks in samples]
+            for m, samples in stored_samples.items()
+        }
+
+    def _statistics_dataframe(self, values: dict[str, np.ndarray], dim: Dims) -> pd.DataFrame:
+        index = self.adata.obs_names if dim == "cells" else self.adata.var_names
+        return pd.DataFrame(values, index=pd.Index(index, name=dim))
+
     def coefficient_of_variation(self, dim: Dims = "cells") -> None:
         """
         Calculate the coefficient of variation (CV) for each model and the raw counts.
@@ -184,6 +283,16 @@ class PosteriorPredictiveCheck:
             Dimension to compute CV over.
         """
         identifier = METRIC_CV_CELL if dim == "features" else METRIC_CV_GENE
+        if self.streaming:
+            cv_mean = {
+                m: statistics.coefficient_of_variation(dim)
+                for m, statistics in self.statistics.items()
+            }
+            cv_mean[DATA_VAR_RAW] = np.nan_to_num(cv_mean[DATA_VAR_RAW])
+            self.metrics[identifier] = self._statistics_dataframe(
+                cv_mean, "features" if dim == "cells" else "cells"
+            )
+            return
         mean = self.samples_dataset.mean(dim=dim, skipna=False)
         # we use a trick to compute the std to speed it up: std = E[X^2] - E[X]^2
         # a square followed by a sqrt is ok here because this is counts data (no negative values)
@@ -200,6 +309,12 @@ class PosteriorPredictiveCheck:
 
     def zero_fraction(self) -> None:
         """Fraction of zeros in raw counts for a specific gene"""
+        if self.streaming:
+            self.metrics[METRIC_ZERO_FRACTION] = self._statistics_dataframe(
+                {m: statistics.nonzero_fraction() for m, statistics in self.statistics.items()},
+                "features",
+            )
+            return
         pp_samples = self.samples_dataset
         mean = (pp_samples != 0).mean(dim="cells", skipna=False).mean(dim="samples", skipna=False)
         mean = _make_dataset_dense(mean)
@@ -222,11 +337,29 @@ class PosteriorPredictiveCheck:
 
         Notes
         -----
-        This does not work on sparse data and can cause large memory usage.
+        This does not work on sparse data and can cause large memory usage, unless
+        ``streaming`` is ``True``, in which case the calibration error is computed from the
+        credible intervals accumulated while sampling, and `confidence_intervals` must be
+        ``None`` or equal to the quantiles that were accumulated.
         """
+        if self.streaming:
+            model_cal = {}
+            for model, statistics in self.statistics.items():
+                if model == DATA_VAR_RAW:
+                    continue
+                if confidence_intervals is not None and list(confidence_intervals) != (
+                    statistics.quantiles
+                ):
+                    raise ValueError(
+                        "`confidence_intervals` must match the quantiles accumulated while "
+                        "sampling. Pass them as `confidence_intervals` when creating the "
+                        "posterior predictive check instead."
+                    )
+                model_cal[model] = {"features": statistics.calibration_error()}
+            self.metrics[METRIC_CALIBRATION] = pd.DataFrame.from_dict(model_cal)
+            return
         if confidence_intervals is None:
-            ps = [2.5, 5, 7.5, 10, 12.5, 15, 17.5, 82.5, 85, 87.5, 90, 92.5, 95, 97.5]
-            ps = [p / 100 for p in ps]
+            ps = DEFAULT_CALIBRATION_QUANTILES
         else:
             if len(confidence_intervals) % 2 != 0:
                 raise ValueError("Confidence intervals must be even")
@@ -300,10 +433,11 @@ class PosteriorPredictiveCheck:
 
         import scanpy as sc
 
-        if n_samples > self.n_samples:
+        n_recorded = len(next(iter(self.stored_samples.values()))) if self.streaming else None
+        if n_samples > (self.n_samples if n_recorded is None else n_recorded):
             raise ValueError(
                 f"n_samples={n_samples} is greater than the number of samples already recorded "
-                f"({self.n_samples})"
+                f"({self.n_samples if n_recorded is None else n_recorded})"
             )
         # run DE with the raw counts
         adata_de = AnnData(
@@ -334,19 +468,22 @@ class PosteriorPredictiveCheck:
         # X here will be overwritten
         adata_approx = AnnData(X=adata_de.X, obs=adata_de.obs, var=adata_de.var)
         de_keys = {}
-        models = [model for model in pp_samples.data_vars if model != DATA_VAR_RAW]
+        models = list(self.models)
         for model in models:
             if model not in de_keys:
                 de_keys[model] = []
             for k in range(n_samples):
-                one_sample = pp_samples[model].isel(samples=k)
                 # overwrite X with the posterior predictive sample
                 # This allows us to save all the DE results in the same adata object
-                one_sample_data = (
-                    one_sample.data.to_scipy_sparse().tocsr()
-                    if isinstance(one_sample.data, SparseArray)
-                    else one_sample
-                )
+                if self.streaming:
+                    one_sample_data = self.stored_samples[model][k]
+                else:
+                    one_sample = pp_samples[model].isel(samples=k)
+                    one_sample_data = (
+                        one_sample.data.to_scipy_sparse().tocsr()
+                        if isinstance(one_sample.data, SparseArray)
+                        else one_sample
+                    )
                 adata_approx.X = one_sample_data.copy()
                 sc.pp.normalize_total(adata_approx, target_sum=cell_scale_factor)
                 sc.pp.log1p(adata_approx)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+
+
+def _nanmean(x: np.ndarray, axis: int) -> np.ndarray:
+    """Mean ignoring ``nan``, which is ``nan`` where all values are ``nan``."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(x, axis=axis)
+
+
+def _cv(mean: np.ndarray, mean_square: np.ndarray) -> np.ndarray:
+    """Coefficient of variation from the first two moments."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(mean_square - np.square(mean)) / mean
+
+
+class OnlinePPCStatistics:
+    """Online accumulators of the posterior predictive check metrics of one set of counts.
+
+    Minibatches of cells are added with :meth:`update`, and only statistics whose size does
+    not depend on the number of cells times the number of samples are kept: the first two
+    moments of each feature over cells, the coefficient of variation of each cell, the number
+    of nonzero counts of each feature and, if `quantiles` is not ``None``, the number of
+    observed counts within each credible interval of the samples.
+
+    Parameters
+    ----------
+    n_cells
+        Total number of cells.
+    n_features
+        Number of features.
+    n_samples
+        Number of posterior predictive samples per cell, ``1`` for observed counts.
+    quantiles
+        Increasing quantiles of the samples, paired from the outside in into credible
+        intervals, e.g., ``[0.05, 0.1, 0.9, 0.95]`` gives the intervals ``(0.05, 0.95)`` and
+        ``(0.1, 0.9)``. If ``None``, the calibration is not computed.
+    """
+
+    def __init__(
+        self,
+        n_cells: int,
+        n_features: int,
+        n_samples: int = 1,
+        quantiles: list[float] | None = None,
+    ):
+        if quantiles is not None and len(quantiles) % 2 != 0:
+            raise ValueError("Confidence intervals must be even")
+        self.n_cells = n_cells
+        self.n_features = n_features
+        self.n_samples = n_samples
+        self.quantiles = None if quantiles is None else list(quantiles)
+        self._n_seen = 0
+        self._feature_sum = np.zeros((n_features, n_samples))
+        self._feature_square_sum = np.zeros((n_features, n_samples))
+        self._nonzero = np.zeros(n_features)
+        self._cell_cv = np.full(n_cells, np.nan)
+        self._in_interval = None
+        if quantiles is not None:
+            self._in_interval = np.zeros(len(quantiles) // 2)
+
+    @property
+    def intervals(self) -> list[tuple[int, int]]:
+        """Indices of the lower and upper quantiles of each credible interval."""
+        n = len(self.quantiles)
+        return [(i, n - (i + 1)) for i in range(n // 2)]
+
+    def update(self, counts: np.ndarray, observed: np.ndarray | None = None):
+        """Add the counts of the next minibatch of cells.
+
+        Parameters
+        ----------
+        counts
+            Dense counts of shape ``(n_cells_batch, n_features, n_samples)``, or
+            ``(n_cells_batch, n_features)`` if `n_samples` is ``1``.
+        observed
+            Observed counts of shape ``(n_cells_batch, n_features)``. Required if `quantiles`
+            is not ``None``.
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        if counts.ndim == 2:
+            counts = counts[..., None]
+        start = self._n_seen
+        stop = start + counts.shape[0]
+        if stop > self.n_cells:
+            raise ValueError(f"More than {self.n_cells} cells were added.")
+
+        squares = np.square(counts)
+        self._feature_sum += counts.sum(axis=0)
+        self._feature_square_sum += squares.sum(axis=0)
+        self._nonzero += (counts != 0).sum(axis=(0, 2))
+        # cell-wise moments over features, per sample
+        cell_cv = _cv(counts.mean(axis=1), squares.mean(axis=1))
+        self._cell_cv[start:stop] = _nanmean(cell_cv, axis=-1)
+
+        if self._in_interval is not None:
+            if observed is None:
+                raise ValueError("`observed` counts are required to compute the calibration.")
+            observed = np.asarray(observed)
+            # (quantiles, cells, features)
+            quants = np.quantile(counts, self.quantiles, axis=-1)
+            for i, (lower, upper) in enumerate(self.intervals):
+                inside = (observed >= quants[lower]) & (observed <= quants[upper])
+                self._in_interval[i] += inside.sum()
+        self._n_seen = stop
+
+    def _check_complete(self):
+        if self._n_seen != self.n_cells:
+            raise ValueError(f"Only {self._n_seen} of {self.n_cells} cells were added.")
+
+    def coefficient_of_variation(self, dim: str = "cells") -> np.ndarray:
+        """Coefficient of variation over `dim`, averaged over samples.
+
+        Returns
+        -------
+        Array of shape ``(n_features,)`` if `dim` is ``"cells"``, else ``(n_cells,)``.
+        """
+        self._check_complete()
+        if dim == "features":
+            return self._cell_cv
+        cv = _cv(
+            self._feature_sum / self.n_cells,
+            self._feature_square_sum / self.n_cells,
+        )
+        return _nanmean(cv, axis=-1)
+
+    def nonzero_fraction(self) -> np.ndarray:
+        """Fraction of nonzero counts of each feature over cells and samples."""
+        self._check_complete()
+        return self._nonzero / (self.n_cells * self.n_samples)
+
+    def calibration_error(self) -> float:
+        """Calibration error of the samples with respect to the observed counts.
+
+        The calibration error is the sum over credible intervals of the squared difference
+        between the fraction of observed counts within the interval and its width.
+        """
+        self._check_complete()
+        if self._in_interval is None:
+            raise ValueError("The calibration was not computed.")
+        fractions = self._in_interval / (self.n_cells * self.n_features)
+        widths = np.array(
+            [self.quantiles[upper] - self.quantiles[lower] for lower, upper in self.intervals]
+        )
+        return float(np.sum(np.square(fractions - widths)))
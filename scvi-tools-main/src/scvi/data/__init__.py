@@ -22,6 +22,7 @@ from ._datasets import (
     spleen_lymph_cite_seq,
     synthetic_iid,
 )
+from ._feature_cache import FeatureCache
 from ._manager import AnnDataManager, AnnDataManagerValidationCheck
 from ._preprocessing import (
     add_dna_sequence,
@@ -31,11 +32,13 @@ from ._preprocessing import (
     reads_to_fragments,
 )
 from ._read import read_10x_atac, read_10x_multiome
+from ._sharded import ShardedCSRDataset, read_h5ad_shards
 
 __all__ = [
     "AnnTorchDataset",
     "AnnDataManagerValidationCheck",
     "AnnDataManager",
+    "FeatureCache",
     "poisson_gene_selection",
     "organize_cite_seq_10x",
     "pbmcs_10x_cite_seq",
@@ -59,6 +62,8 @@ __all__ = [
     "read_text",
     "read_10x_atac",
     "read_10x_multiome",
+    "read_h5ad_shards",
+    "ShardedCSRDataset",
     "heart_cell_atlas_subsampled",
     "organize_multiome_anndatas",
     "pbmc_seurat_v4_cite_seq",
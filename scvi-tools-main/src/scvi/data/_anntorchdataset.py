@@ -1,22 +1,27 @@
 from __future__ import annotations
 
 import logging
+import warnings
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 import h5py
 import numpy as np
 import pandas as pd
 from anndata.abc import CSCDataset, CSRDataset
-from scipy.sparse import issparse
+from scipy.sparse import issparse, vstack
 from torch.utils.data import Dataset
 
+from scvi import settings
 from scvi._constants import REGISTRY_KEYS
 
 if TYPE_CHECKING:
     import torch
 
     from ._manager import AnnDataManager
-from ._utils import registry_key_to_default_dtype, scipy_to_torch_sparse
+from ._sharded import ShardedCSRDataset
+from ._shared_memory import SharedField
+from ._utils import csr_gather_rows, registry_key_to_default_dtype, scipy_to_torch_sparse
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +49,20 @@ class AnnTorchDataset(Dataset):
         ``EXPERIMENTAL`` If ``True``, loads data with sparse CSR or CSC layout as a
         :class:`~torch.Tensor` with the same layout. Can lead to speedups in data transfers to
         GPUs, depending on the sparsity of the data.
+    chunk_size
+        If not ``None``, backed dense and CSR data is read from disk in chunks of ``chunk_size``
+        consecutive rows, which are kept in a least-recently-used cache. Pairs well with
+        :class:`~scvi.dataloaders.ChunkedBatchSampler`.
+    n_cached_chunks
+        Maximum number of chunks cached per registry key if ``chunk_size`` is not ``None``.
+    shared_memory
+        If ``True``, the registered data is copied into shared memory segments, in the returned
+        dtypes and with sparse data as CSR components, or CSC components for CSC matrices. The
+        segments are published once per ``adata_manager`` and shared by all of its datasets.
+        Data loader workers attach to the segments without copying them, and without receiving
+        a copy of the :class:`~anndata.AnnData` object, so that memory usage does not grow with
+        the number of workers or data loaders. Requires an in-memory :class:`~anndata.AnnData`
+        object.
     """
 
     def __init__(
@@ -51,14 +70,29 @@ class AnnTorchDataset(Dataset):
         adata_manager: AnnDataManager,
         getitem_tensors: list | dict[str, type] | None = None,
         load_sparse_tensor: bool = False,
+        chunk_size: int | None = None,
+        n_cached_chunks: int = 16,
+        shared_memory: bool = False,
     ):
         super().__init__()
 
         if adata_manager.adata is None:
             raise ValueError("Please run ``register_fields`` on ``adata_manager`` first.")
+        if shared_memory and adata_manager.adata.isbacked:
+            raise ValueError("`shared_memory` requires an in-memory AnnData object.")
         self.adata_manager = adata_manager
         self.keys_and_dtypes = getitem_tensors
         self.load_sparse_tensor = load_sparse_tensor
+        self.chunk_size = chunk_size
+        self.n_cached_chunks = n_cached_chunks
+        self.shared_memory = shared_memory
+        self._n_obs = adata_manager.adata.shape[0]
+        self._chunk_cache = {}
+        self._indptr_cache = {}
+        self._shared_data = None
+        if shared_memory:
+            # published before any worker starts, so that forked workers inherit the segments
+            self._publish_shared_memory()
 
     @property
     def registered_keys(self):
@@ -98,18 +132,114 @@ class AnnTorchDataset(Dataset):
         """Dictionary of data tensors.
 
         First time this is accessed, data is fetched from the underlying
-        :class:`~anndata.AnnData` object. Subsequent accesses will return the
-        cached dictionary.
+        :class:`~anndata.AnnData` object, or from the feature cache of ``adata_manager`` if one
+        was compiled and is still valid. Subsequent accesses will return the cached dictionary.
+        If ``shared_memory`` is ``True``, the data are views of the shared memory segments.
         """
-        if not hasattr(self, "_data"):
+        if not hasattr(self, "_data") and self._shared_data is not None:
             self._data = {
-                key: self.adata_manager.get_from_registry(key) for key in self.keys_and_dtypes
+                key: value.get() if isinstance(value, SharedField) else value
+                for key, value in self._shared_data.items()
+            }
+        elif not hasattr(self, "_data"):
+            cache = getattr(self.adata_manager, "feature_cache", None)
+            if cache is not None and not cache.is_valid(self.adata_manager):
+                warnings.warn(
+                    "The registered data changed since the feature cache was compiled, reading "
+                    "from the AnnData object instead. Run `compile_feature_cache` again to "
+                    "update the cache.",
+                    UserWarning,
+                    stacklevel=settings.warnings_stacklevel,
+                )
+                cache = None
+            self._data = {
+                key: cache[key]
+                if cache is not None and key in cache.keys
+                else self.adata_manager.get_from_registry(key)
+                for key in self.keys_and_dtypes
             }
         return self._data
 
+    def _publish_shared_memory(self):
+        """Attach to the shared memory segments of the data to fetch in ``__getitem__``.
+
+        Segments are published by ``adata_manager`` the first time they are requested.
+        """
+        shared_data = {}
+        for key, dtype in self.keys_and_dtypes.items():
+            value = self.data[key]
+            # e.g. the minification type, stored as a string
+            shared_data[key] = (
+                self.adata_manager._get_shared_field(key, dtype, value)
+                if hasattr(value, "shape")
+                else value
+            )
+        self._shared_data = shared_data
+        del self._data
+
+    def __getstate__(self) -> dict:
+        # data is fetched again in child processes, e.g. to reopen memory-mapped caches
+        state = self.__dict__.copy()
+        state.pop("_data", None)
+        if self._shared_data is not None:
+            # workers attach to the shared segments instead of unpickling the AnnData object
+            state["adata_manager"] = None
+        return state
+
     def __len__(self):
+        if self.adata_manager is None:
+            return self._n_obs
         return self.adata_manager.adata.shape[0]
 
+    def _get_rows(self, key: str, data, indexes: list[int] | np.ndarray | slice):
+        """Slice rows of registered data, going through the chunk cache for backed data."""
+        if (
+            self.chunk_size is None
+            or not isinstance(data, h5py.Dataset | CSRDataset)
+            or not isinstance(indexes, np.ndarray)
+        ):
+            return data[indexes]
+
+        # indexes are sorted for backed data, so rows of the same chunk are adjacent
+        chunk_ids = indexes // self.chunk_size
+        splits = np.flatnonzero(np.diff(chunk_ids)) + 1
+        cache = self._chunk_cache.setdefault(key, OrderedDict())
+        sliced_data = []
+        for chunk_indexes in np.split(indexes, splits):
+            chunk_id = chunk_indexes[0] // self.chunk_size
+            start = chunk_id * self.chunk_size
+            if chunk_id in cache:
+                cache.move_to_end(chunk_id)
+            else:
+                cache[chunk_id] = data[start : start + self.chunk_size]
+                if len(cache) > self.n_cached_chunks:
+                    cache.popitem(last=False)
+            sliced_data.append(cache[chunk_id][chunk_indexes - start])
+
+        if isinstance(data, CSRDataset):
+            return vstack(sliced_data, format="csr")
+        return np.concatenate(sliced_data)
+
+    def _can_gather_rows(self, data, indexes: list[int] | np.ndarray | slice) -> bool:
+        """Whether rows can be fetched with :func:`~scvi.data._utils.csr_gather_rows`."""
+        if not isinstance(indexes, list | np.ndarray):
+            return False
+        if isinstance(data, ShardedCSRDataset):
+            # shards are read and concatenated by the dataset itself
+            return False
+        if isinstance(data, CSRDataset):
+            # backed data read through the chunk cache is gathered in memory instead
+            return self.chunk_size is None
+        return issparse(data) and data.format == "csr"
+
+    def _get_indptr(self, key: str, data) -> np.ndarray | None:
+        """Row pointers of backed CSR data, read once per registry key."""
+        if not isinstance(data, CSRDataset):
+            return None
+        if key not in self._indptr_cache:
+            self._indptr_cache[key] = data.group["indptr"][...]
+        return self._indptr_cache[key]
+
     def __getitem__(
         self, indexes: int | list[int] | slice
     ) -> dict[str, np.ndarray | torch.Tensor]:
@@ -128,7 +258,8 @@ class AnnTorchDataset(Dataset):
         if isinstance(indexes, int):
             indexes = [indexes]  # force batched single observations
 
-        if self.adata_manager.adata.isbacked and isinstance(indexes, list | np.ndarray):
+        isbacked = self.adata_manager is not None and self.adata_manager.adata.isbacked
+        if isbacked and isinstance(indexes, list | np.ndarray):
             # need to sort indexes for h5py datasets
             indexes = np.sort(indexes)
 
@@ -138,11 +269,19 @@ class AnnTorchDataset(Dataset):
             data = self.data[key]
 
             if isinstance(data, np.ndarray | h5py.Dataset):
-                sliced_data = data[indexes].astype(dtype, copy=False)
+                sliced_data = self._get_rows(key, data, indexes).astype(dtype, copy=False)
             elif isinstance(data, pd.DataFrame):
                 sliced_data = data.iloc[indexes, :].to_numpy().astype(dtype, copy=False)
+            elif self._can_gather_rows(data, indexes):
+                sliced_data = csr_gather_rows(
+                    data,
+                    indexes,
+                    dtype=dtype,
+                    as_sparse_tensor=self.load_sparse_tensor,
+                    indptr=self._get_indptr(key, data),
+                )
             elif issparse(data) or isinstance(data, SparseDataset):
-                sliced_data = data[indexes].astype(dtype, copy=False)
+                sliced_data = self._get_rows(key, data, indexes).astype(dtype, copy=False)
                 if self.load_sparse_tensor:
                     sliced_data = scipy_to_torch_sparse(sliced_data)
                 else:
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+import pandas as pd
+from anndata.abc import CSCDataset, CSRDataset
+from scipy.sparse import csr_matrix, issparse
+
+from . import _constants
+from ._utils import registry_key_to_default_dtype
+
+if TYPE_CHECKING:
+    from ._manager import AnnDataManager
+
+logger = logging.getLogger(__name__)
+
+_METADATA_FILE = "metadata.json"
+_N_FINGERPRINT_VALUES = 65_536
+_N_HASHED_VALUES = 4_194_304
+
+
+def _registry_hash(adata_manager: AnnDataManager) -> str:
+    """Hash of the parts of the registry that determine the registered data."""
+    registry = adata_manager.registry
+    content = (
+        registry[_constants._SCVI_UUID_KEY],
+        registry.get(_constants._SETUP_ARGS_KEY),
+        registry[_constants._FIELD_REGISTRIES_KEY],
+    )
+    return hashlib.sha256(pickle.dumps(content)).hexdigest()
+
+
+def _is_backed(data) -> bool:
+    """Whether registered data is read from an HDF5 file."""
+    return isinstance(data, h5py.Dataset | CSRDataset | CSCDataset)
+
+
+def _file_stat(adata_manager: AnnDataManager) -> list[int] | None:
+    """Modification time and size of the file of a backed AnnData object."""
+    adata = adata_manager.adata
+    if not adata.isbacked:
+        return None
+    stat = os.stat(adata.filename)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _update_with_dataset(content, dataset: h5py.Dataset):
+    """Hash an HDF5 dataset entirely, reading blocks of consecutive rows."""
+    n_values_per_row = max(1, int(np.prod(dataset.shape[1:])))
+    n_rows = max(1, _N_HASHED_VALUES // n_values_per_row)
+    for start in range(0, dataset.shape[0], n_rows):
+        content.update(np.ascontiguousarray(dataset[start : start + n_rows]).tobytes())
+
+
+def _fingerprint(data) -> str:
+    """Fingerprint of registered data from its layout and its values.
+
+    Backed data is hashed entirely, reading a block of values at a time. In-memory data is
+    fingerprinted from the first and last values of the underlying buffer and a strided subset
+    of it, so that modifications are detected without reading it entirely.
+    """
+    n = _N_FINGERPRINT_VALUES
+    if isinstance(data, pd.DataFrame):
+        data = data.to_numpy()
+
+    datasets = []
+    if issparse(data):
+        values = [data.data[:n], data.data[-n:], data.data[:: max(1, data.nnz // n)]]
+        layout = (data.format, data.nnz)
+    elif isinstance(data, CSRDataset | CSCDataset) and hasattr(data, "group"):
+        values = []
+        datasets = [data.group["data"], data.group["indices"], data.group["indptr"]]
+        layout = (data.format, data.group["data"].shape[0])
+    elif isinstance(data, np.ndarray):
+        flat = data.reshape(-1)
+        values = [flat[:n], flat[-n:], flat[:: max(1, flat.size // n)]]
+        layout = ("dense",)
+    elif isinstance(data, h5py.Dataset) and data.ndim > 0:
+        values = []
+        datasets = [data]
+        layout = ("dense",)
+    else:
+        values = []
+        layout = (type(data).__name__,)
+
+    content = hashlib.sha256(repr((layout, data.shape, str(data.dtype))).encode())
+    for value in values:
+        content.update(np.ascontiguousarray(value).tobytes())
+    for dataset in datasets:
+        _update_with_dataset(content, dataset)
+    return content.hexdigest()
+
+
+def _iter_row_chunks(data, chunk_size: int):
+    """Iterate over consecutive blocks of rows of registered data."""
+    if isinstance(data, pd.DataFrame):
+        data = data.to_numpy()
+    for start in range(0, data.shape[0], chunk_size):
+        yield data[start : start + chunk_size]
+
+
+class FeatureCache:
+    """Typed, memory-mapped copy of the fields of a registered :class:`~anndata.AnnData`.
+
+    Each registered field is written once to ``path`` in the dtype expected by
+    :class:`~scvi.data.AnnTorchDataset`, as a dense array or as a CSR matrix for sparse data,
+    and read back as memory maps. The cache records the UUID of the registered
+    :class:`~anndata.AnnData` object, a hash of the registry, and a fingerprint of each field,
+    which are checked by :meth:`~scvi.data.FeatureCache.is_valid`.
+
+    Use :meth:`~scvi.data.AnnDataManager.compile_feature_cache` to create or reuse a cache,
+    which is then read by all :class:`~scvi.data.AnnTorchDataset` objects of the manager.
+
+    Parameters
+    ----------
+    path
+        Directory of the cache.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with open(self.path / _METADATA_FILE) as f:
+            self.metadata = json.load(f)
+        self._arrays = {}
+
+    def __getstate__(self) -> dict:
+        # memory maps are reopened instead of being copied into child processes
+        state = self.__dict__.copy()
+        state["_arrays"] = {}
+        return state
+
+    @property
+    def keys(self) -> list[str]:
+        """Registry keys stored in the cache."""
+        return list(self.metadata["fields"])
+
+    def is_valid(self, adata_manager: AnnDataManager, check_data: bool = True) -> bool:
+        """Whether the cache matches the data currently registered with ``adata_manager``.
+
+        Parameters
+        ----------
+        adata_manager
+            :class:`~scvi.data.AnnDataManager` object with a registered AnnData object.
+        check_data
+            Whether to also compare the fingerprint of each registered field. Backed fields are
+            hashed entirely, and only if their file was modified since the cache was written.
+            In-memory fields are compared on a sample of their values, so that modifications
+            of other values require ``overwrite=True`` in
+            :meth:`~scvi.data.AnnDataManager.compile_feature_cache`.
+        """
+        if self.metadata["adata_uuid"] != adata_manager.adata_uuid:
+            return False
+        if self.metadata["registry_hash"] != _registry_hash(adata_manager):
+            return False
+        if not check_data:
+            return True
+        # backed fields are only hashed again once their file was modified
+        file_unchanged = _file_stat(adata_manager) == self.metadata.get("file_stat")
+        for key, field in self.metadata["fields"].items():
+            data = adata_manager.get_from_registry(key)
+            if file_unchanged and _is_backed(data):
+                continue
+            if field["fingerprint"] != _fingerprint(data):
+                return False
+        return True
+
+    def __getitem__(self, key: str) -> np.ndarray | csr_matrix:
+        """Read-only memory map of a registered field."""
+        if key not in self._arrays:
+            field = self.metadata["fields"][key]
+            dtype = np.dtype(field["dtype"])
+            shape = tuple(field["shape"])
+            if field["format"] == "csr":
+                nnz = field["nnz"]
+                self._arrays[key] = csr_matrix(
+                    (
+                        self._memmap(f"{key}.data", dtype, (nnz,)),
+                        self._memmap(f"{key}.indices", np.dtype(field["index_dtype"]), (nnz,)),
+                        self._memmap(f"{key}.indptr", np.int64, (shape[0] + 1,)),
+                    ),
+                    shape=shape,
+                )
+            else:
+                self._arrays[key] = self._memmap(f"{key}.data", dtype, shape)
+        return self._arrays[key]
+
+    def _memmap(self, name: str, dtype: np.dtype, shape: tuple) -> np.ndarray:
+        if 0 in shape:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path / name, dtype=dtype, mode="r", shape=shape)
+
+    @classmethod
+    def write(
+        cls,
+        adata_manager: AnnDataManager,
+        path: str | os.PathLike,
+        chunk_size: int = 10_000,
+    ) -> FeatureCache:
+        """Write the data registered with ``adata_manager`` to a new cache.
+
+        Fields are read and written ``chunk_size`` rows at a time, so that backed data is never
+        loaded into memory entirely. The cache is written to a temporary directory that is
+        moved to ``path`` once complete.
+
+        Parameters
+        ----------
+        adata_manager
+            :class:`~scvi.data.AnnDataManager` object with a registered AnnData object.
+        path
+            Directory of the cache. Replaced if it already exists.
+        chunk_size
+            Number of rows written at a time.
+
+        Returns
+        -------
+        :class:`~scvi.data.FeatureCache`
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        fields = {}
+        for key in adata_manager.data_registry:
+            data = adata_manager.get_from_registry(key)
+            if not hasattr(data, "shape"):
+                # e.g. the minification type, stored as a string
+                continue
+            dtype = np.dtype(registry_key_to_default_dtype(key))
+            if issparse(data) or isinstance(data, CSRDataset | CSCDataset):
+                field = cls._write_csr(tmp_path, key, data, dtype, chunk_size)
+            else:
+                field = cls._write_dense(tmp_path, key, data, dtype, chunk_size)
+            field["fingerprint"] = _fingerprint(data)
+            fields[key] = field
+
+        metadata = {
+            "adata_uuid": adata_manager.adata_uuid,
+            "registry_hash": _registry_hash(adata_manager),
+            "file_stat": _file_stat(adata_manager),
+            "fields": fields,
+        }
+        with open(tmp_path / _METADATA_FILE, "w") as f:
+            json.dump(metadata, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        tmp_path.rename(path)
+        return cls(path)
+
+    @staticmethod
+    def _write_dense(path: Path, key: str, data, dtype: np.dtype, chunk_size: int) -> dict:
+        with open(path / f"{key}.data", "wb") as f:
+            for chunk in _iter_row_chunks(data, chunk_size):
+                f.write(np.ascontiguousarray(chunk, dtype=dtype).tobytes())
+        return {"format": "dense", "dtype": dtype.str, "shape": list(data.shape)}
+
+    @staticmethod
+    def _write_csr(path: Path, key: str, data, dtype: np.dtype, chunk_size: int) -> dict:
+        index_dtype = np.dtype(np.int32 if data.shape[1] <= np.iinfo(np.int32).max else np.int64)
+        indptr = np.zeros(data.shape[0] + 1, dtype=np.int64)
+        nnz = 0
+        with (
+            open(path / f"{key}.data", "wb") as f_data,
+            open(path / f"{key}.indices", "wb") as f_indices,
+        ):
+            for i, chunk in enumerate(_iter_row_chunks(data, chunk_size)):
+                chunk = csr_matrix(chunk)
+                chunk.sort_indices()
+                start = i * chunk_size
+                indptr[start + 1 : start + chunk.shape[0] + 1] = chunk.indptr[1:] + nnz
+                nnz += chunk.nnz
+                f_data.write(chunk.data.astype(dtype, copy=False).tobytes())
+                f_indices.write(chunk.indices.astype(index_dtype, copy=False).tobytes())
+        indptr.tofile(path / f"{key}.indptr")
+        return {
+            "format": "csr",
+            "dtype": dtype.str,
+            "index_dtype": index_dtype.str,
+            "shape": list(data.shape),
+            "nnz": int(nnz),
+        }
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import logging
 import sys
 from collections import defaultdict
 from copy import deepcopy
 from dataclasses import dataclass
 from io import StringIO
+from pathlib import Path
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
+import numpy as np
 import rich
 from mudata import MuData
 from rich.console import Console
@@ -18,6 +21,8 @@ from scvi.utils import attrdict
 
 from . import _constants
 from ._anntorchdataset import AnnTorchDataset
+from ._feature_cache import _METADATA_FILE, FeatureCache, _fingerprint, _registry_hash
+from ._shared_memory import SharedField
 from ._utils import (
     _assign_adata_uuid,
     _check_if_view,
@@ -26,15 +31,17 @@ from ._utils import (
 )
 
 if TYPE_CHECKING:
+    import os
     from collections.abc import Sequence
 
-    import numpy as np
     import pandas as pd
 
     from scvi._types import AnnOrMuData
 
     from .fields import AnnDataField
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class AnnDataManagerValidationCheck:
@@ -95,6 +102,8 @@ class AnnDataManager:
         self.adata = None
         self.fields = fields or []
         self.validation_checks = validation_checks or AnnDataManagerValidationCheck()
+        self.feature_cache = None
+        self._shared_fields = {}
         self._registry = {
             _constants._SCVI_VERSION_KEY: scvi.__version__,
             _constants._MODEL_NAME_KEY: None,
@@ -332,6 +341,9 @@ class AnnDataManager:
         indices: Sequence[int] | Sequence[bool] = None,
         data_and_attributes: list[str] | dict[str, np.dtype] | None = None,
         load_sparse_tensor: bool = False,
+        chunk_size: int | None = None,
+        n_cached_chunks: int = 16,
+        shared_memory: bool = False,
     ) -> AnnTorchDataset:
         """
         Creates a torch dataset from the AnnData object registered with this instance.
@@ -350,6 +362,15 @@ class AnnDataManager:
             ``EXPERIMENTAL`` If ``True``, loads data with sparse CSR or CSC layout as a
             :class:`~torch.Tensor` with the same layout. Can lead to speedups in data transfers to
             GPUs, depending on the sparsity of the data.
+        chunk_size
+            If not ``None``, backed data is read in chunks of ``chunk_size`` consecutive rows
+            that are cached in memory.
+        n_cached_chunks
+            Maximum number of chunks cached per registry key if ``chunk_size`` is not ``None``.
+        shared_memory
+            Whether to copy the registered data into shared memory segments that data loader
+            workers attach to without copying. The segments are published once by this
+            instance and shared by all datasets created with ``shared_memory=True``.
 
         Returns
         -------
@@ -359,12 +380,86 @@ class AnnDataManager:
             self,
             getitem_tensors=data_and_attributes,
             load_sparse_tensor=load_sparse_tensor,
+            chunk_size=chunk_size,
+            n_cached_chunks=n_cached_chunks,
+            shared_memory=shared_memory,
         )
         if indices is not None:
             # This is a lazy subset, it just remaps indices
             dataset = Subset(dataset, indices)
         return dataset
 
+    def compile_feature_cache(
+        self,
+        cache_dir: str | os.PathLike | None = None,
+        overwrite: bool = False,
+        chunk_size: int = 10_000,
+    ) -> FeatureCache:
+        """Write the registered data to a typed, memory-mapped :class:`~scvi.data.FeatureCache`.
+
+        The cache is stored in ``cache_dir`` in a directory named after the UUID of the
+        registered AnnData object and a hash of the registry, so that it is reused across
+        managers and sessions registering the same data with the same setup, e.g. across
+        repeated trainings. An existing cache is rewritten if the registered data changed since
+        it was written. Datasets created by this instance read from the cache afterwards.
+
+        Parameters
+        ----------
+        cache_dir
+            Directory under which caches are stored. Defaults to ``"cache"`` under
+            :attr:`scvi.settings.logging_dir`.
+        overwrite
+            Whether to rewrite the cache even if it is valid.
+        chunk_size
+            Number of rows written at a time.
+
+        Returns
+        -------
+        :class:`~scvi.data.FeatureCache`
+        """
+        self._assert_anndata_registered()
+
+        if cache_dir is None:
+            cache_dir = scvi.settings.logging_dir / "cache"
+        path = Path(cache_dir) / f"{self.adata_uuid}_{_registry_hash(self)[:16]}"
+
+        cache = None
+        if not overwrite and (path / _METADATA_FILE).exists():
+            cache = FeatureCache(path)
+            if cache.is_valid(self):
+                logger.info(f"Reusing the feature cache at {path}.")
+            else:
+                logger.info(f"Registered data changed since {path} was written.")
+                cache = None
+        if cache is None:
+            logger.info(f"Writing the feature cache to {path}.")
+            cache = FeatureCache.write(self, path, chunk_size=chunk_size)
+
+        self.feature_cache = cache
+        return cache
+
+    def _get_shared_field(self, registry_key: str, dtype: np.dtype, data) -> SharedField:
+        """Copy of registered data in shared memory, published once per key and dtype.
+
+        Segments are keyed by the hash of the registry, as for the feature cache, and published
+        again if the registered data changed since they were written. They are removed once
+        this instance is garbage collected.
+        """
+        registry_hash = _registry_hash(self)
+        cache_key = (registry_hash, registry_key, np.dtype(dtype).str)
+        fingerprint = _fingerprint(data)
+        fields = {
+            key: value for key, value in self._shared_fields.items() if key[0] == registry_hash
+        }
+        if cache_key not in fields or fields[cache_key][0] != fingerprint:
+            fields[cache_key] = (fingerprint, SharedField(data, dtype))
+            logger.info(
+                f"Copied {fields[cache_key][1].nbytes / 1024**2:.1f} MB of {registry_key} to "
+                "shared memory."
+            )
+        self._shared_fields = fields
+        return fields[cache_key][1]
+
     @staticmethod
     def _get_data_registry_from_registry(registry: dict) -> attrdict:
         data_registry = {}
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import logging
+import os
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+import pandas as pd
+from anndata import AnnData
+from anndata.abc import CSRDataset
+from anndata.io import read_elem, sparse_dataset
+from scipy.sparse import csr_matrix, vstack
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedCSRDataset(CSRDataset):
+    """Row-concatenation of the data matrices of several on-disk ``.h5ad`` shards.
+
+    Global observation indices are mapped to a shard and a local row within it, so that rows
+    can be read without ever materializing the concatenated matrix. Open file handles are kept
+    in a least-recently-used cache of bounded size, and are reopened in each process, which
+    makes instances safe to use from data loader workers.
+
+    Parameters
+    ----------
+    paths
+        Paths to the ``.h5ad`` shards, in the order of their observations.
+    n_obs
+        Number of observations of each shard.
+    n_vars
+        Number of variables, shared by all shards.
+    dtype
+        Data type of the data matrices.
+    layer
+        Layer to read from each shard. If ``None``, reads ``X``.
+    max_open_files
+        Maximum number of shards kept open at the same time.
+    """
+
+    format = "csr"
+    backend = "hdf5"
+
+    def __init__(
+        self,
+        paths: Sequence[str | os.PathLike],
+        n_obs: Sequence[int],
+        n_vars: int,
+        dtype: np.dtype,
+        layer: str | None = None,
+        max_open_files: int = 8,
+    ):
+        if max_open_files < 1:
+            raise ValueError("`max_open_files` must be positive.")
+
+        self.paths = [str(path) for path in paths]
+        self.offsets = np.concatenate([[0], np.cumsum(n_obs)]).astype(np.int64)
+        self.shape = (int(self.offsets[-1]), int(n_vars))
+        self.dtype = np.dtype(dtype)
+        self.layer = layer
+        self.max_open_files = max_open_files
+        self._handles = OrderedDict()
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_handles"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._pid = os.getpid()
+
+    def _get_shard(self, shard: int):
+        """Get the data matrix of a shard, opening its file if necessary."""
+        if self._pid != os.getpid():
+            # handles inherited from a forked parent process must not be reused
+            self._handles = OrderedDict()
+            self._pid = os.getpid()
+
+        if shard in self._handles:
+            self._handles.move_to_end(shard)
+            return self._handles[shard][1]
+
+        file = h5py.File(self.paths[shard], "r")
+        elem = file["X"] if self.layer is None else file["layers"][self.layer]
+        matrix = elem if isinstance(elem, h5py.Dataset) else sparse_dataset(elem)
+        self._handles[shard] = (file, matrix)
+        if len(self._handles) > self.max_open_files:
+            _, (evicted_file, _) = self._handles.popitem(last=False)
+            evicted_file.close()
+        return matrix
+
+    def _read_rows(self, rows: npt.NDArray) -> csr_matrix:
+        """Read sorted, unique global rows shard by shard."""
+        shard_ids = np.searchsorted(self.offsets, rows, side="right") - 1
+        splits = np.flatnonzero(np.diff(shard_ids)) + 1
+        sliced_data = []
+        for shard, shard_rows in zip(
+            shard_ids[np.concatenate([[0], splits])], np.split(rows, splits), strict=False
+        ):
+            local_rows = shard_rows - self.offsets[shard]
+            if local_rows[-1] - local_rows[0] + 1 == len(local_rows):
+                local_rows = slice(int(local_rows[0]), int(local_rows[-1]) + 1)
+            sliced_data.append(csr_matrix(self._get_shard(int(shard))[local_rows]))
+        if len(sliced_data) == 0:
+            return csr_matrix((0, self.shape[1]), dtype=self.dtype)
+        return vstack(sliced_data, format="csr")
+
+    def __getitem__(self, index) -> csr_matrix:
+        """Read observations from the shards into memory.
+
+        Parameters
+        ----------
+        index
+            Row index, or tuple of row and column indices.
+
+        Returns
+        -------
+        The selected rows as a :class:`~scipy.sparse.csr_matrix`, in the order of ``index``.
+        """
+        col_index = None
+        if isinstance(index, tuple):
+            index, col_index = index
+
+        if isinstance(index, slice):
+            rows = np.arange(*index.indices(self.shape[0]))
+        else:
+            rows = np.asarray(index).reshape(-1)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            rows = np.where(rows < 0, rows + self.shape[0], rows).astype(np.int64)
+
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        data = self._read_rows(unique_rows)
+        if len(unique_rows) != len(rows) or np.any(unique_rows != rows):
+            data = data[inverse]
+        if col_index is not None:
+            data = data[:, col_index]
+        return data
+
+    def to_memory(self) -> csr_matrix:
+        """Load all shards into memory as a single :class:`~scipy.sparse.csr_matrix`."""
+        return self[:]
+
+    def close(self):
+        """Close all open shard files."""
+        while self._handles:
+            _, (file, _) = self._handles.popitem()
+            file.close()
+
+
+def read_h5ad_shards(
+    paths: Sequence[str | os.PathLike],
+    layer: str | None = None,
+    label: str | None = None,
+    max_open_files: int = 8,
+) -> AnnData:
+    """Read several ``.h5ad`` shards as one :class:`~anndata.AnnData` without loading their data.
+
+    The annotations of all shards are loaded into memory and concatenated, while the data
+    matrix is a :class:`~scvi.data.ShardedCSRDataset` that reads observations from the shards
+    on demand. The returned object can be registered with ``setup_anndata`` and used to train
+    models like any other :class:`~anndata.AnnData`.
+
+    Parameters
+    ----------
+    paths
+        Paths to the ``.h5ad`` shards. All shards must share the same ``var_names``.
+    layer
+        Layer to read from each shard as the data matrix. If ``None``, reads ``X``.
+    label
+        If not ``None``, name of the ``.obs`` column recording the index of the shard of each
+        observation.
+    max_open_files
+        Maximum number of shards kept open at the same time.
+
+    Returns
+    -------
+    :class:`~anndata.AnnData` object with a :class:`~scvi.data.ShardedCSRDataset` as ``.X``.
+
+    Notes
+    -----
+    The returned object cannot be written to disk with its data matrix. Save models with
+    ``save_anndata=False``.
+    """
+    if len(paths) == 0:
+        raise ValueError("`paths` must contain at least one shard.")
+
+    obs, n_obs, var, dtype = [], [], None, None
+    for path in paths:
+        with h5py.File(path, "r") as file:
+            shard_obs = read_elem(file["obs"])
+            shard_var = read_elem(file["var"])
+            elem = file["X"] if layer is None else file["layers"][layer]
+            shard_dtype = elem.dtype if isinstance(elem, h5py.Dataset) else elem["data"].dtype
+
+        if var is None:
+            var, dtype = shard_var, shard_dtype
+        elif not var.index.equals(shard_var.index):
+            raise ValueError(f"The `var_names` of shard {path} differ from the first shard.")
+        obs.append(shard_obs)
+        n_obs.append(len(shard_obs))
+
+    X = ShardedCSRDataset(
+        paths,
+        n_obs=n_obs,
+        n_vars=len(var),
+        dtype=dtype,
+        layer=layer,
+        max_open_files=max_open_files,
+    )
+    if label is not None:
+        for i, shard_obs in enumerate(obs):
+            shard_obs[label] = i
+    obs = pd.concat(obs, join="outer")
+    if label is not None:
+        obs[label] = obs[label].astype("category")
+
+    adata = AnnData(X=X, obs=obs, var=var)
+    if not adata.obs_names.is_unique:
+        logger.info("Observation names are not unique across shards, making them unique.")
+        adata.obs_names_make_unique()
+    return adata
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csc_matrix, csr_matrix, issparse
+
+_SHARED_MEMORY_DIR = "/dev/shm"
+_SPARSE_MATRICES = {"csr": csr_matrix, "csc": csc_matrix}
+
+
+def _shared_memory_dir() -> str:
+    """Directory of shared memory segments, backed by RAM where available."""
+    if os.path.isdir(_SHARED_MEMORY_DIR) and os.access(_SHARED_MEMORY_DIR, os.W_OK):
+        return _SHARED_MEMORY_DIR
+    return tempfile.gettempdir()
+
+
+def _remove_segment(path: str, owner_pid: int):
+    # forked children inherit the finalizer but must not remove the parent's segment
+    if os.getpid() == owner_pid:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class SharedArray:
+    """Read-only array stored once in a shared memory segment.
+
+    The array is written to a memory-mapped file in ``/dev/shm`` (or the temporary directory
+    where unavailable). Pickled instances only record the path, shape and dtype of the
+    segment, and attach to it when first accessed, so that processes share the same physical
+    pages instead of holding their own copy. The segment is removed once the instance that
+    created it is garbage collected.
+
+    Parameters
+    ----------
+    array
+        Array to copy into shared memory.
+    dtype
+        Data type of the shared array. Defaults to the data type of ``array``.
+    """
+
+    def __init__(self, array: np.ndarray, dtype: np.dtype | None = None):
+        array = np.asarray(array)
+        self.shape = array.shape
+        self.dtype = np.dtype(dtype or array.dtype)
+        fd, self.path = tempfile.mkstemp(prefix="scvi_", suffix=".shm", dir=_shared_memory_dir())
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove_segment, self.path, os.getpid())
+        self._array = self._open("r+")
+        self._array[...] = array
+        self._array.flags.writeable = False
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "shape": self.shape, "dtype": self.dtype}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._array = None
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the segment in bytes."""
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    @property
+    def array(self) -> np.ndarray:
+        """Read-only view of the shared segment."""
+        if self._array is None:
+            self._array = self._open("r")
+        return self._array
+
+    def _open(self, mode: str) -> np.ndarray:
+        if self.nbytes == 0:
+            return np.zeros(self.shape, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode=mode, shape=self.shape)
+
+
+class SharedField:
+    """Registered field copied to shared memory as a dense array or as CSR or CSC components.
+
+    Parameters
+    ----------
+    data
+        Registered data, as returned by :meth:`~scvi.data.AnnDataManager.get_from_registry`.
+        :class:`~pandas.DataFrame` objects are converted to arrays. CSC matrices keep their
+        layout and other sparse matrices are converted to CSR.
+    dtype
+        Data type of the shared values. Indices of sparse matrices keep an integer dtype.
+    """
+
+    def __init__(self, data, dtype: np.dtype):
+        if isinstance(data, pd.DataFrame):
+            data = data.to_numpy()
+        self.shape = data.shape
+        if issparse(data):
+            # sorted into a copy, leaving the registered data untouched
+            self.format = "csc" if data.format == "csc" else "csr"
+            data = _SPARSE_MATRICES[self.format](data).sorted_indices()
+            # a common index dtype avoids copies when reassembling the matrix
+            index_dtype = np.promote_types(data.indices.dtype, data.indptr.dtype)
+            self.arrays = [
+                SharedArray(data.data, dtype=dtype),
+                SharedArray(data.indices, dtype=index_dtype),
+                SharedArray(data.indptr, dtype=index_dtype),
+            ]
+        else:
+            self.format = "dense"
+            self.arrays = [SharedArray(data, dtype=dtype)]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the shared segments in bytes."""
+        return sum(array.nbytes for array in self.arrays)
+
+    def get(self) -> np.ndarray | csr_matrix | csc_matrix:
+        """Zero-copy view of the shared field."""
+        if self.format in _SPARSE_MATRICES:
+            matrix = _SPARSE_MATRICES[self.format](self.shape, dtype=self.arrays[0].dtype)
+            # assigned directly, as the constructor may copy memory-mapped arrays
+            matrix.data, matrix.indices, matrix.indptr = (array.array for array in self.arrays)
+            return matrix
+        return self.arrays[0].array
@@ -13,6 +13,7 @@ from anndata import AnnData
 from anndata.abc import CSCDataset, CSRDataset
 from anndata.io import read_elem
 from mudata import MuData
+from numba import njit
 from torch import as_tensor, sparse_csc_tensor, sparse_csr_tensor
 
 from scvi import REGISTRY_KEYS, settings
@@ -84,6 +85,103 @@ def scipy_to_torch_sparse(x: sp_sparse.csr_matrix | sp_sparse.csc_matrix) -> Ten
         )
 
 
+@njit(nogil=True)
+def _csr_gather_dense(indptr, indices, data, rows, out):
+    for i in range(rows.shape[0]):
+        row = rows[i]
+        for j in range(indptr[row], indptr[row + 1]):
+            # duplicate entries are summed, as in scipy
+            out[i, indices[j]] += data[j]
+
+
+@njit(nogil=True)
+def _csr_gather_sparse(indptr, indices, data, rows, out_indptr, out_indices, out_data):
+    k = 0
+    for i in range(rows.shape[0]):
+        row = rows[i]
+        for j in range(indptr[row], indptr[row + 1]):
+            out_indices[k] = indices[j]
+            out_data[k] = data[j]
+            k += 1
+        out_indptr[i + 1] = k
+
+
+def csr_gather_rows(
+    x: sp_sparse.csr_matrix | CSRDataset,
+    rows: npt.ArrayLike,
+    dtype: np.dtype = np.float32,
+    as_sparse_tensor: bool = False,
+    indptr: npt.NDArray | None = None,
+) -> npt.NDArray | Tensor:
+    """Gathers rows of a CSR matrix directly into a dense array or a sparse CSR tensor.
+
+    Copies the selected rows from the buffers of ``x`` straight into the output in a single
+    pass, avoiding the intermediate copies of SciPy fancy indexing,
+    :meth:`~scipy.sparse.csr_matrix.astype`, and :meth:`~scipy.sparse.csr_matrix.toarray`.
+
+    Parameters
+    ----------
+    x
+        CSR matrix to gather rows from. Can be an in-memory :class:`~scipy.sparse.csr_matrix`
+        or a backed :class:`~anndata.abc.CSRDataset`, in which case each run of consecutive
+        rows is read from disk with a single slice.
+    rows
+        Indices of the rows to gather.
+    dtype
+        Data type of the output.
+    as_sparse_tensor
+        If ``True``, returns a :class:`~torch.Tensor` with the sparse CSR layout. Otherwise,
+        returns a dense :class:`~numpy.ndarray`.
+    indptr
+        Row pointers of ``x``. Can be passed to avoid re-reading them for backed data.
+
+    Returns
+    -------
+    The selected rows of ``x``, in the order of ``rows``.
+    """
+    rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+    n_rows, n_cols = len(rows), x.shape[1]
+
+    if isinstance(x, CSRDataset):
+        group = x.group
+        if indptr is None:
+            indptr = group["indptr"][...]
+        starts, ends = indptr[rows], indptr[rows + 1]
+        # one read per run of consecutive rows, after which the rows are contiguous in memory
+        run_starts = np.flatnonzero(np.diff(rows, prepend=-2) != 1)
+        run_ends = np.append(run_starts[1:], n_rows)[: len(run_starts)] - 1
+        spans = [slice(starts[i], ends[j]) for i, j in zip(run_starts, run_ends, strict=True)]
+        indices = np.concatenate(
+            [group["indices"][span] for span in spans]
+            or [np.zeros(0, dtype=group["indices"].dtype)]
+        )
+        data = np.concatenate(
+            [group["data"][span] for span in spans] or [np.zeros(0, dtype=group["data"].dtype)]
+        )
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(ends - starts, out=indptr[1:])
+        rows = np.arange(n_rows)
+    else:
+        indptr, indices, data = x.indptr, x.indices, x.data
+
+    if as_sparse_tensor:
+        nnz = int((indptr[rows + 1] - indptr[rows]).sum())
+        out_indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        out_indices = np.empty(nnz, dtype=np.int64)
+        out_data = np.empty(nnz, dtype=dtype)
+        _csr_gather_sparse(indptr, indices, data, rows, out_indptr, out_indices, out_data)
+        return sparse_csr_tensor(
+            as_tensor(out_indptr),
+            as_tensor(out_indices),
+            as_tensor(out_data),
+            size=(n_rows, n_cols),
+        )
+
+    out = np.zeros((n_rows, n_cols), dtype=dtype)
+    _csr_gather_dense(indptr, indices, data, rows, out)
+    return out
+
+
 def get_anndata_attribute(
     adata: AnnOrMuData,
     attr_name: str,
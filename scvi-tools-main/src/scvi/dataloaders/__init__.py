@@ -8,7 +8,7 @@ from ._data_splitting import (
     DeviceBackedDataSplitter,
     SemiSupervisedDataSplitter,
 )
-from ._samplers import BatchDistributedSampler
+from ._samplers import BatchDistributedSampler, ChunkedBatchSampler, StratifiedBatchSampler
 from ._semi_dataloader import SemiSupervisedDataLoader
 
 __all__ = [
@@ -20,4 +20,6 @@ __all__ = [
     "DataSplitter",
     "SemiSupervisedDataSplitter",
     "BatchDistributedSampler",
+    "ChunkedBatchSampler",
+    "StratifiedBatchSampler",
 ]
@@ -2,6 +2,7 @@ import copy
 import logging
 
 import numpy as np
+import torch
 from torch.utils.data import (
     BatchSampler,
     DataLoader,
@@ -13,7 +14,8 @@ from torch.utils.data import (
 from scvi import settings
 from scvi.data import AnnDataManager
 
-from ._samplers import BatchDistributedSampler
+from ._prefetch import PrefetchIterator, PrefetchStatistics
+from ._samplers import BatchDistributedSampler, ChunkedBatchSampler
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +38,9 @@ class AnnDataLoader(DataLoader):
     sampler
         Defines the strategy to draw samples from the dataset. Can be any Iterable with __len__
         implemented. If specified, shuffle must not be specified. By default, we use a custom
-        sampler that is designed to get a minibatch of data with one call to __getitem__.
+        sampler that is designed to get a minibatch of data with one call to __getitem__. If
+        a :class:`~torch.utils.data.BatchSampler`, each minibatch it yields is loaded with one
+        call to __getitem__ as well.
     drop_last
         If `True` and the dataset is not evenly divisible by `batch_size`, the last
         incomplete batch is dropped. If `False` and the dataset is not evenly divisible
@@ -56,10 +60,42 @@ class AnnDataLoader(DataLoader):
     distributed_sampler
         ``EXPERIMENTAL`` Whether to use :class:`~scvi.dataloaders.BatchDistributedSampler` as the
         sampler. If `True`, `sampler` must be `None`.
+    contiguous_shards
+        Only used if `distributed_sampler` is `True`. Whether each replica loads a contiguous
+        shard of the rows of the :class:`~anndata.AnnData` object, which reduces the data read
+        by each replica for backed :class:`~anndata.AnnData` objects.
+    shuffle_buffer_size
+        Only used if `distributed_sampler` and `contiguous_shards` are `True`. Size of the
+        windows of consecutive rows that observations are shuffled within. If ``None``, each
+        replica shuffles its whole shard.
     load_sparse_tensor
         ``EXPERIMENTAL`` If ``True``, loads data with sparse CSR or CSC layout as a
         :class:`~torch.Tensor` with the same layout. Can lead to speedups in data transfers to
         GPUs, depending on the sparsity of the data.
+    chunk_size
+        If not ``None``, uses :class:`~scvi.dataloaders.ChunkedBatchSampler` as the sampler,
+        which shuffles chunks of ``chunk_size`` consecutive observations instead of single
+        observations, and reads backed data in whole chunks. Recommended for backed
+        :class:`~anndata.AnnData` objects. If not ``None``, `sampler` must be `None`.
+    chunks_per_buffer
+        Only used if `chunk_size` is not ``None``. Number of chunks whose observations are
+        shuffled together. Trades shuffle quality for memory: up to ``2 * chunks_per_buffer``
+        chunks of backed data are kept in memory per worker.
+    prefetch_depth
+        ``EXPERIMENTAL`` Number of minibatches prepared ahead of the consumer in a background
+        thread, which densifies sparse tensors and, for CUDA devices, copies minibatches to
+        ``prefetch_device`` through pinned memory on a side stream. Disabled if ``0``. Defaults
+        to ``scvi.settings.dl_prefetch_depth``. Queue-starvation counters are collected in
+        :attr:`prefetch_statistics`.
+    prefetch_device
+        Device that prefetched minibatches are transferred to. If ``None``, minibatches are
+        prepared on the host.
+    shared_memory
+        ``EXPERIMENTAL`` Whether to copy the registered data once into shared memory segments
+        that workers attach to without copying, so that memory usage does not grow with
+        ``num_workers``. The segments are shared by all data loaders of ``adata_manager``, and
+        are not published if ``num_workers`` is ``0``. Requires an in-memory
+        :class:`~anndata.AnnData` object. Defaults to ``scvi.settings.dl_shared_memory``.
     **kwargs
         Additional keyword arguments passed into :class:`~torch.utils.data.DataLoader`.
 
@@ -83,7 +119,14 @@ class AnnDataLoader(DataLoader):
         data_and_attributes: list[str] | dict[str, np.dtype] | None = None,
         iter_ndarray: bool = False,
         distributed_sampler: bool = False,
+        contiguous_shards: bool = False,
+        shuffle_buffer_size: int | None = None,
         load_sparse_tensor: bool = False,
+        chunk_size: int | None = None,
+        chunks_per_buffer: int = 8,
+        prefetch_depth: int | None = None,
+        prefetch_device: torch.device | str | None = None,
+        shared_memory: bool | None = None,
         **kwargs,
     ):
         if indices is None:
@@ -93,24 +136,49 @@ class AnnDataLoader(DataLoader):
                 indices = np.where(indices)[0].ravel()
             indices = np.asarray(indices)
         self.indices = indices
+        if "num_workers" not in kwargs:
+            kwargs["num_workers"] = settings.dl_num_workers
+        if "persistent_workers" not in kwargs:
+            kwargs["persistent_workers"] = settings.dl_persistent_workers
+        if shared_memory is None:
+            shared_memory = settings.dl_shared_memory and not adata_manager.adata.isbacked
+        # the main process reads the data directly without workers
+        shared_memory = shared_memory and kwargs["num_workers"] > 0
         self.dataset = adata_manager.create_torch_dataset(
             indices=indices,
             data_and_attributes=data_and_attributes,
             load_sparse_tensor=load_sparse_tensor,
+            chunk_size=chunk_size,
+            n_cached_chunks=2 * chunks_per_buffer,
+            shared_memory=shared_memory,
         )
-        if "num_workers" not in kwargs:
-            kwargs["num_workers"] = settings.dl_num_workers
-        if "persistent_workers" not in kwargs:
-            kwargs["persistent_workers"] = settings.dl_persistent_workers
 
         self.kwargs = copy.deepcopy(kwargs)
 
         if sampler is not None and distributed_sampler:
             raise ValueError("Cannot specify both `sampler` and `distributed_sampler`.")
+        if chunk_size is not None and (sampler is not None or distributed_sampler):
+            raise ValueError(
+                "Cannot specify `chunk_size` together with `sampler` or `distributed_sampler`."
+            )
 
         # custom sampler for efficient minibatching on sparse matrices
+        batched_sampler = sampler is None or isinstance(sampler, BatchSampler)
         if sampler is None:
-            if not distributed_sampler:
+            if chunk_size is not None:
+                sampler = ChunkedBatchSampler(
+                    indices,
+                    batch_size=batch_size,
+                    chunk_size=chunk_size,
+                    chunks_per_buffer=chunks_per_buffer,
+                    shuffle=shuffle,
+                    drop_last=drop_last,
+                )
+                logger.info(
+                    f"Using chunked sampling with an effective shuffle buffer of "
+                    f"{sampler.buffer_size} observations."
+                )
+            elif not distributed_sampler:
                 sampler_cls = SequentialSampler if not shuffle else RandomSampler
                 sampler = BatchSampler(
                     sampler=sampler_cls(self.dataset),
@@ -123,8 +191,11 @@ class AnnDataLoader(DataLoader):
                     batch_size=batch_size,
                     drop_last=drop_last,
                     drop_dataset_tail=drop_dataset_tail,
+                    contiguous_shards=contiguous_shards,
+                    shuffle_buffer_size=shuffle_buffer_size,
                     shuffle=shuffle,
                 )
+        if batched_sampler:
             # do not touch batch size here, sampler gives batched indices
             # This disables PyTorch automatic batching, which is necessary
             # for fast access to sparse matrices
@@ -135,4 +206,29 @@ class AnnDataLoader(DataLoader):
         if iter_ndarray:
             self.kwargs.update({"collate_fn": lambda x: x})
 
+        # prefetching converts minibatches, which does not apply to numpy arrays
+        if prefetch_depth is None:
+            prefetch_depth = settings.dl_prefetch_depth
+        self.prefetch_depth = 0 if iter_ndarray else prefetch_depth
+        self.prefetch_device = prefetch_device
+        self.prefetch_statistics = PrefetchStatistics()
+        self._prefetch_iterator = None
+
         super().__init__(self.dataset, **self.kwargs)
+
+    def __iter__(self):
+        """Iterate over minibatches, prefetching them if ``prefetch_depth > 0``."""
+        if self.prefetch_depth == 0:
+            return super().__iter__()
+
+        # persistent workers reuse the underlying iterator, so the previous epoch's
+        # background thread must be done with it first
+        if self._prefetch_iterator is not None:
+            self._prefetch_iterator.close()
+        self._prefetch_iterator = PrefetchIterator(
+            super().__iter__(),
+            depth=self.prefetch_depth,
+            device=self.prefetch_device,
+            statistics=self.prefetch_statistics,
+        )
+        return self._prefetch_iterator
@@ -1,3 +1,4 @@
+import logging
 import warnings
 from math import ceil, floor
 
@@ -9,17 +10,20 @@ from torch.utils.data import (
     DataLoader,
     Dataset,
     RandomSampler,
+    Sampler,
     SequentialSampler,
 )
 
 from scvi import REGISTRY_KEYS, settings
 from scvi.data import AnnDataManager
-from scvi.data._utils import get_anndata_attribute
+from scvi.data._utils import get_anndata_attribute, registry_key_to_default_dtype
 from scvi.dataloaders._ann_dataloader import AnnDataLoader
 from scvi.dataloaders._semi_dataloader import SemiSupervisedDataLoader
 from scvi.model._utils import parse_device_args
 from scvi.utils._docstrings import devices_dsp
 
+logger = logging.getLogger(__name__)
+
 
 def validate_data_split(
     n_samples: int,
@@ -288,6 +292,16 @@ class DataSplitter(pl.LightningDataModule):
 
     def train_dataloader(self):
         """Create train data loader."""
+        data_loader_kwargs = self.data_loader_kwargs
+        prefetch_depth = data_loader_kwargs.get("prefetch_depth", None)
+        if prefetch_depth is None:
+            prefetch_depth = settings.dl_prefetch_depth
+        if prefetch_depth > 0 and self.trainer is not None:
+            # transfer prefetched minibatches to the training device ahead of the trainer
+            data_loader_kwargs = {
+                "prefetch_device": self.trainer.strategy.root_device,
+                **data_loader_kwargs,
+            }
         return self.data_loader_cls(
             self.adata_manager,
             indices=self.train_idx,
@@ -295,7 +309,7 @@ class DataSplitter(pl.LightningDataModule):
             drop_last=self.drop_last,
             load_sparse_tensor=self.load_sparse_tensor,
             pin_memory=self.pin_memory,
-            **self.data_loader_kwargs,
+            **data_loader_kwargs,
         )
 
     def val_dataloader(self):
@@ -329,12 +343,21 @@ class DataSplitter(pl.LightningDataModule):
             pass
 
     def on_after_batch_transfer(self, batch, dataloader_idx):
-        """Converts sparse tensors to dense if necessary."""
+        """Converts sparse tensors to dense if necessary.
+
+        The sparse counts are also kept under ``REGISTRY_KEYS.X_SPARSE_KEY``, so that modules
+        can evaluate their likelihood on the nonzero counts only.
+        """
         if self.load_sparse_tensor:
+            sparse_x = None
             for key, val in batch.items():
                 layout = val.layout if isinstance(val, torch.Tensor) else None
                 if layout is torch.sparse_csr or layout is torch.sparse_csc:
+                    if key == REGISTRY_KEYS.X_KEY:
+                        sparse_x = val
                     batch[key] = val.to_dense()
+            if sparse_x is not None:
+                batch[REGISTRY_KEYS.X_SPARSE_KEY] = sparse_x
 
         return batch
 
@@ -592,6 +615,17 @@ class DeviceBackedDataSplitter(DataSplitter):
         Shuffle test and validation indices.
     batch_size
         batch size of each iteration. If `None`, do not minibatch
+    load_sparse_tensor
+        If ``True``, sparse registered data is kept on the device as a sparse CSR
+        :class:`~torch.Tensor` and only the rows of each minibatch are densified, which allows
+        keeping datasets on the device that only fit in memory in sparse form.
+    max_device_memory
+        Maximum number of bytes of device memory the data may use. If the expected memory usage
+        exceeds it, data is kept on the host and loaded with
+        :class:`~scvi.dataloaders.AnnDataLoader` instead. If ``None``, defaults to the free
+        memory of CUDA devices and is unlimited for other devices.
+    **kwargs
+        Keyword args for :class:`~scvi.dataloaders.DataSplitter`.
 
     Examples
     --------
@@ -614,12 +648,15 @@ class DeviceBackedDataSplitter(DataSplitter):
         shuffle: bool = False,
         shuffle_test_val: bool = False,
         batch_size: int | None = None,
+        load_sparse_tensor: bool = False,
+        max_device_memory: int | None = None,
         **kwargs,
     ):
         super().__init__(
             adata_manager=adata_manager,
             train_size=train_size,
             validation_size=validation_size,
+            load_sparse_tensor=load_sparse_tensor,
             pin_memory=pin_memory,
             **kwargs,
         )
@@ -629,6 +666,10 @@ class DeviceBackedDataSplitter(DataSplitter):
         _, _, self.device = parse_device_args(
             accelerator=accelerator, devices=device, return_device="torch"
         )
+        if max_device_memory is None and self.device.type == "cuda":
+            max_device_memory = torch.cuda.mem_get_info(self.device)[0]
+        self.max_device_memory = max_device_memory
+        self.device_backed = True
 
     def setup(self, stage: str | None = None):
         """Create the train, validation, and test indices."""
@@ -639,10 +680,58 @@ class DeviceBackedDataSplitter(DataSplitter):
             self.val_idx = np.sort(self.val_idx) if len(self.val_idx) > 0 else self.val_idx
             self.test_idx = np.sort(self.test_idx) if len(self.test_idx) > 0 else self.test_idx
 
+        n_obs = len(self.train_idx) + len(self.val_idx) + len(self.test_idx)
+        device_memory = self.expected_device_memory(n_obs)
+        logger.info(
+            f"Data is expected to use {device_memory / 1e9:.2f} GB of memory on {self.device}."
+        )
+        self.device_backed = (
+            self.max_device_memory is None or device_memory <= self.max_device_memory
+        )
+        if not self.device_backed:
+            warnings.warn(
+                f"Data is expected to use {device_memory / 1e9:.2f} GB of memory on "
+                f"{self.device}, which exceeds `max_device_memory` of "
+                f"{self.max_device_memory / 1e9:.2f} GB. Loading data from the host instead.",
+                UserWarning,
+                stacklevel=settings.warnings_stacklevel,
+            )
+            self.train_tensor_dict = self.test_tensor_dict = self.val_tensor_dict = None
+            return
+
         self.train_tensor_dict = self._get_tensor_dict(self.train_idx, device=self.device)
         self.test_tensor_dict = self._get_tensor_dict(self.test_idx, device=self.device)
         self.val_tensor_dict = self._get_tensor_dict(self.val_idx, device=self.device)
 
+    def expected_device_memory(self, n_obs: int | None = None) -> int:
+        """Number of bytes the registered data is expected to use on the device.
+
+        Sparse data is counted as a CSR tensor with 64-bit indices if ``load_sparse_tensor`` is
+        ``True``, assuming non-zero entries are evenly spread across observations.
+
+        Parameters
+        ----------
+        n_obs
+            Number of observations moved to the device. Defaults to all observations.
+        """
+        n_total = self.adata_manager.adata.n_obs
+        n_obs = n_total if n_obs is None else n_obs
+        keys = self.data_loader_kwargs.get("data_and_attributes", None)
+        keys = list(keys) if keys is not None else list(self.adata_manager.data_registry)
+
+        n_bytes = 0
+        for key in keys:
+            data = self.adata_manager.get_from_registry(key)
+            if not hasattr(data, "shape"):
+                continue
+            itemsize = np.dtype(registry_key_to_default_dtype(key)).itemsize
+            nnz = _get_nnz(data)
+            if self.load_sparse_tensor and nnz is not None:
+                n_bytes += ceil(nnz * n_obs / n_total) * (itemsize + 8) + (n_obs + 1) * 8
+            else:
+                n_bytes += n_obs * int(np.prod(data.shape[1:])) * itemsize
+        return n_bytes
+
     def _get_tensor_dict(self, indices, device):
         """Get tensor dict for a given set of indices."""
         if len(indices) is not None and len(indices) > 0:
@@ -651,14 +740,18 @@ class DeviceBackedDataSplitter(DataSplitter):
                 indices=indices,
                 batch_size=len(indices),
                 shuffle=False,
+                load_sparse_tensor=self.load_sparse_tensor,
                 pin_memory=self.pin_memory,
-                **self.data_loader_kwargs,
+                # sparse tensors must reach the device as they are, and only once
+                **{**self.data_loader_kwargs, "prefetch_depth": 0, "shared_memory": False},
             )
             # will only have one minibatch
             for batch in dl:
                 tensor_dict = batch
 
             for k, v in tensor_dict.items():
+                if v.layout is torch.sparse_csc:
+                    v = v.to_sparse_csr()
                 tensor_dict[k] = v.to(device)
 
             return tensor_dict
@@ -671,38 +764,110 @@ class DeviceBackedDataSplitter(DataSplitter):
             return None
         dataset = _DeviceBackedDataset(tensor_dict)
         bs = self.batch_size if self.batch_size is not None else len(dataset)
-        sampler_cls = SequentialSampler if not shuffle else RandomSampler
-        sampler = BatchSampler(
-            sampler=sampler_cls(dataset),
-            batch_size=bs,
-            drop_last=False,
-        )
+        if any(value.layout is torch.sparse_csr for value in tensor_dict.values()):
+            # indices of sparse rows are gathered on the device
+            sampler = _DeviceBatchSampler(len(dataset), bs, shuffle=shuffle, device=self.device)
+        else:
+            sampler_cls = SequentialSampler if not shuffle else RandomSampler
+            sampler = BatchSampler(
+                sampler=sampler_cls(dataset),
+                batch_size=bs,
+                drop_last=False,
+            )
         return DataLoader(dataset, sampler=sampler, batch_size=None)
 
+    def _make_host_dataloader(self, indices: np.ndarray, shuffle: bool):
+        """Create a dataloader reading from the host, used if data does not fit the device."""
+        if len(indices) == 0:
+            return None
+        return AnnDataLoader(
+            self.adata_manager,
+            indices=indices,
+            batch_size=self.batch_size if self.batch_size is not None else len(indices),
+            shuffle=shuffle,
+            load_sparse_tensor=self.load_sparse_tensor,
+            pin_memory=self.pin_memory,
+            **self.data_loader_kwargs,
+        )
+
     def train_dataloader(self):
         """Create the train data loader."""
+        if not self.device_backed:
+            return self._make_host_dataloader(self.train_idx, self.shuffle)
         return self._make_dataloader(self.train_tensor_dict, self.shuffle)
 
     def test_dataloader(self):
         """Create the test data loader."""
+        if not self.device_backed:
+            return self._make_host_dataloader(self.test_idx, self.shuffle_test_val)
         return self._make_dataloader(self.test_tensor_dict, self.shuffle_test_val)
 
     def val_dataloader(self):
         """Create the validation data loader."""
+        if not self.device_backed:
+            return self._make_host_dataloader(self.val_idx, self.shuffle_test_val)
         return self._make_dataloader(self.val_tensor_dict, self.shuffle_test_val)
 
 
+def _get_nnz(data) -> int | None:
+    """Number of stored entries of sparse registered data, or ``None`` for dense data."""
+    if hasattr(data, "nnz"):
+        return data.nnz
+    if hasattr(data, "group"):
+        return data.group["data"].shape[0]
+    return None
+
+
+def _gather_csr_rows(x: torch.Tensor, idx: torch.Tensor) -> torch.Tensor:
+    """Densify rows ``idx`` of a sparse CSR tensor on its device."""
+    crow_indices, col_indices, values = x.crow_indices(), x.col_indices(), x.values()
+    starts = crow_indices[idx]
+    lengths = crow_indices[idx + 1] - starts
+    rows = torch.repeat_interleave(torch.arange(len(idx), device=x.device), lengths)
+    # position of each gathered entry in the values of ``x``
+    row_offsets = starts - (lengths.cumsum(0) - lengths)
+    positions = torch.arange(len(rows), device=x.device) + row_offsets[rows]
+    dense = torch.zeros((len(idx), x.shape[1]), dtype=values.dtype, device=x.device)
+    dense.index_put_((rows, col_indices[positions]), values[positions], accumulate=True)
+    return dense
+
+
+class _DeviceBatchSampler(Sampler):
+    """Yields minibatches of indices as tensors created on ``device``."""
+
+    def __init__(self, n_obs: int, batch_size: int, shuffle: bool, device: torch.device):
+        self.n_obs = n_obs
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.device = device
+
+    def __iter__(self):
+        if self.shuffle:
+            indices = torch.randperm(self.n_obs, device=self.device)
+        else:
+            indices = torch.arange(self.n_obs, device=self.device)
+        yield from indices.split(self.batch_size)
+
+    def __len__(self):
+        return ceil(self.n_obs / self.batch_size)
+
+
 class _DeviceBackedDataset(Dataset):
     def __init__(self, tensor_dict: dict[str, torch.Tensor]):
         self.data = tensor_dict
 
-    def __getitem__(self, idx: list[int]) -> dict[str, torch.Tensor]:
+    def __getitem__(self, idx: list[int] | torch.Tensor) -> dict[str, torch.Tensor]:
         return_dict = {}
         for key, value in self.data.items():
-            return_dict[key] = value[idx]
+            if value.layout is torch.sparse_csr:
+                return_dict[key] = _gather_csr_rows(
+                    value, torch.as_tensor(idx, device=value.device)
+                )
+            else:
+                return_dict[key] = value[idx]
 
         return return_dict
 
     def __len__(self):
         for _, value in self.data.items():
-            return len(value)
+            return value.shape[0]
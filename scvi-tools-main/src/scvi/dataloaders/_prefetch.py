@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import torch
+
+
+@dataclass
+class PrefetchStatistics:
+    """Counters collected while iterating a prefetching data loader.
+
+    Attributes
+    ----------
+    n_batches
+        Number of minibatches handed to the consumer.
+    n_starved
+        Number of times the consumer found the prefetch queue empty and had to wait.
+    starved_time
+        Total time in seconds the consumer spent waiting on an empty queue.
+    """
+
+    n_batches: int = 0
+    n_starved: int = 0
+    starved_time: float = 0.0
+
+
+class _PrefetchFailure:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+_END = object()
+
+
+class PrefetchIterator(Iterator):
+    """Iterator that prepares minibatches ahead of the consumer in a background thread.
+
+    Each minibatch is densified and, if ``device`` is a CUDA device, copied into pinned memory
+    and transferred to ``device`` with non-blocking copies on a side CUDA stream. The consumer
+    synchronizes with the side stream only for the minibatch it receives.
+
+    Parameters
+    ----------
+    iterator
+        Iterator over dictionaries of :class:`~torch.Tensor`, e.g. the iterator of a
+        :class:`~scvi.dataloaders.AnnDataLoader`.
+    depth
+        Maximum number of minibatches prepared ahead of the consumer.
+    device
+        Device to transfer minibatches to. If ``None`` or not a CUDA device, minibatches are
+        prepared on the host and left there.
+    statistics
+        :class:`~scvi.dataloaders._prefetch.PrefetchStatistics` instance to update with
+        queue-starvation counters.
+    """
+
+    def __init__(
+        self,
+        iterator: Iterator,
+        depth: int = 2,
+        device: torch.device | str | None = None,
+        statistics: PrefetchStatistics | None = None,
+    ):
+        if depth < 1:
+            raise ValueError("`depth` must be positive.")
+
+        self.device = torch.device(device) if device is not None else None
+        self.statistics = statistics if statistics is not None else PrefetchStatistics()
+        self._stream = None
+        if self.device is not None and self.device.type == "cuda":
+            self._stream = torch.cuda.Stream(self.device)
+
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._produce, args=(iterator,), daemon=True)
+        self._thread.start()
+
+    def _transfer(self, batch: dict) -> dict:
+        """Densify a minibatch and, on CUDA, copy it to the device on the side stream."""
+        transferred = {}
+        for key, value in batch.items():
+            if isinstance(value, torch.Tensor):
+                if self._stream is None:
+                    if value.layout is not torch.strided:
+                        value = value.to_dense()
+                else:
+                    if value.layout is torch.strided:
+                        value = value.pin_memory()
+                    value = value.to(self.device, non_blocking=True)
+                    if value.layout is not torch.strided:
+                        value = value.to_dense()
+            transferred[key] = value
+        return transferred
+
+    def _put(self, item) -> bool:
+        """Put an item in the queue unless the consumer has stopped iterating."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, iterator: Iterator):
+        try:
+            for batch in iterator:
+                if self._stream is None:
+                    item = (self._transfer(batch), None)
+                else:
+                    with torch.cuda.stream(self._stream):
+                        batch = self._transfer(batch)
+                        event = torch.cuda.Event()
+                        event.record(self._stream)
+                    item = (batch, event)
+                if not self._put(item):
+                    return
+        except Exception as e:  # noqa: BLE001
+            self._put(_PrefetchFailure(e))
+            return
+        self._put(_END)
+
+    def __next__(self) -> dict:
+        if self._finished:
+            raise StopIteration
+
+        if self._queue.empty():
+            self.statistics.n_starved += 1
+            start = time.perf_counter()
+            item = self._queue.get()
+            self.statistics.starved_time += time.perf_counter() - start
+        else:
+            item = self._queue.get()
+
+        if item is _END:
+            self._finished = True
+            raise StopIteration
+        if isinstance(item, _PrefetchFailure):
+            self._finished = True
+            raise item.exception
+
+        batch, event = item
+        if event is not None:
+            stream = torch.cuda.current_stream(self.device)
+            event.wait(stream)
+            for value in batch.values():
+                if isinstance(value, torch.Tensor) and value.is_cuda:
+                    value.record_stream(stream)
+
+        self.statistics.n_batches += 1
+        return batch
+
+    def close(self):
+        """Stop the background thread and wait for it to exit."""
+        self._finished = True
+        self._stop.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def __del__(self):
+        self._stop.set()
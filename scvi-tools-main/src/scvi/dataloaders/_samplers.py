@@ -1,4 +1,10 @@
-from torch.utils.data import Dataset, DistributedSampler
+from math import ceil
+
+import numpy as np
+import torch
+from torch.utils.data import BatchSampler, Dataset, DistributedSampler, Sampler
+
+from scvi import settings
 
 
 class BatchDistributedSampler(DistributedSampler):
@@ -8,6 +14,12 @@ class BatchDistributedSampler(DistributedSampler):
     retrieves a minibatch of data with one call to the dataset's `__getitem__`
     for efficient access to sparse data.
 
+    By default, replicas load interleaved subsets of the (shuffled) dataset, so that each of
+    them reads from the whole dataset. With ``contiguous_shards=True``, each replica instead
+    loads a contiguous shard of the rows of the underlying :class:`~anndata.AnnData` object and
+    only shuffles within its shard, so that reading backed data scales down with the number of
+    replicas.
+
     Parameters
     ----------
     dataset
@@ -23,6 +35,14 @@ class BatchDistributedSampler(DistributedSampler):
         If `True` the sampler will drop the tail of the dataset to make it evenly
         divisible by the number of replicas. If `False`, then the sampler will add extra
         indices to make the dataset evenly divisible by the number of replicas.
+    contiguous_shards
+        Whether each replica loads a contiguous shard of the rows of the underlying
+        :class:`~anndata.AnnData` object instead of an interleaved subset of the dataset.
+    shuffle_buffer_size
+        Only used if ``contiguous_shards`` and ``shuffle`` are ``True``. If not ``None``, the
+        shard of each replica is split into windows of ``shuffle_buffer_size`` consecutive rows
+        whose order is shuffled, and observations are only shuffled within windows. If
+        ``None``, the whole shard is shuffled.
     **kwargs
         Additional keyword arguments passed into
         :class:`~torch.utils.data.distributed.DistributedSampler`.
@@ -34,39 +54,238 @@ class BatchDistributedSampler(DistributedSampler):
         batch_size: int = 128,
         drop_last: bool = False,
         drop_dataset_tail: bool = False,
+        contiguous_shards: bool = False,
+        shuffle_buffer_size: int | None = None,
         **kwargs,
     ):
         super().__init__(dataset, drop_last=drop_dataset_tail, **kwargs)
+        if shuffle_buffer_size is not None and shuffle_buffer_size < 1:
+            raise ValueError("`shuffle_buffer_size` must be positive.")
+
         self.batch_size = batch_size
         self.drop_last_batch = drop_last  # drop_last already defined in parent
+        self.contiguous_shards = contiguous_shards
+        self.shuffle_buffer_size = shuffle_buffer_size
 
-    def __iter__(self):
-        """Iterates over a subset of indices from the dataset.
+    def _replica_indices(self) -> np.ndarray:
+        """Positions in the dataset loaded by this replica in the current epoch."""
+        n_obs = len(self.dataset)
+        if self.contiguous_shards:
+            # positions of the dataset ordered by the rows they load from the AnnData object
+            rows = getattr(self.dataset, "indices", None)
+            indices = np.argsort(rows, kind="stable") if rows is not None else np.arange(n_obs)
+        elif self.shuffle:
+            # same permutation as `DistributedSampler.__iter__`
+            generator = torch.Generator()
+            generator.manual_seed(self.seed + self.epoch)
+            indices = torch.randperm(n_obs, generator=generator).numpy()
+        else:
+            indices = np.arange(n_obs)
+
+        if self.drop_last:
+            indices = indices[: self.total_size]
+        else:
+            indices = np.concatenate([indices, np.resize(indices, self.total_size - n_obs)])
+
+        if not self.contiguous_shards:
+            return indices[self.rank : self.total_size : self.num_replicas]
 
-        Based on :meth:`~torch.utils.data.BatchSampler.__iter__`.
+        start = self.rank * self.num_samples
+        indices = indices[start : start + self.num_samples]
+        if self.shuffle:
+            rng = np.random.default_rng((self.seed, self.epoch, self.rank))
+            buffer_size = self.shuffle_buffer_size or len(indices)
+            windows = np.split(indices, np.arange(buffer_size, len(indices), buffer_size))
+            indices = np.concatenate(
+                [rng.permutation(windows[i]) for i in rng.permutation(len(windows))]
+            )
+        return indices
+
+    def __iter__(self):
+        """Iterates over minibatches of a subset of indices from the dataset.
 
         Notes
         -----
-        `super().__iter__()` iterates over a subset of the dataset based on the current
-        `rank` and `num_replicas`.
+        The subset depends on the current `rank` and `num_replicas`, see
+        :meth:`~torch.utils.data.distributed.DistributedSampler.__iter__`.
         """
-        sampler_iter = super().__iter__()
+        indices = self._replica_indices()
         if self.drop_last_batch:
-            while True:
-                try:
-                    batch = [next(sampler_iter) for _ in range(self.batch_size)]
-                    yield batch
-                except StopIteration:
-                    break
+            indices = indices[: len(indices) // self.batch_size * self.batch_size]
+        for start in range(0, len(indices), self.batch_size):
+            yield indices[start : start + self.batch_size].tolist()
+
+
+class ChunkedBatchSampler(Sampler):
+    """Sampler that shuffles contiguous chunks of observations instead of single observations.
+
+    Observations are grouped into chunks of ``chunk_size`` consecutive rows of the underlying
+    :class:`~anndata.AnnData` object. If ``shuffle`` is ``True``, the chunk order is shuffled
+    every epoch, ``chunks_per_buffer`` consecutive chunks are pooled into a buffer, and the
+    observations within each buffer are shuffled before being split into minibatches. Every
+    minibatch thus only touches a few contiguous regions on disk, which allows
+    :class:`~scvi.data.AnnTorchDataset` to serve backed data with sequential reads.
+
+    Parameters
+    ----------
+    indices
+        Indices of the observations in the :class:`~anndata.AnnData` object that the sampled
+        dataset iterates over. The sampler yields positions into ``indices``.
+    batch_size
+        Minibatch size to load each iteration.
+    chunk_size
+        Number of consecutive rows of the :class:`~anndata.AnnData` object in a chunk.
+    chunks_per_buffer
+        Number of chunks whose observations are shuffled together. Larger values improve the
+        quality of the shuffle at the cost of touching more chunks per minibatch.
+    shuffle
+        Whether to shuffle chunks and observations within buffers.
+    drop_last
+        If `True` and the dataset is not evenly divisible by `batch_size`, the last
+        incomplete batch is dropped. If `False` and the dataset is not evenly divisible
+        by `batch_size`, then the last batch will be smaller than `batch_size`.
+    seed
+        Seed for the random number generator. Defaults to ``scvi.settings.seed``.
+    """
+
+    def __init__(
+        self,
+        indices: np.ndarray,
+        batch_size: int = 128,
+        chunk_size: int = 1024,
+        chunks_per_buffer: int = 8,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        seed: int | None = None,
+    ):
+        if chunk_size < 1 or chunks_per_buffer < 1:
+            raise ValueError("`chunk_size` and `chunks_per_buffer` must be positive.")
+
+        indices = np.asarray(indices)
+        self.n_obs = len(indices)
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.chunks_per_buffer = chunks_per_buffer
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self._rng = np.random.default_rng(settings.seed if seed is None else seed)
+
+        # positions into `indices` grouped by the on-disk chunk they fall into
+        order = np.argsort(indices, kind="stable")
+        chunk_ids = indices[order] // chunk_size
+        self.chunks = np.split(order, np.flatnonzero(np.diff(chunk_ids)) + 1)
+
+    @property
+    def buffer_size(self) -> int:
+        """Maximum number of observations shuffled together, a measure of shuffle quality."""
+        if not self.shuffle:
+            return 1
+        return min(self.chunk_size * self.chunks_per_buffer, self.n_obs)
+
+    def __iter__(self):
+        """Iterates over minibatches of positions drawn buffer by buffer."""
+        if self.n_obs == 0:
+            return
+
+        if self.shuffle:
+            chunk_order = self._rng.permutation(len(self.chunks))
         else:
-            batch = [0] * self.batch_size
-            idx_in_batch = 0
-            for idx in sampler_iter:
-                batch[idx_in_batch] = idx
-                idx_in_batch += 1
-                if idx_in_batch == self.batch_size:
-                    yield batch
-                    idx_in_batch = 0
-                    batch = [0] * self.batch_size
-            if idx_in_batch > 0:
-                yield batch[:idx_in_batch]
+            chunk_order = np.arange(len(self.chunks))
+
+        buffers = []
+        for start in range(0, len(chunk_order), self.chunks_per_buffer):
+            buffer_chunks = chunk_order[start : start + self.chunks_per_buffer]
+            buffer = np.concatenate([self.chunks[i] for i in buffer_chunks])
+            if self.shuffle:
+                self._rng.shuffle(buffer)
+            buffers.append(buffer)
+        positions = np.concatenate(buffers)
+
+        for start in range(0, self.n_obs, self.batch_size):
+            batch = positions[start : start + self.batch_size]
+            if self.drop_last and len(batch) < self.batch_size:
+                break
+            yield batch.tolist()
+
+    def __len__(self):
+        if self.drop_last:
+            return self.n_obs // self.batch_size
+        return ceil(self.n_obs / self.batch_size)
+
+
+class StratifiedBatchSampler(BatchSampler):
+    """Batch sampler that draws a fixed number of observations of each class every epoch.
+
+    The subset of observations is redrawn by :meth:`resample` with vectorized numpy operations,
+    so that the data loader using this sampler, its dataset and its workers are kept alive
+    across epochs.
+
+    Parameters
+    ----------
+    labels
+        Class of each observation of the sampled dataset. The sampler yields positions into
+        ``labels``.
+    n_samples_per_label
+        Number of observations of each class to draw. Classes with fewer observations are kept
+        entirely. If ``None``, all observations are kept.
+    batch_size
+        Minibatch size to load each iteration.
+    shuffle
+        Whether to shuffle the drawn observations.
+    drop_last
+        If `True` and the dataset is not evenly divisible by `batch_size`, the last
+        incomplete batch is dropped. If `False` and the dataset is not evenly divisible
+        by `batch_size`, then the last batch will be smaller than `batch_size`.
+    seed
+        Seed for the random number generator. Defaults to ``scvi.settings.seed``.
+    """
+
+    def __init__(
+        self,
+        labels: np.ndarray,
+        n_samples_per_label: int | None = None,
+        batch_size: int = 128,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        seed: int | None = None,
+    ):
+        labels = np.asarray(labels).ravel()
+        super().__init__(range(len(labels)), batch_size=batch_size, drop_last=drop_last)
+        self.n_samples_per_label = n_samples_per_label
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(settings.seed if seed is None else seed)
+
+        # class codes, and where each class starts among positions sorted by class
+        classes, self._labels = np.unique(labels, return_inverse=True)
+        self._class_starts = np.searchsorted(np.sort(self._labels), np.arange(len(classes)))
+        self.resample()
+
+    def resample(self) -> np.ndarray:
+        """Draw a new subset of observations.
+
+        Returns
+        -------
+        Sorted positions of the drawn observations.
+        """
+        n_obs = len(self._labels)
+        if self.n_samples_per_label is None:
+            self.positions = np.arange(n_obs)
+            return self.positions
+
+        # order positions by class and, within classes, by random keys
+        order = np.lexsort((self._rng.random(n_obs), self._labels))
+        rank_in_class = np.arange(n_obs) - self._class_starts[self._labels[order]]
+        self.positions = np.sort(order[rank_in_class < self.n_samples_per_label])
+        return self.positions
+
+    def __iter__(self):
+        positions = self._rng.permutation(self.positions) if self.shuffle else self.positions
+        if self.drop_last:
+            positions = positions[: len(positions) // self.batch_size * self.batch_size]
+        for start in range(0, len(positions), self.batch_size):
+            yield positions[start : start + self.batch_size].tolist()
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.positions) // self.batch_size
+        return ceil(len(self.positions) / self.batch_size)
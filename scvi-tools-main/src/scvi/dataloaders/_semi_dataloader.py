@@ -6,6 +6,7 @@ from scvi.data._utils import get_anndata_attribute
 
 from ._ann_dataloader import AnnDataLoader
 from ._concat_dataloader import ConcatDataLoader
+from ._samplers import StratifiedBatchSampler
 
 
 class SemiSupervisedDataLoader(ConcatDataLoader):
@@ -68,20 +69,57 @@ class SemiSupervisedDataLoader(ConcatDataLoader):
                 label_loc_idx = np.where(labels[indices] == label)[0]
                 label_loc = self.indices[label_loc_idx]
                 self.labeled_locs.append(label_loc)
-        labelled_idx = self.subsample_labels()
+
+        distributed_sampler = data_loader_kwargs.get("distributed_sampler", False)
+        if distributed_sampler or len(self.labeled_locs) == 0:
+            # the distributed sampler cannot be combined with the stratified sampler, so the
+            # labelled data loader is rebuilt on every resampling instead
+            self._label_sampler = None
+            super().__init__(
+                adata_manager=adata_manager,
+                indices_list=[self.indices, self.subsample_labels()],
+                shuffle=shuffle,
+                batch_size=batch_size,
+                data_and_attributes=data_and_attributes,
+                drop_last=drop_last,
+                **data_loader_kwargs,
+            )
+            return
 
         super().__init__(
             adata_manager=adata_manager,
-            indices_list=[self.indices, labelled_idx],
+            indices_list=[self.indices],
             shuffle=shuffle,
             batch_size=batch_size,
             data_and_attributes=data_and_attributes,
             drop_last=drop_last,
             **data_loader_kwargs,
         )
+        # the labelled data loader iterates over all labelled observations through a sampler
+        # that subsamples them, so that resampling does not rebuild the loader
+        self._label_sampler = StratifiedBatchSampler(
+            np.repeat(np.arange(len(self.labeled_locs)), [len(loc) for loc in self.labeled_locs]),
+            n_samples_per_label=n_samples_per_label,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            drop_last=drop_last,
+        )
+        self.dataloaders.append(
+            AnnDataLoader(
+                adata_manager,
+                indices=np.concatenate(self.labeled_locs),
+                sampler=self._label_sampler,
+                data_and_attributes=data_and_attributes,
+                **self.dataloader_kwargs,
+            )
+        )
 
     def resample_labels(self):
         """Resamples the labeled data."""
+        if self._label_sampler is not None:
+            self._label_sampler.resample()
+            return
+
         labelled_idx = self.subsample_labels()
         # self.dataloaders[0] iterates over full_indices
         # self.dataloaders[1] iterates over the labelled_indices
@@ -93,6 +131,8 @@ class SemiSupervisedDataLoader(ConcatDataLoader):
             batch_size=self._batch_size,
             data_and_attributes=self.data_and_attributes,
             drop_last=self._drop_last,
+            distributed_sampler=self._distributed_sampler,
+            **self.dataloader_kwargs,
         )
 
     def subsample_labels(self):
@@ -21,6 +21,7 @@ from torch.distributions.utils import (
 from scvi import settings
 
 from ._constraints import optional_constraint
+from ._utils import autocast_fp32
 
 
 def torch_lgamma_mps(x: torch.Tensor) -> torch.Tensor:
@@ -38,6 +39,7 @@ def torch_lgamma_mps(x: torch.Tensor) -> torch.Tensor:
     return torch.lgamma(x.contiguous())
 
 
+@autocast_fp32
 def log_zinb_positive(
     x: torch.Tensor,
     mu: torch.Tensor,
@@ -101,6 +103,7 @@ def log_zinb_positive(
     return res
 
 
+@autocast_fp32
 def log_nb_positive(
     x: torch.Tensor | jnp.ndarray,
     mu: torch.Tensor | jnp.ndarray,
@@ -140,6 +143,7 @@ def log_nb_positive(
     return res
 
 
+@autocast_fp32
 def log_mixture_nb(
     x: torch.Tensor,
     mu_1: torch.Tensor,
@@ -221,6 +225,285 @@ def log_mixture_nb(
     return log_mixture_nb_res
 
 
+_SPARSE_LAYOUTS = (torch.sparse_coo, torch.sparse_csr, torch.sparse_csc)
+
+
+def _is_sparse(x: torch.Tensor) -> bool:
+    return isinstance(x, torch.Tensor) and x.layout in _SPARSE_LAYOUTS
+
+
+def _sparse_nonzeros(x: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Row indices, column indices and values of the stored entries of a sparse matrix."""
+    if x.layout is torch.sparse_csr:
+        crow_indices = x.crow_indices()
+        rows = torch.repeat_interleave(
+            torch.arange(len(crow_indices) - 1, device=x.device), crow_indices.diff()
+        )
+        return rows, x.col_indices(), x.values()
+    if x.layout is torch.sparse_csc:
+        ccol_indices = x.ccol_indices()
+        cols = torch.repeat_interleave(
+            torch.arange(len(ccol_indices) - 1, device=x.device), ccol_indices.diff()
+        )
+        return x.row_indices(), cols, x.values()
+    x = x.coalesce()
+    rows, cols = x.indices()
+    return rows, cols, x.values()
+
+
+def _validate_counts(distribution: Distribution, value: torch.Tensor):
+    """Warn if ``value``, or the stored entries of a sparse ``value``, are outside the support."""
+    try:
+        if _is_sparse(value):
+            if value.shape != distribution.mu.shape:
+                raise ValueError("The shape of the sparse value must match the shape of `mu`.")
+            if not distribution.support.check(_sparse_nonzeros(value)[2]).all():
+                raise ValueError("The value argument must be within the support.")
+        else:
+            distribution._validate_sample(value)
+    except ValueError:
+        warnings.warn(
+            "The value argument must be within the support of the distribution",
+            UserWarning,
+            stacklevel=settings.warnings_stacklevel,
+        )
+
+
+def _nb_zero_terms(
+    mu: torch.Tensor, theta: torch.Tensor, eps: float
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """``log(theta + mu + eps)`` and the NB log likelihood of zero counts."""
+    log_theta_mu_eps = torch.log(theta + mu + eps)
+    # log(theta + eps) is evaluated before broadcasting, e.g., once per gene
+    return log_theta_mu_eps, theta * (torch.log(theta + eps) - log_theta_mu_eps)
+
+
+def _nb_nonzero_terms(
+    values: torch.Tensor,
+    mu: torch.Tensor,
+    theta: torch.Tensor,
+    log_theta_mu_eps: torch.Tensor,
+    eps: float,
+) -> torch.Tensor:
+    """Terms of the NB log likelihood that vanish for zero counts."""
+    return (
+        values * (torch.log(mu + eps) - log_theta_mu_eps)
+        + torch.lgamma(values + theta)
+        - torch.lgamma(theta)
+        - torch.lgamma(values + 1)
+    )
+
+
+def _nb_zero_grads(
+    mu: torch.Tensor, theta: torch.Tensor, eps: float
+) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Gradients of the NB log likelihood of zero counts.
+
+    Returns ``1 / (theta + mu + eps)``, ``log(theta + mu + eps)`` and the gradients with respect
+    to ``mu`` and ``theta``.
+    """
+    inv_theta_mu_eps = 1 / (theta + mu + eps)
+    log_theta_mu_eps = -torch.log(inv_theta_mu_eps)
+    grad_mu = -theta * inv_theta_mu_eps
+    grad_theta = (torch.log(theta + eps) + theta / (theta + eps)) - log_theta_mu_eps + grad_mu
+    return inv_theta_mu_eps, log_theta_mu_eps, grad_mu, grad_theta
+
+
+def _nb_nonzero_grads(
+    values: torch.Tensor,
+    mu: torch.Tensor,
+    theta: torch.Tensor,
+    inv_theta_mu_eps: torch.Tensor,
+    eps: float,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Gradients of the terms of the NB log likelihood that vanish for zero counts."""
+    grad_mu = values / (mu + eps) - values * inv_theta_mu_eps
+    grad_theta = -values * inv_theta_mu_eps + torch.digamma(values + theta) - torch.digamma(theta)
+    return grad_mu, grad_theta
+
+
+def _sum_to_size(grad: torch.Tensor, shape: torch.Size) -> torch.Tensor:
+    return grad if grad.shape == shape else grad.sum_to_size(shape)
+
+
+class _SparseNBLogLikelihood(torch.autograd.Function):
+    """NB log likelihood of sparse counts, with ``lgamma`` evaluated on nonzeros only.
+
+    Only the parameters and the nonzero entries are saved for the backward pass, which
+    recomputes the elementwise terms instead of storing them.
+    """
+
+    @staticmethod
+    def forward(ctx, mu, theta, rows, cols, values, eps):
+        shape = torch.broadcast_shapes(mu.shape, theta.shape)
+        log_theta_mu_eps, res = _nb_zero_terms(mu, theta, eps)
+        nonzero_terms = _nb_nonzero_terms(
+            values,
+            mu.expand(shape)[rows, cols],
+            theta.expand(shape)[rows, cols],
+            log_theta_mu_eps[rows, cols],
+            eps,
+        )
+        res = res.index_put((rows, cols), nonzero_terms, accumulate=True)
+        ctx.save_for_backward(mu, theta, rows, cols, values)
+        ctx.eps = eps
+        return res
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        mu, theta, rows, cols, values = ctx.saved_tensors
+        shape = grad_output.shape
+        inv_theta_mu_eps, _, grad_mu, grad_theta = _nb_zero_grads(mu, theta, ctx.eps)
+        nonzero_grad_mu, nonzero_grad_theta = _nb_nonzero_grads(
+            values,
+            mu.expand(shape)[rows, cols],
+            theta.expand(shape)[rows, cols],
+            inv_theta_mu_eps[rows, cols],
+            ctx.eps,
+        )
+        grad_mu = grad_mu.expand(shape).index_put((rows, cols), nonzero_grad_mu, accumulate=True)
+        grad_theta = grad_theta.expand(shape).index_put(
+            (rows, cols), nonzero_grad_theta, accumulate=True
+        )
+        return (
+            _sum_to_size(grad_output * grad_mu, mu.shape),
+            _sum_to_size(grad_output * grad_theta, theta.shape),
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+class _SparseZINBLogLikelihood(torch.autograd.Function):
+    """ZINB log likelihood of sparse counts, with ``lgamma`` evaluated on nonzeros only."""
+
+    @staticmethod
+    def forward(ctx, mu, theta, pi, rows, cols, values, eps):
+        shape = torch.broadcast_shapes(mu.shape, theta.shape, pi.shape)
+        log_theta_mu_eps, nb_zero = _nb_zero_terms(mu, theta, eps)
+        softplus_pi = F.softplus(-pi)
+        pi_theta_log = nb_zero - pi
+        res = F.softplus(pi_theta_log) - softplus_pi
+        nonzero_terms = (
+            pi_theta_log[rows, cols]
+            - softplus_pi.expand(shape)[rows, cols]
+            + _nb_nonzero_terms(
+                values,
+                mu.expand(shape)[rows, cols],
+                theta.expand(shape)[rows, cols],
+                log_theta_mu_eps[rows, cols],
+                eps,
+            )
+        )
+        res = res.index_put((rows, cols), nonzero_terms)
+        ctx.save_for_backward(mu, theta, pi, rows, cols, values)
+        ctx.eps = eps
+        return res
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        mu, theta, pi, rows, cols, values = ctx.saved_tensors
+        shape = grad_output.shape
+        inv_theta_mu_eps, log_theta_mu_eps, nb_grad_mu, nb_grad_theta = _nb_zero_grads(
+            mu, theta, ctx.eps
+        )
+        nonzero_grad_mu, nonzero_grad_theta = _nb_nonzero_grads(
+            values,
+            mu.expand(shape)[rows, cols],
+            theta.expand(shape)[rows, cols],
+            inv_theta_mu_eps[rows, cols],
+            ctx.eps,
+        )
+        # zero counts: softplus(nb_zero - pi) - softplus(-pi)
+        nb_zero = theta * (torch.log(theta + ctx.eps) - log_theta_mu_eps)
+        prob_nb_zero = torch.sigmoid(nb_zero - pi)
+        grad_pi = torch.sigmoid(-pi) - prob_nb_zero
+        grad_mu = prob_nb_zero * nb_grad_mu
+        grad_theta = prob_nb_zero * nb_grad_theta
+        # nonzero counts: nb_zero - pi - softplus(-pi) + nonzero NB terms
+        grad_pi = grad_pi.index_put((rows, cols), -torch.sigmoid(pi.expand(shape)[rows, cols]))
+        grad_mu = grad_mu.index_put((rows, cols), nb_grad_mu[rows, cols] + nonzero_grad_mu)
+        grad_theta = grad_theta.index_put(
+            (rows, cols), nb_grad_theta[rows, cols] + nonzero_grad_theta
+        )
+        return (
+            _sum_to_size(grad_output * grad_mu, mu.shape),
+            _sum_to_size(grad_output * grad_theta, theta.shape),
+            _sum_to_size(grad_output * grad_pi, pi.shape),
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+@autocast_fp32
+def log_nb_positive_sparse(
+    x: torch.Tensor, mu: torch.Tensor, theta: torch.Tensor, eps: float = 1e-8
+) -> torch.Tensor:
+    """Log likelihood of a sparse minibatch according to a nb model.
+
+    Equivalent to :func:`log_nb_positive` for counts stored as a sparse COO, CSR or CSC tensor.
+    Zero counts reduce to ``theta * (log(theta) - log(theta + mu))``, so that the ``lgamma``
+    terms, and the ``digamma`` terms of the gradients, are only evaluated on nonzero counts.
+
+    Parameters
+    ----------
+    x
+        sparse data (shape: minibatch x vars)
+    mu
+        mean of the negative binomial (has to be positive support) (shape: minibatch x vars)
+    theta
+        inverse dispersion parameter (has to be positive support), broadcastable to ``mu``
+    eps
+        numerical stability constant
+
+    Returns
+    -------
+    Dense log likelihood of shape ``minibatch x vars``.
+    """
+    rows, cols, values = _sparse_nonzeros(x)
+    return _SparseNBLogLikelihood.apply(mu, theta, rows, cols, values.to(mu.dtype), eps)
+
+
+@autocast_fp32
+def log_zinb_positive_sparse(
+    x: torch.Tensor,
+    mu: torch.Tensor,
+    theta: torch.Tensor,
+    pi: torch.Tensor,
+    eps: float = 1e-8,
+) -> torch.Tensor:
+    """Log likelihood of a sparse minibatch according to a zinb model.
+
+    Equivalent to :func:`log_zinb_positive` for counts stored as a sparse COO, CSR or CSC
+    tensor, with the ``lgamma`` terms only evaluated on nonzero counts.
+
+    Parameters
+    ----------
+    x
+        sparse data (shape: minibatch x vars)
+    mu
+        mean of the negative binomial (has to be positive support) (shape: minibatch x vars)
+    theta
+        inverse dispersion parameter (has to be positive support), broadcastable to ``mu``
+    pi
+        logit of the dropout parameter (real support) (shape: minibatch x vars)
+    eps
+        numerical stability constant
+
+    Returns
+    -------
+    Dense log likelihood of shape ``minibatch x vars``.
+    """
+    rows, cols, values = _sparse_nonzeros(x)
+    # explicitly stored zeros follow the zero-inflated case
+    nonzero = values > eps
+    rows, cols, values = rows[nonzero], cols[nonzero], values[nonzero].to(mu.dtype)
+    return _SparseZINBLogLikelihood.apply(mu, theta, pi, rows, cols, values, eps)
+
+
 def _convert_mean_disp_to_counts_logits(
     mu: torch.Tensor,
     theta: torch.Tensor,
@@ -448,16 +731,13 @@ class NegativeBinomial(Distribution):
         return counts
 
     def log_prob(self, value: torch.Tensor) -> torch.Tensor:
-        if self._validate_args:
-            try:
-                self._validate_sample(value)
-            except ValueError:
-                warnings.warn(
-                    "The value argument must be within the support of the distribution",
-                    UserWarning,
-                    stacklevel=settings.warnings_stacklevel,
-                )
+        if _is_sparse(value) and self.mu.ndim != 2:
+            value = value.to_dense()
+        if self._validate_args and not torch.compiler.is_compiling():
+            _validate_counts(self, value)
 
+        if _is_sparse(value):
+            return log_nb_positive_sparse(value, mu=self.mu, theta=self.theta, eps=self._eps)
         lgamma_fn = torch_lgamma_mps if self.on_mps else torch.lgamma  # TODO: TORCH MPS FIX
         return log_nb_positive(
             value, mu=self.mu, theta=self.theta, eps=self._eps, lgamma_fn=lgamma_fn
@@ -577,14 +857,13 @@ class ZeroInflatedNegativeBinomial(NegativeBinomial):
 
     def log_prob(self, value: torch.Tensor) -> torch.Tensor:
         """Log probability."""
-        try:
-            self._validate_sample(value)
-        except ValueError:
-            warnings.warn(
-                "The value argument must be within the support of the distribution",
-                UserWarning,
-                stacklevel=settings.warnings_stacklevel,
-            )
+        if _is_sparse(value) and self.mu.ndim != 2:
+            value = value.to_dense()
+        if not torch.compiler.is_compiling():
+            # data-dependent checks would break the graph of compiled modules
+            _validate_counts(self, value)
+        if _is_sparse(value):
+            return log_zinb_positive_sparse(value, self.mu, self.theta, self.zi_logits, eps=1e-08)
         lgamma_fn = torch_lgamma_mps if self.on_mps else torch.lgamma  # TODO: TORCH MPS FIX
         return log_zinb_positive(
             value, self.mu, self.theta, self.zi_logits, eps=1e-08, lgamma_fn=lgamma_fn
@@ -689,14 +968,16 @@ class NegativeBinomialMixture(Distribution):
 
     def log_prob(self, value: torch.Tensor) -> torch.Tensor:
         """Log probability."""
-        try:
-            self._validate_sample(value)
-        except ValueError:
-            warnings.warn(
-                "The value argument must be within the support of the distribution",
-                UserWarning,
-                stacklevel=settings.warnings_stacklevel,
-            )
+        if not torch.compiler.is_compiling():
+            # data-dependent checks would break the graph of compiled modules
+            try:
+                self._validate_sample(value)
+            except ValueError:
+                warnings.warn(
+                    "The value argument must be within the support of the distribution",
+                    UserWarning,
+                    stacklevel=settings.warnings_stacklevel,
+                )
         lgamma_fn = torch_lgamma_mps if self.on_mps else torch.lgamma  # TODO: TORCH MPS FIX
         return log_mixture_nb(
             value,
@@ -1,4 +1,19 @@
+from __future__ import annotations
+
+from functools import wraps
+from typing import TYPE_CHECKING
+
 import torch
+from torch.distributions import Normal
+from torch.distributions import kl_divergence as _kl_divergence
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from typing import Any
+
+    from torch.distributions import Distribution
+
+_HALF_DTYPES = (torch.float16, torch.bfloat16)
 
 
 def subset_distribution(
@@ -44,3 +59,59 @@ class DistributionConcatenator:
         """Returns a concatenated `Distribution` object along the specified axis."""
         concat_params = {key: torch.cat(value, dim=axis) for key, value in self._params.items()}
         return self.distribution_cls(**concat_params)
+
+
+def _upcast(value: Any) -> Any:
+    """``value`` in float32 if it is a half precision tensor or normal distribution."""
+    if isinstance(value, torch.Tensor) and value.dtype in _HALF_DTYPES:
+        return value.float()
+    if isinstance(value, Normal) and value.loc.dtype in _HALF_DTYPES:
+        return Normal(value.loc.float(), value.scale.float(), validate_args=False)
+    return value
+
+
+def _device_type(values: Iterable[Any]) -> str | None:
+    for value in values:
+        if isinstance(value, torch.Tensor):
+            return value.device.type
+        if isinstance(value, Normal):
+            return value.loc.device.type
+    return None
+
+
+def autocast_fp32(fn: Callable) -> Callable:
+    """Decorator to run ``fn`` in float32 within mixed precision forward passes.
+
+    Half precision tensor and :class:`~torch.distributions.Normal` arguments are cast to
+    float32 and autocast is disabled while ``fn`` runs, so that numerically sensitive terms,
+    e.g., log-gamma functions or KL divergences, are not computed in ``bfloat16``. Other
+    arguments, e.g., JAX arrays, are passed through unchanged.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        device_type = _device_type([*args, *kwargs.values()])
+        if device_type is None:
+            return fn(*args, **kwargs)
+        args = [_upcast(arg) for arg in args]
+        kwargs = {key: _upcast(value) for key, value in kwargs.items()}
+        if not torch.is_autocast_enabled(device_type):
+            return fn(*args, **kwargs)
+        with torch.autocast(device_type, enabled=False):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@autocast_fp32
+def kl_divergence(p: Distribution, q: Distribution) -> torch.Tensor:
+    """KL divergence of ``p`` from ``q`` computed in float32.
+
+    Normal distributions use the closed form directly, which avoids the graph break of the
+    dispatch in :func:`torch.distributions.kl_divergence` under :func:`torch.compile`.
+    """
+    if isinstance(p, Normal) and isinstance(q, Normal):
+        var_ratio = (p.scale / q.scale).pow(2)
+        t1 = ((p.loc - q.loc) / q.scale).pow(2)
+        return 0.5 * (var_ratio + t1 - 1 - var_ratio.log())
+    return _kl_divergence(p, q)
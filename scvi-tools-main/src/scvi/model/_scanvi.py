@@ -357,6 +357,7 @@ class SCANVI(RNASeqMixin, VAEMixin, ArchesMixin, BaseMinifiedModeModelClass):
         devices: int | list[int] | str = "auto",
         datasplitter_kwargs: dict | None = None,
         plan_kwargs: dict | None = None,
+        autocast_dtype: Literal["float32", "bfloat16"] | None = None,
         **trainer_kwargs,
     ):
         """Train the model.
@@ -391,6 +392,10 @@ class SCANVI(RNASeqMixin, VAEMixin, ArchesMixin, BaseMinifiedModeModelClass):
         plan_kwargs
             Keyword args for :class:`~scvi.train.SemiSupervisedTrainingPlan`. Keyword arguments
             passed to `train()` will overwrite values present in `plan_kwargs`, when appropriate.
+        autocast_dtype
+            Data type of the forward passes, one of ``"float32"`` or ``"bfloat16"``. Passed into
+            :class:`~scvi.train.SemiSupervisedTrainingPlan`, overriding the value in
+            ``plan_kwargs``. If ``None``, the value in ``plan_kwargs`` is used.
         **trainer_kwargs
             Other keyword args for :class:`~scvi.train.Trainer`.
         """
@@ -403,6 +408,8 @@ class SCANVI(RNASeqMixin, VAEMixin, ArchesMixin, BaseMinifiedModeModelClass):
         logger.info(f"Training for {max_epochs} epochs.")
 
         plan_kwargs = {} if plan_kwargs is None else plan_kwargs
+        if autocast_dtype is not None:
+            plan_kwargs = {**plan_kwargs, "autocast_dtype": autocast_dtype}
         datasplitter_kwargs = datasplitter_kwargs or {}
 
         # if we have labeled cells, we want to subsample labels each epoch
@@ -37,7 +37,7 @@ from .base import (
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Sequence
+    from collections.abc import Iterable, Iterator, Sequence
     from typing import Literal
 
     from mudata import MuData
@@ -237,6 +237,7 @@ class TOTALVI(
         datasplitter_kwargs: dict | None = None,
         plan_kwargs: dict | None = None,
         external_indexing: list[np.array] = None,
+        autocast_dtype: Literal["float32", "bfloat16"] | None = None,
         **kwargs,
     ):
         """Trains the model using amortized variational inference.
@@ -287,6 +288,10 @@ class TOTALVI(
         external_indexing
             A list of data split indices in the order of training, validation, and test sets.
             Validation and test set are not required and can be left empty.
+        autocast_dtype
+            Data type of the forward passes, one of ``"float32"`` or ``"bfloat16"``. Passed into
+            :class:`~scvi.train.AdversarialTrainingPlan`, overriding the value in ``plan_kwargs``.
+            If ``None``, the value in ``plan_kwargs`` is used.
         **kwargs
             Other keyword args for :class:`~scvi.train.Trainer`.
         """
@@ -305,6 +310,8 @@ class TOTALVI(
             "n_epochs_kl_warmup": n_epochs_kl_warmup,
             "n_steps_kl_warmup": n_steps_kl_warmup,
         }
+        if autocast_dtype is not None:
+            update_dict["autocast_dtype"] = autocast_dtype
         if plan_kwargs is not None:
             plan_kwargs.update(update_dict)
         else:
@@ -924,10 +931,33 @@ class TOTALVI(
         transform_batch
             int of which batch to condition on for all cells
         """
+        return np.concatenate(
+            list(
+                self._iter_denoised_samples(
+                    adata=adata,
+                    indices=indices,
+                    n_samples=n_samples,
+                    batch_size=batch_size,
+                    rna_size_factor=rna_size_factor,
+                    transform_batch=transform_batch,
+                )
+            ),
+            axis=0,
+        )
+
+    def _iter_denoised_samples(
+        self,
+        adata=None,
+        indices=None,
+        n_samples: int = 25,
+        batch_size: int = 64,
+        rna_size_factor: int = 1000,
+        transform_batch: int | None = None,
+    ) -> Iterator[np.ndarray]:
+        """Yield the samples of :meth:`_get_denoised_samples` one minibatch at a time."""
         adata = self._validate_anndata(adata)
         scdl = self._make_data_loader(adata=adata, indices=indices, batch_size=batch_size)
 
-        scdl_list = []
         for tensors in scdl:
             x = tensors[REGISTRY_KEYS.X_KEY]
             y = tensors[REGISTRY_KEYS.PROTEIN_EXP_KEY]
@@ -975,11 +1005,7 @@ class TOTALVI(
             data = l_train.cpu().numpy()
             # make background 0
             data[:, :, x.shape[1] :] = data[:, :, x.shape[1] :] * (1 - mixing_sample).cpu().numpy()
-            scdl_list += [data]
-
-            scdl_list[-1] = np.transpose(scdl_list[-1], (1, 2, 0))
-
-        return np.concatenate(scdl_list, axis=0)
+            yield np.transpose(data, (1, 2, 0))
 
     @torch.inference_mode()
     def get_feature_correlation_matrix(
@@ -992,6 +1018,8 @@ class TOTALVI(
         transform_batch: Sequence[Number | str] | None = None,
         correlation_type: Literal["spearman", "pearson"] = "spearman",
         log_transform: bool = False,
+        top_k: int | None = None,
+        rank_reference_size: int = 5000,
     ) -> pd.DataFrame:
         """Generate gene-gene correlation matrix using scvi uncertainty and expression.
 
@@ -1019,13 +1047,18 @@ class TOTALVI(
             One of "pearson", "spearman".
         log_transform
             Whether to log transform denoised values prior to correlation calculation.
+        top_k
+            If not `None`, only the `top_k` strongest correlations of each feature with other
+            features, by absolute value, are returned, as a sparse :class:`~pandas.DataFrame`.
+        rank_reference_size
+            Only used if `correlation_type` is "spearman". Maximum number of samples used as a
+            reference to rank the samples of each feature. See
+            :meth:`~scvi.model.base.RNASeqMixin.get_feature_correlation_matrix`.
 
         Returns
         -------
         Gene-protein-gene-protein correlation matrix
         """
-        from scipy.stats import spearmanr
-
         adata = self._validate_anndata(adata)
         adata_manager = self.get_anndata_manager(adata, required=True)
 
@@ -1036,30 +1069,26 @@ class TOTALVI(
             self.get_anndata_manager(adata, required=True), transform_batch
         )
 
-        corr_mats = []
-        for b in transform_batch:
-            denoised_data = self._get_denoised_samples(
-                n_samples=n_samples,
-                batch_size=batch_size,
-                rna_size_factor=rna_size_factor,
-                transform_batch=b,
-                indices=indices,
-            )
-            flattened = np.zeros((denoised_data.shape[0] * n_samples, denoised_data.shape[1]))
-            for i in range(n_samples):
-                flattened[denoised_data.shape[0] * (i) : denoised_data.shape[0] * (i + 1)] = (
-                    denoised_data[:, :, i]
-                )
-            if log_transform is True:
-                flattened[:, : self.n_genes] = np.log(flattened[:, : self.n_genes] + 1e-8)
-                flattened[:, self.n_genes :] = np.log1p(flattened[:, self.n_genes :])
-            if correlation_type == "pearson":
-                corr_matrix = np.corrcoef(flattened, rowvar=False)
-            else:
-                corr_matrix, _ = spearmanr(flattened, axis=0)
-            corr_mats.append(corr_matrix)
+        n_genes = adata_manager.summary_stats.n_vars
+
+        def log_transform_fn(data: np.ndarray) -> np.ndarray:
+            data = data.copy()
+            data[:, :n_genes] = np.log(data[:, :n_genes] + 1e-8)
+            data[:, n_genes:] = np.log1p(data[:, n_genes:])
+            return data
 
-        corr_matrix = np.mean(np.stack(corr_mats), axis=0)
+        corr_matrix = self._get_feature_correlations(
+            adata=adata,
+            indices=indices,
+            n_samples=n_samples,
+            batch_size=batch_size,
+            rna_size_factor=rna_size_factor,
+            transform_batch=transform_batch,
+            correlation_type=correlation_type,
+            top_k=top_k,
+            rank_reference_size=rank_reference_size,
+            transform_fn=log_transform_fn if log_transform else None,
+        )
         var_names = _get_var_names_from_manager(adata_manager)
         names = np.concatenate(
             [
@@ -1067,6 +1096,8 @@ class TOTALVI(
                 self.protein_state_registry.column_names,
             ]
         )
+        if top_k is not None:
+            return pd.DataFrame.sparse.from_spmatrix(corr_matrix, index=names, columns=names)
         return pd.DataFrame(corr_matrix, index=names, columns=names)
 
     @torch.inference_mode()
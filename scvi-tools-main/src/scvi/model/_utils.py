@@ -1,7 +1,7 @@
 import logging
 import warnings
+from collections.abc import Callable, Sequence
 from collections.abc import Iterable as IterableClass
-from collections.abc import Sequence
 from typing import Literal
 
 import jax
@@ -160,11 +160,121 @@ def parse_device_args(
     return _accelerator, _devices
 
 
+class GroupMeans:
+    """Means of per-cell data over every group of cells, computed with one sparse product.
+
+    The sums of a field over all groups and over all cells are computed at once, by multiplying
+    the field with a sparse indicator matrix of the groups, the first time the field is
+    requested. Means over a group are then read from these sums, and means over the complement
+    of a group, e.g., the rest of the cells in one-vs-rest differential expression, are derived
+    by subtracting the sums of the group from the totals.
+
+    Parameters
+    ----------
+    groups
+        Integer code of the group of each cell. Cells with negative codes do not belong to any
+        group, but are included in the totals.
+    """
+
+    def __init__(self, groups: np.ndarray):
+        groups = np.asarray(groups)
+        self.groups = groups
+        n_groups = int(groups.max()) + 1 if len(groups) > 0 else 0
+        in_group = np.flatnonzero(groups >= 0)
+        # one row per group, followed by a row of ones for the totals
+        rows = np.concatenate([groups[in_group], np.full(len(groups), n_groups)])
+        cols = np.concatenate([in_group, np.arange(len(groups))])
+        self.indicator = sp_sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(n_groups + 1, len(groups))
+        )
+        self.sizes = np.asarray(self.indicator.sum(axis=1)).ravel()
+        self._sums = {}
+
+    def find_group(self, idx: list[int] | np.ndarray) -> tuple[int, bool] | None:
+        """Find the group whose cells, or whose complement, are selected by a boolean mask.
+
+        Returns
+        -------
+        The code of the group and whether `idx` selects its complement, or ``None`` if `idx`
+        is not a boolean mask of a group or of its complement.
+        """
+        idx = np.asarray(idx)
+        if idx.dtype != bool or idx.shape != self.groups.shape:
+            return None
+        for complement in (False, True):
+            mask = ~idx if complement else idx
+            codes = self.groups[mask]
+            if len(codes) == 0 or codes[0] < 0:
+                continue
+            if len(codes) == self.sizes[codes[0]] and (codes == codes[0]).all():
+                return int(codes[0]), complement
+        return None
+
+    def mean(self, idx: list[int] | np.ndarray, key: str, data_fn: Callable) -> np.ndarray:
+        """Mean of a field over the cells selected by `idx`.
+
+        Parameters
+        ----------
+        idx
+            Boolean mask of a group or of its complement.
+        key
+            Name of the field, under which its sums are cached.
+        data_fn
+            Callable returning the field, of shape ``(n_cells, n_vars)``, only called the
+            first time `key` is requested.
+        """
+        group = self.find_group(idx)
+        if group is None:
+            raise ValueError("`idx` does not select a group or its complement.")
+        if key not in self._sums:
+            sums = self.indicator @ data_fn()
+            if issparse(sums):
+                sums = sums.toarray()
+            self._sums[key] = np.asarray(sums, dtype=np.float64)
+        sums = self._sums[key]
+        code, complement = group
+        if complement:
+            return (sums[-1] - sums[code]) / (self.sizes[-1] - self.sizes[code])
+        return sums[code] / self.sizes[code]
+
+    def has_groups(self, *idxs: list[int] | np.ndarray) -> bool:
+        """Whether all of `idxs` select a group or its complement."""
+        return all(self.find_group(idx) is not None for idx in idxs)
+
+
+def _get_raw_norm_scaling(adata, data) -> np.ndarray:
+    """Scaling factors of the cells to 10,000 counts, stored in ``adata.obs``."""
+    key = "_scvi_raw_norm_scaling"
+    if key not in adata.obs.keys():
+        scaling_factor = 1 / np.asarray(data.sum(axis=1)).ravel().reshape(-1, 1)
+        scaling_factor *= 1e4
+        adata.obs[key] = scaling_factor.ravel()
+    else:
+        scaling_factor = adata.obs[key].to_numpy().ravel().reshape(-1, 1)
+    return scaling_factor
+
+
+def _var_key(key: str, var_idx: list[int] | np.ndarray | None) -> str:
+    """Key of the sums of a field over a subset of variables in :class:`GroupMeans`."""
+    if var_idx is None:
+        return key
+    return f"{key}_{hash(np.asarray(var_idx).tobytes())}"
+
+
+def _nonzero(data, strict: bool = False):
+    """Indicator of the nonzero (or, if `strict`, positive) entries of `data` as floats."""
+    indicator = data > 0 if strict else data != 0
+    if issparse(indicator):
+        return indicator.astype(np.float32)
+    return np.asarray(indicator, dtype=np.float32)
+
+
 def scrna_raw_counts_properties(
     adata_manager: AnnDataManager,
     idx1: list[int] | np.ndarray,
     idx2: list[int] | np.ndarray,
     var_idx: list[int] | np.ndarray | None = None,
+    group_means: GroupMeans | None = None,
 ) -> dict[str, np.ndarray]:
     """Computes and returns some statistics on the raw counts of two sub-populations.
 
@@ -178,6 +288,10 @@ def scrna_raw_counts_properties(
         subset of indices describing the second population.
     var_idx
         subset of variables to extract properties from. if None, all variables are used.
+    group_means
+        If not ``None`` and both populations are groups of `group_means` or their
+        complements, statistics are read from the sums over all groups instead of being
+        computed from the subsets of cells.
 
     Returns
     -------
@@ -188,6 +302,28 @@ def scrna_raw_counts_properties(
     """
     adata = adata_manager.adata
     data = adata_manager.get_from_registry(REGISTRY_KEYS.X_KEY)
+    scaling_factor = _get_raw_norm_scaling(adata, data)
+
+    if group_means is not None and group_means.has_groups(idx1, idx2):
+        if var_idx is not None:
+            data = data[:, var_idx]
+
+        def norm_data():
+            if issparse(data):
+                return sp_sparse.csr_matrix(data.multiply(scaling_factor))
+            return data * scaling_factor
+
+        fields = {
+            "raw_mean": lambda: data,
+            "non_zeros_proportion": lambda: _nonzero(data),
+            "raw_normalized_mean": norm_data,
+        }
+        return {
+            f"{name}{i}": group_means.mean(idx, _var_key(f"scrna_{name}", var_idx), data_fn)
+            for name, data_fn in fields.items()
+            for i, idx in ((1, idx1), (2, idx2))
+        }
+
     data1 = data[idx1]
     data2 = data[idx2]
     if var_idx is not None:
@@ -199,14 +335,6 @@ def scrna_raw_counts_properties(
     nonz1 = np.asarray((data1 != 0).mean(axis=0)).ravel()
     nonz2 = np.asarray((data2 != 0).mean(axis=0)).ravel()
 
-    key = "_scvi_raw_norm_scaling"
-    if key not in adata.obs.keys():
-        scaling_factor = 1 / np.asarray(data.sum(axis=1)).ravel().reshape(-1, 1)
-        scaling_factor *= 1e4
-        adata.obs[key] = scaling_factor.ravel()
-    else:
-        scaling_factor = adata.obs[key].to_numpy().ravel().reshape(-1, 1)
-
     if issubclass(type(data), sp_sparse.spmatrix):
         norm_data1 = data1.multiply(scaling_factor[idx1])
         norm_data2 = data2.multiply(scaling_factor[idx2])
@@ -232,6 +360,7 @@ def cite_seq_raw_counts_properties(
     adata_manager: AnnDataManager,
     idx1: list[int] | np.ndarray,
     idx2: list[int] | np.ndarray,
+    group_means: GroupMeans | None = None,
 ) -> dict[str, np.ndarray]:
     """Computes and returns some statistics on the raw counts of two sub-populations.
 
@@ -243,6 +372,10 @@ def cite_seq_raw_counts_properties(
         subset of indices describing the first population.
     idx2
         subset of indices describing the second population.
+    group_means
+        If not ``None`` and both populations are groups of `group_means` or their
+        complements, statistics are read from the sums over all groups instead of being
+        computed from the subsets of cells.
 
     Returns
     -------
@@ -251,17 +384,24 @@ def cite_seq_raw_counts_properties(
         mean expression per gene, proportion of non-zero expression per gene, mean of normalized
         expression.
     """
-    gp = scrna_raw_counts_properties(adata_manager, idx1, idx2)
+    gp = scrna_raw_counts_properties(adata_manager, idx1, idx2, group_means=group_means)
     protein_exp = adata_manager.get_from_registry(REGISTRY_KEYS.PROTEIN_EXP_KEY)
 
     nan = np.array([np.nan] * adata_manager.summary_stats.n_proteins)
     protein_exp = adata_manager.get_from_registry(REGISTRY_KEYS.PROTEIN_EXP_KEY)
     if issparse(protein_exp):
         protein_exp = protein_exp.toarray()
-    mean1_pro = np.asarray(protein_exp[idx1].mean(0))
-    mean2_pro = np.asarray(protein_exp[idx2].mean(0))
-    nonz1_pro = np.asarray((protein_exp[idx1] > 0).mean(0))
-    nonz2_pro = np.asarray((protein_exp[idx2] > 0).mean(0))
+    if group_means is not None and group_means.has_groups(idx1, idx2):
+        protein_exp = np.asarray(protein_exp)
+        mean1_pro = group_means.mean(idx1, "protein_mean", lambda: protein_exp)
+        mean2_pro = group_means.mean(idx2, "protein_mean", lambda: protein_exp)
+        nonz1_pro = group_means.mean(idx1, "protein_nonzero", lambda: _nonzero(protein_exp, True))
+        nonz2_pro = group_means.mean(idx2, "protein_nonzero", lambda: _nonzero(protein_exp, True))
+    else:
+        mean1_pro = np.asarray(protein_exp[idx1].mean(0))
+        mean2_pro = np.asarray(protein_exp[idx2].mean(0))
+        nonz1_pro = np.asarray((protein_exp[idx1] > 0).mean(0))
+        nonz2_pro = np.asarray((protein_exp[idx2] > 0).mean(0))
     properties = {
         "raw_mean1": np.concatenate([gp["raw_mean1"], mean1_pro]),
         "raw_mean2": np.concatenate([gp["raw_mean2"], mean2_pro]),
@@ -279,6 +419,7 @@ def scatac_raw_counts_properties(
     idx1: list[int] | np.ndarray,
     idx2: list[int] | np.ndarray,
     var_idx: list[int] | np.ndarray | None = None,
+    group_means: GroupMeans | None = None,
 ) -> dict[str, np.ndarray]:
     """Computes and returns some statistics on the raw counts of two sub-populations.
 
@@ -292,6 +433,10 @@ def scatac_raw_counts_properties(
         subset of indices describing the second population.
     var_idx
         subset of variables to extract properties from. if None, all variables are used.
+    group_means
+        If not ``None`` and both populations are groups of `group_means` or their
+        complements, statistics are read from the sums over all groups instead of being
+        computed from the subsets of cells.
 
     Returns
     -------
@@ -299,6 +444,14 @@ def scatac_raw_counts_properties(
         Dict of ``np.ndarray`` containing, by pair (one for each sub-population).
     """
     data = adata_manager.get_from_registry(REGISTRY_KEYS.X_KEY)
+    if group_means is not None and group_means.has_groups(idx1, idx2):
+        if var_idx is not None:
+            data = data[:, var_idx]
+        key = _var_key("scatac_emp_mean", var_idx)
+        mean1 = group_means.mean(idx1, key, lambda: _nonzero(data, True))
+        mean2 = group_means.mean(idx2, key, lambda: _nonzero(data, True))
+        return {"emp_mean1": mean1, "emp_mean2": mean2, "emp_effect": (mean1 - mean2)}
+
     data1 = data[idx1]
     data2 = data[idx2]
     if var_idx is not None:
@@ -4,8 +4,9 @@ from ._base_model import (
     BaseModelClass,
     BaseMudataMinifiedModeModelClass,
 )
-from ._differential import DifferentialComputation
+from ._differential import DifferentialComputation, PosteriorSampleCache
 from ._embedding_mixin import EmbeddingMixin
+from ._ensemble import ModelEnsemble
 from ._jaxmixin import JaxTrainingMixin
 from ._pyromixin import (
     PyroJitGuideWarmup,
@@ -28,8 +29,10 @@ __all__ = [
     "PyroJitGuideWarmup",
     "PyroModelGuideWarmup",
     "DifferentialComputation",
+    "PosteriorSampleCache",
     "JaxTrainingMixin",
     "BaseMinifiedModeModelClass",
     "BaseMudataMinifiedModeModelClass",
     "EmbeddingMixin",
+    "ModelEnsemble",
 ]
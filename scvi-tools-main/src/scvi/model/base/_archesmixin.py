@@ -359,7 +359,9 @@ def _set_params_online_update(
     def requires_grad(key):
         mod_name = key.split(".")[0]
         # linear weights and bias that need grad
-        one = "fc_layers" in key and ".0." in key and mod_name not in mod_inference_mode
+        one = (
+            ("fc_layers" in key and ".0." in key) or "covariate_embeddings" in key
+        ) and mod_name not in mod_inference_mode
         # modules that need grad
         two = mod_name in mod_no_hooks_yes_grad
         three = sum([p in key for p in parameters_yes_grad]) > 0
@@ -30,6 +30,7 @@ from scvi.data._utils import _assign_adata_uuid, _check_if_view, _get_adata_mini
 from scvi.dataloaders import AnnDataLoader
 from scvi.model._utils import parse_device_args
 from scvi.model.base._constants import SAVE_KEYS
+from scvi.model.base._inference_cache import InferenceCache
 from scvi.model.base._save_load import (
     _initialize_model,
     _load_legacy_saved_files,
@@ -120,6 +121,7 @@ class BaseModelClass(metaclass=BaseModelMetaClass):
         self.test_indices_ = None
         self.validation_indices_ = None
         self.history_ = None
+        self._inference_cache = None
 
     @property
     def adata(self) -> AnnOrMuData:
@@ -166,6 +168,37 @@ class BaseModelClass(metaclass=BaseModelMetaClass):
         """The current device that the module's params are on."""
         return self.module.device
 
+    def enable_inference_cache(
+        self, max_memory_mb: float = 1024, spill_path: str | os.PathLike | None = None
+    ):
+        """Cache the outputs of inference methods across calls.
+
+        Outputs of methods such as ``get_latent_representation``, ``get_latent_library_size``
+        and ``get_normalized_expression`` are cached, keyed by the AnnData object, the indices
+        and the other arguments, so that repeated calls skip the forward passes. The cache is
+        cleared automatically once the weights of the module change, e.g., after training.
+        Outputs computed from Monte Carlo samples are returned as drawn in the first call.
+
+        The AnnData object is identified by the UUID assigned when it is registered, so the cache
+        must be cleared with :meth:`disable_inference_cache` if its data is modified in place.
+
+        Parameters
+        ----------
+        max_memory_mb
+            Memory budget of the cached outputs, in megabytes. The least recently used outputs
+            are evicted once the budget is exceeded.
+        spill_path
+            If not ``None``, directory where evicted outputs are written instead of being
+            dropped.
+        """
+        self._inference_cache = InferenceCache(max_memory_mb=max_memory_mb, spill_path=spill_path)
+
+    def disable_inference_cache(self):
+        """Stop caching the outputs of inference methods and clear the cache."""
+        if self._inference_cache is not None:
+            self._inference_cache.clear()
+        self._inference_cache = None
+
     @staticmethod
     def _get_setup_method_args(**setup_locals) -> dict:
         """Returns a dictionary organizing the arguments used to call ``setup_anndata``.
@@ -446,6 +479,11 @@ class BaseModelClass(metaclass=BaseModelMetaClass):
             data_loader_kwargs.update({"num_workers": settings.dl_num_workers})
         if "persistent_workers" not in data_loader_kwargs:
             data_loader_kwargs.update({"persistent_workers": settings.dl_persistent_workers})
+        prefetch_depth = data_loader_kwargs.get("prefetch_depth", None)
+        if prefetch_depth is None:
+            prefetch_depth = settings.dl_prefetch_depth
+        if prefetch_depth > 0:
+            data_loader_kwargs.setdefault("prefetch_device", self.device)
 
         dl = data_loader_class(
             adata_manager,
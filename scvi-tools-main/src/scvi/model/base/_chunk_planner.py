@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import torch
+
+from scvi import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# memory budget used when the free memory of the device cannot be probed
+_DEFAULT_MEMORY_BUDGET = 1024**3
+# temporaries held per activation, e.g., the outputs of linear, normalization and activation
+# layers, or the rate, dispersion and log-probability terms of the likelihood
+_HIDDEN_TEMPORARIES = 3
+_FEATURE_TEMPORARIES = 6
+
+
+def _available_memory(device: torch.device) -> int | None:
+    """Free memory of ``device`` in bytes, or ``None`` if it cannot be probed."""
+    if device.type == "cuda":
+        free, _ = torch.cuda.mem_get_info(device)
+        # memory cached by the allocator is free for new tensors as well
+        return free + torch.cuda.memory_reserved(device) - torch.cuda.memory_allocated(device)
+    if device.type == "mps":
+        return torch.mps.recommended_max_memory() - torch.mps.driver_allocated_memory()
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _is_out_of_memory(error: RuntimeError) -> bool:
+    if isinstance(error, torch.OutOfMemoryError):
+        return True
+    message = str(error).lower()
+    return "out of memory" in message or "can't allocate memory" in message
+
+
+class ChunkPlanner:
+    """Minibatch and Monte Carlo sample chunk sizes that fit in the free memory of a device.
+
+    The memory of the activations of one cell and one Monte Carlo sample is estimated from the
+    widths of the layers of the module. Chunks are then sized so that their activations fit in
+    :attr:`scvi.settings.inference_memory_fraction` of the free memory, preferring to keep all
+    samples of a cell in one pass. If a chunk still runs out of memory, the number of samples
+    per pass, then the number of cells per chunk, is halved and the chunk is retried.
+
+    Parameters
+    ----------
+    bytes_per_sample
+        Estimated memory of the activations of one cell and one Monte Carlo sample, in bytes.
+    device
+        Device the module runs on.
+    max_batch_size
+        Largest number of cells per chunk. Defaults to ``scvi.settings.batch_size``.
+    """
+
+    def __init__(
+        self,
+        bytes_per_sample: int,
+        device: torch.device | str = "cpu",
+        max_batch_size: int | None = None,
+    ):
+        self.bytes_per_sample = max(1, int(bytes_per_sample))
+        self.device = torch.device(device)
+        self.max_batch_size = max_batch_size or settings.batch_size
+        self.batch_size = self.max_batch_size
+        self.samples_per_pass = 1
+        self._fixed_batch_size = False
+        self._fixed_samples_per_pass = False
+
+    @classmethod
+    def from_module(cls, module: torch.nn.Module, n_features: int, **kwargs) -> ChunkPlanner:
+        """Planner with the activation memory estimated from the layers of ``module``.
+
+        Parameters
+        ----------
+        module
+            Module whose forward pass is chunked.
+        n_features
+            Number of input features, e.g., genes. Layers at least this wide are counted as
+            feature-wise outputs, which hold more temporaries than hidden layers.
+        **kwargs
+            Keyword arguments passed into :class:`~scvi.model.base._chunk_planner.ChunkPlanner`.
+        """
+        feature_width = n_features
+        hidden_width = 0
+        for layer in module.modules():
+            if not isinstance(layer, torch.nn.Linear):
+                continue
+            if layer.out_features >= n_features:
+                feature_width += layer.out_features
+            else:
+                hidden_width += layer.out_features
+        parameter = next(module.parameters(), None)
+        element_size = 4 if parameter is None else parameter.element_size()
+        bytes_per_sample = element_size * (
+            _FEATURE_TEMPORARIES * feature_width + _HIDDEN_TEMPORARIES * hidden_width
+        )
+        return cls(bytes_per_sample, **kwargs)
+
+    @property
+    def memory_budget(self) -> int:
+        """Memory that the activations of a chunk may use, in bytes."""
+        available = _available_memory(self.device)
+        if available is None:
+            return _DEFAULT_MEMORY_BUDGET
+        return int(settings.inference_memory_fraction * available)
+
+    def plan(
+        self,
+        n_samples: int = 1,
+        batch_size: int | None = None,
+        samples_per_pass: int | None = None,
+    ) -> tuple[int, int]:
+        """Pick the number of cells per chunk and of Monte Carlo samples per pass.
+
+        Parameters
+        ----------
+        n_samples
+            Total number of Monte Carlo samples per cell.
+        batch_size
+            If not ``None``, fixes the number of cells per chunk.
+        samples_per_pass
+            If not ``None``, fixes the number of samples per pass, e.g., ``n_samples`` if the
+            samples of a cell cannot be split across passes.
+
+        Returns
+        -------
+        Tuple of the number of cells per chunk and of samples per pass.
+        """
+        self._fixed_batch_size = batch_size is not None
+        self._fixed_samples_per_pass = samples_per_pass is not None
+        n_samples = max(1, n_samples)
+        budget = max(1, self.memory_budget // self.bytes_per_sample)  # cell-samples per pass
+
+        if samples_per_pass is None:
+            cells = batch_size or self.max_batch_size
+            samples_per_pass = min(n_samples, max(1, budget // cells))
+        samples_per_pass = min(samples_per_pass, n_samples)
+        if batch_size is None:
+            batch_size = min(self.max_batch_size, max(1, budget // samples_per_pass))
+
+        self.batch_size = batch_size
+        self.samples_per_pass = samples_per_pass
+        logger.debug(
+            f"Planned chunks of {batch_size} cells and {samples_per_pass} Monte Carlo samples per "
+            f"pass for a budget of {budget} cell-samples."
+        )
+        return batch_size, samples_per_pass
+
+    def shrink(self) -> bool:
+        """Halve the number of samples per pass, or else of cells per chunk.
+
+        Returns
+        -------
+        Whether the chunks could be shrunk.
+        """
+        if not self._fixed_samples_per_pass and self.samples_per_pass > 1:
+            self.samples_per_pass //= 2
+        elif not self._fixed_batch_size and self.batch_size > 1:
+            self.batch_size //= 2
+        else:
+            return False
+        logger.info(
+            f"Out of memory, retrying with chunks of {self.batch_size} cells and "
+            f"{self.samples_per_pass} Monte Carlo samples per pass."
+        )
+        return True
+
+    def map(self, fn: Callable[[dict, int], Any], tensors: dict[str, Any]) -> list[Any]:
+        """Apply ``fn`` to chunks of the cells of a minibatch, shrinking the chunks on OOM.
+
+        Parameters
+        ----------
+        fn
+            Function taking the tensors of a chunk of cells and the number of Monte Carlo
+            samples per pass.
+        tensors
+            Minibatch of tensors with cells along the first dimension.
+
+        Returns
+        -------
+        Outputs of ``fn`` for consecutive chunks of cells.
+        """
+        n_obs = next(len(value) for value in tensors.values() if isinstance(value, torch.Tensor))
+        outputs = []
+        start = 0
+        while start < n_obs:
+            stop = min(start + self.batch_size, n_obs)
+            chunk = {
+                key: value[start:stop] if isinstance(value, torch.Tensor) else value
+                for key, value in tensors.items()
+            }
+            try:
+                outputs.append(fn(chunk, self.samples_per_pass))
+            except RuntimeError as error:
+                if not _is_out_of_memory(error) or not self.shrink():
+                    raise
+                if self.device.type == "cuda":
+                    torch.cuda.empty_cache()
+                continue
+            start = stop
+        return outputs
@@ -1,3 +1,4 @@
+import inspect
 import logging
 import warnings
 from collections.abc import Iterable as IterableClass
@@ -8,9 +9,10 @@ import pandas as pd
 
 from scvi import settings
 from scvi.data._constants import _ADATA_MINIFY_TYPE_UNS_KEY, ADATA_MINIFY_TYPE
+from scvi.model._utils import GroupMeans
 from scvi.utils import track
 
-from ._differential import DifferentialComputation
+from ._differential import DifferentialComputation, PosteriorSampleCache
 
 logger = logging.getLogger(__name__)
 
@@ -123,9 +125,18 @@ def _de_core(
     fdr,
     silent,
     subset_idx=None,
+    cache_samples=False,
+    cache_kwargs=None,
     **kwargs,
 ):
-    """Internal function for DE interface."""
+    """Internal function for DE interface.
+
+    If `cache_samples` is ``True``, posterior samples of the cells of all comparisons are
+    computed once by a :class:`~scvi.model.base.PosteriorSampleCache` created with
+    `cache_kwargs`, instead of once per comparison. If `backend` is ``"torch"`` in `kwargs`,
+    the properties of all comparisons are computed by
+    :meth:`~scvi.model.base.DifferentialComputation.get_bayes_factors_batched`.
+    """
     if (
         adata_manager.adata.uns.get(_ADATA_MINIFY_TYPE_UNS_KEY, None)
         == ADATA_MINIFY_TYPE.LATENT_POSTERIOR
@@ -157,22 +168,50 @@ def _de_core(
         adata.obs[temp_key] = obs_col
         groupby = temp_key
 
-    df_results = []
-    dc = DifferentialComputation(model_fn, representation_fn, adata_manager)
-    for g1 in track(
-        group1,
-        description="DE...",
-        disable=silent,
-    ):
+    comparisons = []
+    for g1 in group1:
         cell_idx1 = (adata.obs[groupby] == g1).to_numpy().ravel()
         if group2 is None:
             cell_idx2 = ~cell_idx1
         else:
             cell_idx2 = (adata.obs[groupby] == group2).to_numpy().ravel()
+        comparisons.append((g1, cell_idx1, cell_idx2))
+
+    sample_cache = None
+    if cache_samples:
+        # only the cells of some comparison are run through the model
+        in_comparisons = np.logical_or.reduce(
+            [cell_idx1 | cell_idx2 for _, cell_idx1, cell_idx2 in comparisons]
+        )
+        sample_cache = PosteriorSampleCache(
+            model_fn,
+            adata,
+            indices=np.flatnonzero(in_comparisons),
+            representation_fn=representation_fn,
+            **(cache_kwargs or {}),
+        )
+
+    all_stats_kwargs = {}
+    if all_stats and "group_means" in inspect.signature(all_stats_fn).parameters:
+        # statistics of all groups are computed at once, and those of the rest by subtraction
+        groups = adata.obs[groupby].astype("category").cat.codes.to_numpy()
+        all_stats_kwargs["group_means"] = GroupMeans(groups)
 
-        all_info = dc.get_bayes_factors(
-            cell_idx1,
-            cell_idx2,
+    df_results = []
+    dc = DifferentialComputation(
+        model_fn, representation_fn, adata_manager, sample_cache=sample_cache
+    )
+    batched_infos = None
+    if kwargs.get("backend") == "torch":
+        kwargs = {key: value for key, value in kwargs.items() if key != "backend"}
+        if kwargs.get("change_fn") not in (None, "log-fold") or kwargs.get("m1_domain_fn"):
+            raise ValueError(
+                "Custom `change_fn` and `m1_domain_fn` are only supported with `backend='numpy'`."
+            )
+        kwargs.pop("change_fn", None)
+        kwargs.pop("m1_domain_fn", None)
+        batched_infos = dc.get_bayes_factors_batched(
+            [(cell_idx1, cell_idx2) for _, cell_idx1, cell_idx2 in comparisons],
             mode=mode,
             delta=delta,
             batchid1=batchid1,
@@ -180,9 +219,31 @@ def _de_core(
             use_observed_batches=not batch_correction,
             **kwargs,
         )
+    for i, (g1, cell_idx1, cell_idx2) in enumerate(
+        track(
+            comparisons,
+            description="DE...",
+            disable=silent,
+        )
+    ):
+        if batched_infos is not None:
+            all_info = batched_infos[i]
+        else:
+            all_info = dc.get_bayes_factors(
+                cell_idx1,
+                cell_idx2,
+                mode=mode,
+                delta=delta,
+                batchid1=batchid1,
+                batchid2=batchid2,
+                use_observed_batches=not batch_correction,
+                **kwargs,
+            )
 
         if all_stats is True:
-            genes_properties_dict = all_stats_fn(adata_manager, cell_idx1, cell_idx2)
+            genes_properties_dict = all_stats_fn(
+                adata_manager, cell_idx1, cell_idx2, **all_stats_kwargs
+            )
             all_info = {**all_info, **genes_properties_dict}
 
         res = pd.DataFrame(all_info, index=col_names)
@@ -1,12 +1,15 @@
 import inspect
 import logging
+import os
 import warnings
 from collections.abc import Callable, Sequence
+from pathlib import Path
 from typing import Literal
 
 import numpy as np
 import pandas as pd
 import torch
+from anndata import AnnData
 from scipy.sparse import issparse
 from sklearn.covariance import EllipticEnvelope
 from sklearn.mixture import GaussianMixture
@@ -18,6 +21,124 @@ from scvi.data import AnnDataManager
 logger = logging.getLogger(__name__)
 
 
+class PosteriorSampleCache:
+    """Posterior samples of a set of cells, computed once and shared across DE comparisons.
+
+    Without a cache, :class:`~scvi.model.base.DifferentialComputation` runs `model_fn` on the
+    cells of both groups of every comparison, so that comparing each of many groups to the rest
+    runs the model on the whole dataset once per group. The cache instead runs `model_fn` once
+    per batch condition on all of its cells, keeps ``n_samples_per_cell`` posterior samples of
+    each cell, and answers every comparison by drawing samples of the selected cells.
+
+    Parameters
+    ----------
+    model_fn
+        Callable in model API to get values from, e.g.,
+        :meth:`~scvi.model.SCVI.get_normalized_expression`. Must accept the `n_samples`,
+        `return_mean` and `transform_batch` arguments, and `output_path` if `path` is not
+        ``None``.
+    adata
+        AnnData object the cells are taken from.
+    indices
+        Indices of the cells to cache. If ``None``, all cells are cached.
+    n_samples_per_cell
+        Number of posterior samples cached per cell and batch condition.
+    path
+        Directory the samples are written to, one subdirectory per batch condition, and read
+        from as memory maps. If ``None``, the samples are kept in memory.
+    representation_fn
+        Callable providing latent representations, e.g.,
+        :meth:`~scvi.model.SCVI.get_latent_representation`, which are cached as well if not
+        ``None``.
+    """
+
+    def __init__(
+        self,
+        model_fn: Callable,
+        adata: AnnData,
+        indices: Sequence[int] | np.ndarray | None = None,
+        n_samples_per_cell: int = 4,
+        path: str | os.PathLike | None = None,
+        representation_fn: Callable | None = None,
+    ):
+        if n_samples_per_cell < 1:
+            raise ValueError("`n_samples_per_cell` must be at least 1.")
+        self.model_fn = model_fn
+        self.adata = adata
+        self.indices = np.arange(adata.n_obs) if indices is None else np.asarray(indices)
+        self.n_samples_per_cell = n_samples_per_cell
+        self.path = None if path is None else Path(path)
+        self.representation_fn = representation_fn
+        # position of each cell of adata in the cache, -1 if not cached
+        self._positions = np.full(adata.n_obs, -1)
+        self._positions[self.indices] = np.arange(len(self.indices))
+        self._samples = {}
+        self._representation = None
+
+    def _get_rows(self, selection: np.ndarray) -> np.ndarray:
+        rows = self._positions[selection]
+        if (rows < 0).any():
+            raise ValueError("Some of the selected cells are not cached.")
+        return rows
+
+    def _compute_samples(self, batch: Number | str | None) -> np.ndarray:
+        kwargs = {}
+        if self.path is not None:
+            kwargs["output_path"] = self.path / f"condition_{len(self._samples)}"
+        samples = self.model_fn(
+            self.adata,
+            indices=self.indices,
+            transform_batch=batch,
+            n_samples=self.n_samples_per_cell,
+            return_mean=False,
+            **kwargs,
+        )
+        if self.n_samples_per_cell == 1:
+            samples = samples[None]
+        # (n_samples_per_cell, n_cells, n_vars)
+        return samples
+
+    def get_samples(
+        self, selection: Sequence[int] | np.ndarray, batch: Number | str | None, n_samples: int
+    ) -> np.ndarray:
+        """Draw posterior samples of the selected cells, uniformly over cells and samples.
+
+        Parameters
+        ----------
+        selection
+            Indices of the cells in `adata` to draw samples of.
+        batch
+            Batch condition of the samples, passed as `transform_batch` to `model_fn`. ``None``
+            conditions on the observed batches.
+        n_samples
+            Number of samples to draw.
+
+        Returns
+        -------
+        Array of shape ``(n_samples, n_vars)``.
+        """
+        key = "__observed__" if batch is None else batch
+        if key not in self._samples:
+            self._samples[key] = self._compute_samples(batch)
+        samples = self._samples[key]
+
+        rows = np.random.choice(self._get_rows(np.asarray(selection)), size=n_samples)
+        draws = np.random.randint(self.n_samples_per_cell, size=n_samples)
+        # samples are read in storage order, which is much faster for memory maps
+        order = np.lexsort((rows, draws))
+        out = np.empty((n_samples, samples.shape[-1]), dtype=samples.dtype)
+        out[order] = samples[draws[order], rows[order]]
+        return out
+
+    def get_representation(self, selection: Sequence[int] | np.ndarray) -> np.ndarray:
+        """Latent representations of the selected cells."""
+        if self.representation_fn is None:
+            raise ValueError("No `representation_fn` was provided.")
+        if self._representation is None:
+            self._representation = self.representation_fn(self.adata, indices=self.indices)
+        return self._representation[self._get_rows(np.asarray(selection))]
+
+
 class DifferentialComputation:
     """Unified class for differential computation.
 
@@ -34,6 +155,10 @@ class DifferentialComputation:
         :meth:`~scvi.model.SCVI.get_latent_representation`, for scVI.
     adata_manager
         AnnDataManager created by :meth:`~scvi.model.SCVI.setup_anndata`.
+    sample_cache
+        If not ``None``, posterior samples and latent representations are drawn from this
+        :class:`~scvi.model.base.PosteriorSampleCache` instead of running `model_fn` and
+        `representation_fn` for every comparison.
     """
 
     def __init__(
@@ -41,19 +166,24 @@ class DifferentialComputation:
         model_fn: Callable,
         representation_fn: Callable,
         adata_manager: AnnDataManager,
+        sample_cache: PosteriorSampleCache | None = None,
     ):
         self.adata_manager = adata_manager
         self.adata = adata_manager.adata
         self.model_fn = model_fn
         self.representation_fn = representation_fn
+        self.sample_cache = sample_cache
 
     def filter_outlier_cells(self, selection: list[bool] | np.ndarray):
         """Filters out cells that are outliers in the representation space."""
         selection = self.process_selection(selection)
-        reps = self.representation_fn(
-            self.adata,
-            indices=selection,
-        )
+        if self.sample_cache is not None and self.sample_cache.representation_fn is not None:
+            reps = self.sample_cache.get_representation(selection)
+        else:
+            reps = self.representation_fn(
+                self.adata,
+                indices=selection,
+            )
         try:
             idx_filt = EllipticEnvelope().fit_predict(reps)
             idx_filt = idx_filt == 1
@@ -84,6 +214,8 @@ class DifferentialComputation:
         threshold_counts: float = 0.01,
         test_mode: Literal["two", "three"] = "three",
         cred_interval_lvls: list[float] | np.ndarray | None = None,
+        backend: Literal["numpy", "torch"] = "numpy",
+        device: torch.device | str | None = None,
     ) -> dict[str, np.ndarray]:
         r"""A unified method for differential expression inference.
 
@@ -203,84 +335,58 @@ class DifferentialComputation:
         cred_interval_lvls
             List of credible interval levels to compute for the posterior
             LFC distribution
+        backend
+            One of
+
+            * ``"numpy"``: compute the change distribution and its properties with numpy.
+            * ``"torch"``: compute them with torch on ``device``, see
+              :meth:`get_bayes_factors_batched`. Only supports the default ``change_fn`` and
+              ``m1_domain_fn``.
+        device
+            Device of the ``"torch"`` backend. Defaults to the GPU if available, else the CPU.
 
         Returns
         -------
         Differential expression properties
 
         """
-        eps = 1e-8
-        # Normalized means sampling for both populations
-        if self.representation_fn is not None:
-            idx1 = self.filter_outlier_cells(idx1)
-            idx2 = self.filter_outlier_cells(idx2)
+        if backend == "torch":
+            if change_fn not in (None, "log-fold") or m1_domain_fn is not None:
+                raise ValueError(
+                    "Custom `change_fn` and `m1_domain_fn` are only supported with "
+                    "`backend='numpy'`."
+                )
+            return self.get_bayes_factors_batched(
+                [(idx1, idx2)],
+                mode=mode,
+                batchid1=batchid1,
+                batchid2=batchid2,
+                use_observed_batches=use_observed_batches,
+                n_samples_overall=n_samples_overall,
+                use_permutation=use_permutation,
+                m_permutation=m_permutation,
+                delta=delta,
+                pseudocounts=pseudocounts,
+                threshold_counts=threshold_counts,
+                test_mode=test_mode,
+                cred_interval_lvls=cred_interval_lvls,
+                device=device,
+            )[0]
+        elif backend != "numpy":
+            raise ValueError("`backend` must be one of 'numpy', 'torch'.")
 
-        scales_batches_1 = self.scale_sampler(
-            selection=idx1,
-            batchid=batchid1,
-            use_observed_batches=use_observed_batches,
-            n_samples_overall=n_samples_overall,
-        )
-        scales_batches_2 = self.scale_sampler(
-            selection=idx2,
-            batchid=batchid2,
+        eps = 1e-8
+        idx1, idx2, scales_1, scales_2, px_scale_mean1, px_scale_mean2 = self._sample_pairs(
+            idx1,
+            idx2,
+            batchid1=batchid1,
+            batchid2=batchid2,
             use_observed_batches=use_observed_batches,
             n_samples_overall=n_samples_overall,
+            use_permutation=use_permutation,
+            m_permutation=m_permutation,
         )
 
-        px_scale_mean1 = scales_batches_1["scale"].mean(axis=0)
-        px_scale_mean2 = scales_batches_2["scale"].mean(axis=0)
-
-        # Sampling pairs
-        # The objective of code section below is to ensure than the samples of normalized
-        # means we consider are conditioned on the same batch id
-        batchid1_vals = np.unique(scales_batches_1["batch"])
-        batchid2_vals = np.unique(scales_batches_2["batch"])
-
-        create_pairs_from_same_batches = (
-            set(batchid1_vals) == set(batchid2_vals)
-        ) and not use_observed_batches
-        if create_pairs_from_same_batches:
-            # First case: same batch normalization in two groups
-            logger.debug("Same batches in both cell groups")
-            n_batches = len(set(batchid1_vals))
-            n_samples_per_batch = m_permutation // n_batches if m_permutation is not None else None
-            logger.debug(f"Using {n_samples_per_batch} samples per batch for pair matching")
-            scales_1 = []
-            scales_2 = []
-            for batch_val in set(batchid1_vals):
-                # Select scale samples that originate from the same batch id
-                scales_1_batch = scales_batches_1["scale"][scales_batches_1["batch"] == batch_val]
-                scales_2_batch = scales_batches_2["scale"][scales_batches_2["batch"] == batch_val]
-
-                # Create more pairs
-                scales_1_local, scales_2_local = pairs_sampler(
-                    scales_1_batch,
-                    scales_2_batch,
-                    use_permutation=use_permutation,
-                    m_permutation=n_samples_per_batch,
-                )
-                scales_1.append(scales_1_local)
-                scales_2.append(scales_2_local)
-            scales_1 = np.concatenate(scales_1, axis=0)
-            scales_2 = np.concatenate(scales_2, axis=0)
-        else:
-            logger.debug("Ignoring batch conditionings to compare means")
-            if len(set(batchid1_vals).intersection(set(batchid2_vals))) >= 1:
-                warnings.warn(
-                    "Batchids of cells groups 1 and 2 are different but have an non-null "
-                    "intersection. Specific handling of such situations is not "
-                    "implemented yet and batch correction is not trustworthy.",
-                    UserWarning,
-                    stacklevel=settings.warnings_stacklevel,
-                )
-            scales_1, scales_2 = pairs_sampler(
-                scales_batches_1["scale"],
-                scales_batches_2["scale"],
-                use_permutation=use_permutation,
-                m_permutation=m_permutation,
-            )
-
         # Core of function: hypotheses testing based on the posterior samples we obtained above
         if mode == "vanilla":
             logger.debug("Differential expression using vanilla mode")
@@ -297,16 +403,8 @@ class DifferentialComputation:
         elif mode == "change":
             # Adding pseudocounts to the scales
             if pseudocounts is None:
-                logger.debug("Estimating pseudocounts offet from the data")
-                x = self.adata_manager.get_from_registry(REGISTRY_KEYS.X_KEY)
-                where_zero_a = np.asarray(np.mean(x[idx1], 0)).flatten() < threshold_counts
-                where_zero_b = np.asarray(np.mean(x[idx2], 0)).flatten() < threshold_counts
-                pseudocounts = estimate_pseudocounts_offset(
-                    scales_a=scales_1,
-                    scales_b=scales_2,
-                    where_zero_a=where_zero_a,
-                    where_zero_b=where_zero_b,
-                    quantile=0.9,
+                pseudocounts = self._estimate_pseudocounts(
+                    idx1, idx2, scales_1, scales_2, threshold_counts
                 )
             logger.debug(f"Using pseudocounts ~ {pseudocounts}")
 
@@ -389,6 +487,224 @@ class DifferentialComputation:
 
         return res
 
+    def get_bayes_factors_batched(
+        self,
+        comparisons: Sequence[tuple[list[bool] | np.ndarray, list[bool] | np.ndarray]],
+        mode: Literal["vanilla", "change"] = "change",
+        batchid1: Sequence[Number | str] | None = None,
+        batchid2: Sequence[Number | str] | None = None,
+        use_observed_batches: bool | None = False,
+        n_samples_overall: int = 5000,
+        use_permutation: bool = False,
+        m_permutation: int = 10000,
+        delta: float | None = 0.5,
+        pseudocounts: float | None = None,
+        threshold_counts: float = 0.01,
+        test_mode: Literal["two", "three"] = "three",
+        cred_interval_lvls: list[float] | np.ndarray | None = None,
+        device: torch.device | str | None = None,
+        max_memory_mb: float = 1024,
+    ) -> list[dict[str, np.ndarray]]:
+        """:meth:`get_bayes_factors` of many comparisons with torch.
+
+        Scale samples are paired as in :meth:`get_bayes_factors` and moved to ``device``, where
+        the log fold-change distributions, the probabilities of differential expression, the
+        medians and the credible intervals of consecutive comparisons with the same number of
+        pairs are computed together in vectorized passes over blocks of genes.
+
+        Parameters
+        ----------
+        comparisons
+            Pairs of ``idx1`` and ``idx2`` of each comparison.
+        mode, batchid1, batchid2, use_observed_batches, n_samples_overall, use_permutation,
+        m_permutation, delta, pseudocounts, threshold_counts, test_mode, cred_interval_lvls
+            See :meth:`get_bayes_factors`.
+        device
+            Device of the computations. Defaults to the GPU if available, else the CPU.
+        max_memory_mb
+            Approximate memory budget, in megabytes, of the scale samples of the comparisons
+            processed together and of the temporaries of each block of genes.
+
+        Returns
+        -------
+        Differential expression properties of each comparison, as returned by
+        :meth:`get_bayes_factors`.
+        """
+        if mode not in ("vanilla", "change"):
+            raise NotImplementedError(f"Mode {mode} not recognized")
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        device = torch.device(device)
+        max_bytes = max_memory_mb * 1024**2
+
+        results = []
+        block = []
+
+        def flush():
+            results.extend(
+                _bayes_factors_torch(
+                    block,
+                    mode=mode,
+                    delta=delta,
+                    test_mode=test_mode,
+                    cred_interval_lvls=cred_interval_lvls,
+                    max_bytes=max_bytes,
+                )
+            )
+            block.clear()
+
+        for idx1, idx2 in comparisons:
+            idx1, idx2, scales_1, scales_2, px_scale_mean1, px_scale_mean2 = self._sample_pairs(
+                idx1,
+                idx2,
+                batchid1=batchid1,
+                batchid2=batchid2,
+                use_observed_batches=use_observed_batches,
+                n_samples_overall=n_samples_overall,
+                use_permutation=use_permutation,
+                m_permutation=m_permutation,
+            )
+            if block and (
+                block[0]["scales_1"].shape != scales_1.shape
+                or (len(block) + 1) * 2 * scales_1.nbytes > max_bytes
+            ):
+                flush()
+            scales_1 = torch.as_tensor(scales_1, device=device)
+            scales_2 = torch.as_tensor(scales_2, device=device)
+            comparison = {
+                "scales_1": scales_1,
+                "scales_2": scales_2,
+                "scale1": px_scale_mean1,
+                "scale2": px_scale_mean2,
+            }
+            if mode == "change":
+                comparison["pseudocounts"] = (
+                    pseudocounts
+                    if pseudocounts is not None
+                    else self._estimate_pseudocounts(
+                        idx1,
+                        idx2,
+                        scales_1.max(0).values[None].cpu().numpy(),
+                        scales_2.max(0).values[None].cpu().numpy(),
+                        threshold_counts,
+                    )
+                )
+            block.append(comparison)
+        if block:
+            flush()
+        return results
+
+    def _estimate_pseudocounts(
+        self,
+        idx1: np.ndarray,
+        idx2: np.ndarray,
+        scales_1: np.ndarray,
+        scales_2: np.ndarray,
+        threshold_counts: float,
+    ) -> float:
+        logger.debug("Estimating pseudocounts offet from the data")
+        x = self.adata_manager.get_from_registry(REGISTRY_KEYS.X_KEY)
+        where_zero_a = np.asarray(np.mean(x[idx1], 0)).flatten() < threshold_counts
+        where_zero_b = np.asarray(np.mean(x[idx2], 0)).flatten() < threshold_counts
+        return estimate_pseudocounts_offset(
+            scales_a=scales_1,
+            scales_b=scales_2,
+            where_zero_a=where_zero_a,
+            where_zero_b=where_zero_b,
+            quantile=0.9,
+        )
+
+    def _sample_pairs(
+        self,
+        idx1: list[bool] | np.ndarray,
+        idx2: list[bool] | np.ndarray,
+        batchid1: Sequence[Number | str] | None = None,
+        batchid2: Sequence[Number | str] | None = None,
+        use_observed_batches: bool | None = False,
+        n_samples_overall: int = 5000,
+        use_permutation: bool = False,
+        m_permutation: int = 10000,
+    ) -> tuple[np.ndarray, ...]:
+        """Sample pairs of scales of both populations conditioned on the same batches.
+
+        Returns
+        -------
+        Tuple of the (filtered) cells of both populations, the paired scale samples of both
+        populations and their mean scales.
+        """
+        # Normalized means sampling for both populations
+        if self.representation_fn is not None:
+            idx1 = self.filter_outlier_cells(idx1)
+            idx2 = self.filter_outlier_cells(idx2)
+
+        scales_batches_1 = self.scale_sampler(
+            selection=idx1,
+            batchid=batchid1,
+            use_observed_batches=use_observed_batches,
+            n_samples_overall=n_samples_overall,
+        )
+        scales_batches_2 = self.scale_sampler(
+            selection=idx2,
+            batchid=batchid2,
+            use_observed_batches=use_observed_batches,
+            n_samples_overall=n_samples_overall,
+        )
+
+        px_scale_mean1 = scales_batches_1["scale"].mean(axis=0)
+        px_scale_mean2 = scales_batches_2["scale"].mean(axis=0)
+
+        # Sampling pairs
+        # The objective of code section below is to ensure than the samples of normalized
+        # means we consider are conditioned on the same batch id
+        batchid1_vals = np.unique(scales_batches_1["batch"])
+        batchid2_vals = np.unique(scales_batches_2["batch"])
+
+        create_pairs_from_same_batches = (
+            set(batchid1_vals) == set(batchid2_vals)
+        ) and not use_observed_batches
+        if create_pairs_from_same_batches:
+            # First case: same batch normalization in two groups
+            logger.debug("Same batches in both cell groups")
+            n_batches = len(set(batchid1_vals))
+            n_samples_per_batch = m_permutation // n_batches if m_permutation is not None else None
+            logger.debug(f"Using {n_samples_per_batch} samples per batch for pair matching")
+            scales_1 = []
+            scales_2 = []
+            for batch_val in set(batchid1_vals):
+                # Select scale samples that originate from the same batch id
+                scales_1_batch = scales_batches_1["scale"][scales_batches_1["batch"] == batch_val]
+                scales_2_batch = scales_batches_2["scale"][scales_batches_2["batch"] == batch_val]
+
+                # Create more pairs
+                scales_1_local, scales_2_local = pairs_sampler(
+                    scales_1_batch,
+                    scales_2_batch,
+                    use_permutation=use_permutation,
+                    m_permutation=n_samples_per_batch,
+                )
+                scales_1.append(scales_1_local)
+                scales_2.append(scales_2_local)
+            scales_1 = np.concatenate(scales_1, axis=0)
+            scales_2 = np.concatenate(scales_2, axis=0)
+        else:
+            logger.debug("Ignoring batch conditionings to compare means")
+            if len(set(batchid1_vals).intersection(set(batchid2_vals))) >= 1:
+                warnings.warn(
+                    "Batchids of cells groups 1 and 2 are different but have an non-null "
+                    "intersection. Specific handling of such situations is not "
+                    "implemented yet and batch correction is not trustworthy.",
+                    UserWarning,
+                    stacklevel=settings.warnings_stacklevel,
+                )
+            scales_1, scales_2 = pairs_sampler(
+                scales_batches_1["scale"],
+                scales_batches_2["scale"],
+                use_permutation=use_permutation,
+                m_permutation=m_permutation,
+            )
+
+        return idx1, idx2, scales_1, scales_2, px_scale_mean1, px_scale_mean2
+
     @torch.inference_mode()
     def scale_sampler(
         self,
@@ -472,14 +788,17 @@ class DifferentialComputation:
         batch_ids = []
         for batch_idx in batchid:
             idx_selected = np.arange(self.adata.shape[0])[selection]
-            px_scales.append(
-                self.model_fn(
-                    self.adata,
-                    indices=idx_selected,
-                    transform_batch=batch_idx,
-                    n_samples_overall=n_samples,
+            if self.sample_cache is not None:
+                px_scales.append(self.sample_cache.get_samples(idx_selected, batch_idx, n_samples))
+            else:
+                px_scales.append(
+                    self.model_fn(
+                        self.adata,
+                        indices=idx_selected,
+                        transform_batch=batch_idx,
+                        n_samples_overall=n_samples,
+                    )
                 )
-            )
             batch_idx = batch_idx if batch_idx is not None else np.nan
             batch_ids.append([batch_idx] * px_scales[-1].shape[0])
         px_scales = np.concatenate(px_scales)
@@ -719,6 +1038,140 @@ def describe_continuous_distrib(
     return dist_props
 
 
+def _bayes_factors_torch(
+    comparisons: list[dict],
+    mode: Literal["vanilla", "change"],
+    delta: float | None,
+    test_mode: Literal["two", "three"],
+    cred_interval_lvls: list[float] | np.ndarray | None,
+    max_bytes: float,
+) -> list[dict[str, np.ndarray]]:
+    """Differential expression properties of comparisons with the same number of pairs.
+
+    Parameters
+    ----------
+    comparisons
+        Comparisons with paired scale samples ``"scales_1"`` and ``"scales_2"`` of shape
+        ``(n_pairs, n_genes)`` on the same device, mean scales ``"scale1"`` and ``"scale2"``
+        and, in ``"change"`` mode, ``"pseudocounts"``.
+    mode, delta, test_mode, cred_interval_lvls
+        See :meth:`~scvi.model.base.DifferentialComputation.get_bayes_factors`.
+    max_bytes
+        Approximate memory budget of the temporaries of a block of genes.
+    """
+    eps = 1e-8
+    scales_1 = torch.stack([c["scales_1"] for c in comparisons])  # comparisons, pairs, genes
+    scales_2 = torch.stack([c["scales_2"] for c in comparisons])
+    n_comparisons, n_pairs, n_genes = scales_1.shape
+    # a few temporaries of the shape of a block are alive at once
+    block_size = max(1, int(max_bytes // (8 * n_comparisons * n_pairs * scales_1.element_size())))
+    blocks = [slice(start, start + block_size) for start in range(0, n_genes, block_size)]
+
+    if mode == "vanilla":
+        n_greater = torch.cat(
+            [(scales_1[..., b] > scales_2[..., b]).sum(1) for b in blocks], dim=-1
+        )
+        proba_m1 = n_greater.cpu().numpy() / n_pairs
+        proba_m2 = 1.0 - proba_m1
+        return [
+            {
+                "proba_m1": proba_m1[i],
+                "proba_m2": proba_m2[i],
+                "bayes_factor": np.log(proba_m1[i] + eps) - np.log(proba_m2[i] + eps),
+                "scale1": c["scale1"],
+                "scale2": c["scale2"],
+            }
+            for i, c in enumerate(comparisons)
+        ]
+
+    pseudocounts = torch.as_tensor(
+        [float(c["pseudocounts"]) for c in comparisons], dtype=scales_1.dtype
+    ).to(scales_1.device)[:, None, None]
+
+    def lfc(block: slice, offset: torch.Tensor) -> torch.Tensor:
+        return torch.log2(scales_1[..., block] + offset) - torch.log2(
+            scales_2[..., block] + offset
+        )
+
+    if delta is None:
+        lfc_means = torch.cat([lfc(b, pseudocounts).mean(1) for b in blocks], dim=-1)
+        deltas = [estimate_delta(lfc_means=means) for means in lfc_means.cpu().numpy()]
+    else:
+        deltas = [delta] * n_comparisons
+    delta_ = torch.as_tensor(deltas, dtype=scales_1.dtype).to(scales_1.device)[:, None, None]
+
+    levels = [] if cred_interval_lvls is None else cred_interval_lvls
+    stats = {"n_plus": [], "n_minus": [], "mean": [], "median": [], "std": [], "min": []}
+    stats.update({"max": [], **{f"interval_{level}": [] for level in levels}})
+    for b in blocks:
+        change = lfc(b, pseudocounts)
+        stats["n_plus"].append((change >= delta_).sum(1))
+        stats["n_minus"].append((change < -delta_).sum(1))
+        # reduced pseudocounts to correctly estimate log-fold change
+        change = lfc(b, 1e-3 * pseudocounts)
+        stats["mean"].append(change.mean(1))
+        stats["std"].append(change.std(1, correction=0))
+        change = change.sort(dim=1).values
+        stats["min"].append(change[:, 0])
+        stats["max"].append(change[:, -1])
+        stats["median"].append((change[:, (n_pairs - 1) // 2] + change[:, n_pairs // 2]) / 2)
+        for level in levels:
+            stats[f"interval_{level}"].append(_credible_intervals_sorted(change, level))
+    stats = {key: torch.cat(values, dim=-1).cpu().numpy() for key, values in stats.items()}
+
+    proba_m1 = stats["n_plus"] / n_pairs
+    proba_m2 = stats["n_minus"] / n_pairs
+    if test_mode == "two":
+        proba_de = proba_m1 + proba_m2
+        sign = np.ones_like(proba_de)
+    else:
+        proba_de = np.maximum(proba_m1, proba_m2)
+        sign = np.sign(proba_m1 - proba_m2)
+    bayes_factor = sign * (np.log(proba_de + eps) - np.log(1.0 - proba_de + eps))
+
+    results = []
+    for i, c in enumerate(comparisons):
+        res = {
+            "proba_de": proba_de[i],
+            "proba_not_de": 1.0 - proba_de[i],
+            "bayes_factor": bayes_factor[i],
+            "scale1": c["scale1"],
+            "scale2": c["scale2"],
+            "pseudocounts": c["pseudocounts"],
+            "delta": deltas[i],
+        }
+        for key in ("mean", "median", "std", "min", "max"):
+            res[f"lfc_{key}"] = stats[key][i]
+        for level in levels:
+            conf_str = str(level)[:5]
+            res[f"lfc_confidence_interval_{conf_str}_min"] = stats[f"interval_{level}"][i, 0]
+            res[f"lfc_confidence_interval_{conf_str}_max"] = stats[f"interval_{level}"][i, 1]
+        results.append(res)
+    return results
+
+
+def _credible_intervals_sorted(samples: torch.Tensor, confidence_level: float) -> torch.Tensor:
+    """Highest posterior density intervals of samples sorted along the second dimension.
+
+    Vectorized version of :func:`credible_intervals` for samples of shape
+    ``(n_comparisons, n_samples, n_genes)``, returning an array of shape
+    ``(n_comparisons, 2, n_genes)`` with the minima and maxima of the intervals.
+    """
+    n = samples.shape[1]
+    interval_idx_inc = int(np.floor(confidence_level * n))
+    n_intervals = n - interval_idx_inc
+    if n_intervals <= 0:
+        raise ValueError(
+            "Too few elements for interval calculation. "
+            "Check that credible_interval meets condition 0 =< credible_interval < 1"
+        )
+    interval_width = samples[:, interval_idx_inc:] - samples[:, :n_intervals]
+    min_idx = interval_width.argmin(dim=1, keepdim=True)
+    hdi_min = samples.gather(1, min_idx)
+    hdi_max = samples.gather(1, min_idx + interval_idx_inc)
+    return torch.cat([hdi_min, hdi_max], dim=1)
+
+
 def save_cluster_xlsx(filepath: str, de_results: list[pd.DataFrame], cluster_names: list):
     """Saves multi-clusters DE in an xlsx sheet.
 
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import re
+import warnings
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from scvi import settings
+from scvi.dataloaders import DataSplitter
+from scvi.model._utils import get_max_epochs_heuristic, parse_device_args
+from scvi.train import EnsembleTrainingPlan, Trainer
+from scvi.utils._docstrings import devices_dsp
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from typing import Literal
+
+    from scvi.model.base import BaseModelClass
+
+
+class ModelEnsemble:
+    """``BETA`` Train several models of the same data in one process.
+
+    The members are trained with :class:`~scvi.train.EnsembleTrainingPlan`, which feeds the same
+    minibatches to all of them, so that they share data loading and trainer setup. Each member
+    keeps its own optimizer state and can have its own learning rate and maximum KL weight, as
+    well as any model hyperparameters, such as the dropout rate, when not vectorized. After
+    training, every member is a trained model that can be used and saved on its own.
+
+    Parameters
+    ----------
+    models
+        Models with the same :class:`~anndata.AnnData`, e.g. :class:`~scvi.model.SCVI` instances
+        with different seeds or hyperparameters.
+
+    Examples
+    --------
+    >>> adata = anndata.read_h5ad(path_to_anndata)
+    >>> scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    >>> models = []
+    >>> for seed in range(8):
+    ...     scvi.settings.seed = seed
+    ...     models.append(scvi.model.SCVI(adata))
+    >>> ensemble = scvi.model.base.ModelEnsemble(models)
+    >>> ensemble.train(max_epochs=100, max_kl_weight=[0.5, 1.0] * 4)
+    >>> ensemble[0].save("member_0")
+    """
+
+    _data_splitter_cls = DataSplitter
+    _training_plan_cls = EnsembleTrainingPlan
+
+    def __init__(self, models: Sequence[BaseModelClass]):
+        self.models = list(models)
+        if len(self.models) == 0:
+            raise ValueError("`models` must contain at least one model.")
+        adata_manager = self.models[0].adata_manager
+        for model in self.models:
+            if model.module is None or model.adata_manager is not adata_manager:
+                raise ValueError(
+                    "All models must be initialized with the same AnnData object, set up once."
+                )
+        self.adata_manager = adata_manager
+        self.trainer = None
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def __getitem__(self, index: int) -> BaseModelClass:
+        return self.models[index]
+
+    def __iter__(self) -> Iterator[BaseModelClass]:
+        return iter(self.models)
+
+    @devices_dsp.dedent
+    def train(
+        self,
+        max_epochs: int | None = None,
+        accelerator: str = "auto",
+        devices: int | list[int] | str = "auto",
+        train_size: float | None = None,
+        validation_size: float | None = None,
+        shuffle_set_split: bool = True,
+        batch_size: int = 128,
+        lr: float | Sequence[float] | None = None,
+        max_kl_weight: float | Sequence[float] | None = None,
+        vectorize: bool = False,
+        datasplitter_kwargs: dict | None = None,
+        plan_kwargs: dict | None = None,
+        autocast_dtype: Literal["float32", "bfloat16"] | None = None,
+        **trainer_kwargs,
+    ):
+        """Train all members on the same minibatches.
+
+        Parameters
+        ----------
+        max_epochs
+            The maximum number of epochs to train the members. If ``None``, defaults to a
+            heuristic based on :func:`~scvi.model.get_max_epochs_heuristic`.
+        %(param_accelerator)s
+        %(param_devices)s
+        train_size
+            Size of training set in the range ``[0.0, 1.0]``. Passed into
+            :class:`~scvi.dataloaders.DataSplitter`.
+        validation_size
+            Size of the test set. If ``None``, defaults to ``1 - train_size``. If
+            ``train_size + validation_size < 1``, the remaining cells belong to a test set. Passed
+            into :class:`~scvi.dataloaders.DataSplitter`.
+        shuffle_set_split
+            Whether to shuffle indices before splitting. If ``False``, the val, train, and test set
+            are split in the sequential order of the data according to ``validation_size`` and
+            ``train_size`` percentages.
+        batch_size
+            Minibatch size to use during training.
+        lr
+            Learning rate, or learning rates of the members. Overrides ``lr`` in ``plan_kwargs``.
+        max_kl_weight
+            Maximum scaling factor on KL divergence, or maximum scaling factors of the members.
+            Overrides ``max_kl_weight`` in ``plan_kwargs``.
+        vectorize
+            Whether to evaluate all members at once with :func:`torch.func.vmap`. See
+            :class:`~scvi.train.EnsembleTrainingPlan`.
+        datasplitter_kwargs
+            Additional keyword arguments passed into :class:`~scvi.dataloaders.DataSplitter`.
+        plan_kwargs
+            Additional keyword arguments passed into :class:`~scvi.train.EnsembleTrainingPlan`.
+        autocast_dtype
+            Data type of the forward passes of the members. Passed into
+            :class:`~scvi.train.EnsembleTrainingPlan`.
+        **trainer_kwargs
+            Additional keyword arguments passed into :class:`~scvi.train.Trainer`. Early stopping
+            is not supported, as members would not stop at the same epoch.
+        """
+        if trainer_kwargs.get("early_stopping", False):
+            raise ValueError("Early stopping is not supported by ModelEnsemble.")
+        if max_epochs is None:
+            max_epochs = get_max_epochs_heuristic(self.adata_manager.adata.n_obs)
+
+        datasplitter_kwargs = datasplitter_kwargs or {}
+        data_splitter = self._data_splitter_cls(
+            self.adata_manager,
+            train_size=train_size,
+            validation_size=validation_size,
+            batch_size=batch_size,
+            shuffle_set_split=shuffle_set_split,
+            **datasplitter_kwargs,
+        )
+
+        plan_kwargs = dict(plan_kwargs or {})
+        for key, value in [
+            ("lr", lr),
+            ("max_kl_weight", max_kl_weight),
+            ("autocast_dtype", autocast_dtype),
+        ]:
+            if value is not None:
+                plan_kwargs[key] = value
+        training_plan = self._training_plan_cls(
+            [model.module for model in self.models], vectorize=vectorize, **plan_kwargs
+        )
+
+        accelerator, lightning_devices, device = parse_device_args(
+            accelerator=accelerator,
+            devices=devices,
+            return_device="torch",
+        )
+        self.trainer = Trainer(
+            max_epochs=max_epochs,
+            accelerator=accelerator,
+            devices=lightning_devices,
+            **trainer_kwargs,
+        )
+        training_plan.n_obs_training = data_splitter.n_train
+        training_plan.n_obs_validation = data_splitter.n_val
+        self.trainer.fit(training_plan, data_splitter)
+
+        history = getattr(self.trainer.logger, "history", None)
+        for k, model in enumerate(self.models):
+            self._update_history(model, self._member_history(history, k))
+            # data splitter only gets these attrs after fit
+            model.train_indices = getattr(data_splitter, "train_idx", None)
+            model.test_indices = getattr(data_splitter, "test_idx", None)
+            model.validation_indices = getattr(data_splitter, "val_idx", None)
+
+            model.module.eval()
+            model.is_trained_ = True
+            model.to_device(device)
+            model.trainer = self.trainer
+
+    @staticmethod
+    def _member_history(history: dict | None, k: int) -> dict | None:
+        """Metrics logged with the suffix of member ``k``, without the suffix."""
+        if history is None:
+            return None
+        # Lightning appends _step or _epoch to metrics logged at both intervals
+        pattern = re.compile(rf"(.+)_{k}(_step|_epoch)?")
+        member_history = {}
+        for key, values in history.items():
+            match = pattern.fullmatch(key)
+            if match is not None:
+                member_key = match.group(1) + (match.group(2) or "")
+                member_history[member_key] = values.rename(columns={key: member_key})
+        return member_history
+
+    @staticmethod
+    def _update_history(model: BaseModelClass, history: dict | None):
+        """Set or extend the history of a member, as :class:`~scvi.train.TrainRunner` does."""
+        if not model.is_trained_ or history is None:
+            model.history_ = history
+            return
+        if not isinstance(model.history_, dict):
+            warnings.warn(
+                "Training history cannot be updated. Logger can be accessed from "
+                "`model.trainer.logger`",
+                UserWarning,
+                stacklevel=settings.warnings_stacklevel,
+            )
+            return
+        for key, values in model.history_.items():
+            if key not in history:
+                continue
+            new_values = history[key]
+            new_values.index = np.arange(len(values), len(values) + len(new_values))
+            model.history_[key] = pd.concat([values, new_values])
+            model.history_[key].index.name = values.index.name
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import torch
+from scipy.sparse import csr_matrix
+
+if TYPE_CHECKING:
+    from typing import Literal
+
+
+class FeatureCorrelation:
+    """Feature-feature correlations accumulated over minibatches of observations.
+
+    Pearson correlations are computed from running sums of the observations and of their
+    outer products, so that memory usage only depends on the number of features. Spearman
+    correlations are the Pearson correlations of the ranks of the observations, which are
+    approximated by their position among the sorted values of a reference set of observations,
+    e.g., a random subset of the cells. If all observations are passed as the reference, the
+    ranks and the correlations are exact.
+
+    Parameters
+    ----------
+    n_features
+        Number of features.
+    correlation_type
+        One of "pearson", "spearman".
+    reference
+        Observations of shape ``(n_reference, n_features)`` used to rank the observations.
+        Required if `correlation_type` is "spearman".
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        correlation_type: Literal["spearman", "pearson"] = "pearson",
+        reference: np.ndarray | torch.Tensor | None = None,
+    ):
+        if correlation_type not in ("spearman", "pearson"):
+            raise ValueError("Unknown correlation type. Choose one of 'spearman', 'pearson'.")
+        if correlation_type == "spearman" and reference is None:
+            raise ValueError("A `reference` is required for Spearman correlations.")
+        self.n_features = n_features
+        self.correlation_type = correlation_type
+        self._sorted_reference = None
+        if correlation_type == "spearman":
+            reference = torch.as_tensor(reference, dtype=torch.float64)
+            self._sorted_reference = reference.T.contiguous().sort(dim=-1).values
+        self.n_obs = 0
+        self._shift = None
+        self._sum = torch.zeros(n_features, dtype=torch.float64)
+        self._outer = torch.zeros(n_features, n_features, dtype=torch.float64)
+
+    def _rank(self, x: torch.Tensor) -> torch.Tensor:
+        # average rank among the reference, up to a constant offset
+        values = x.T.contiguous()
+        lower = torch.searchsorted(self._sorted_reference, values)
+        upper = torch.searchsorted(self._sorted_reference, values, right=True)
+        return ((lower + upper) / 2).T.to(torch.float64)
+
+    def update(self, x: np.ndarray | torch.Tensor):
+        """Add a minibatch of observations of shape ``(n_obs, n_features)``."""
+        x = torch.as_tensor(x, dtype=torch.float64).cpu()
+        if self._sorted_reference is not None:
+            x = self._rank(x)
+        if self._shift is None:
+            # sums are accumulated around the first observations for numerical stability
+            self._shift = x.mean(dim=0)
+        x = x - self._shift
+        self.n_obs += x.shape[0]
+        self._sum += x.sum(dim=0)
+        self._outer.addmm_(x.T, x)
+
+    def correlation(self, rows: slice | None = None) -> np.ndarray:
+        """Correlation matrix, or the given rows of it.
+
+        Features with a constant value have undefined (``nan``) correlations.
+        """
+        rows = slice(None) if rows is None else rows
+        mean = self._sum / self.n_obs
+        covariance = self._outer[rows] / self.n_obs - torch.outer(mean[rows], mean)
+        variance = torch.diagonal(self._outer) / self.n_obs - mean**2
+        std = variance.clamp(min=0).sqrt()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance.numpy() / np.outer(std[rows].numpy(), std.numpy())
+        return np.clip(correlation, -1, 1)
+
+
+def top_k_correlations(
+    correlations: list[FeatureCorrelation],
+    k: int,
+    block_size: int = 1024,
+) -> csr_matrix:
+    """Keep the `k` strongest correlations of each feature, averaged over accumulators.
+
+    Parameters
+    ----------
+    correlations
+        Accumulated correlations, which are averaged.
+    k
+        Number of partners kept per feature, ranked by absolute correlation and excluding the
+        feature itself.
+    block_size
+        Number of rows of the correlation matrix computed at once.
+
+    Returns
+    -------
+    Sparse matrix of shape ``(n_features, n_features)`` with `k` entries per row.
+    """
+    n_features = correlations[0].n_features
+    if k < 1:
+        raise ValueError("`k` must be at least 1.")
+    k = min(k, n_features - 1)
+    indices = []
+    values = []
+    for start in range(0, n_features, block_size):
+        rows = slice(start, min(start + block_size, n_features))
+        block = np.mean([corr.correlation(rows) for corr in correlations], axis=0)
+        strength = np.nan_to_num(np.abs(block), nan=-1.0)
+        strength[np.arange(block.shape[0]), np.arange(rows.start, rows.stop)] = -np.inf
+        partners = np.argpartition(-strength, k - 1, axis=1)[:, :k]
+        indices.append(partners)
+        values.append(np.take_along_axis(block, partners, axis=1))
+    indices = np.concatenate(indices)
+    values = np.concatenate(values)
+    indptr = np.arange(0, n_features * k + 1, k)
+    matrix = csr_matrix((values.ravel(), indices.ravel(), indptr), shape=(n_features, n_features))
+    matrix.sort_indices()
+    return matrix
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from functools import wraps
+from inspect import signature
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import torch
+
+from scvi.data._constants import _SCVI_UUID_KEY
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+# arguments that make outputs impossible to cache, if not ``None``
+_UNCACHEABLE_ARGUMENTS = ("dataloader", "output_path")
+
+
+def _nbytes(value) -> int:
+    """Approximate memory of a cached output in bytes."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame | pd.Series):
+        return int(value.memory_usage(deep=False).sum())
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, list | tuple):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _freeze(value) -> Hashable:
+    """Hashable version of an argument, raising a :class:`TypeError` if there is none."""
+    if value is None or isinstance(value, str | bytes | int | float | bool | np.generic):
+        return value
+    if isinstance(value, np.ndarray | pd.Index | list | range):
+        array = np.asarray(value)
+        if array.dtype == object:
+            return tuple(_freeze(v) for v in array.tolist())
+        return (array.dtype.str, array.shape, hashlib.sha1(array.tobytes()).hexdigest())
+    if isinstance(value, tuple):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    raise TypeError(f"Cannot cache outputs for arguments of type {type(value)}.")
+
+
+def _module_version(module: torch.nn.Module) -> tuple[int, int]:
+    """Version of the weights of ``module``.
+
+    In-place updates of tensors, e.g., by optimizers or :meth:`~torch.nn.Module.load_state_dict`,
+    increment their version counter, so that the sum of the counters changes with the weights.
+    """
+    tensors = [*module.parameters(), *module.buffers()]
+    return id(module), sum(tensor._version for tensor in tensors)
+
+
+class InferenceCache:
+    """Least recently used cache of inference outputs under a memory budget.
+
+    Entries are tagged with the version of the module weights they were computed with, and the
+    whole cache is cleared as soon as an entry is requested for another version, e.g., after
+    further training or after loading new weights.
+
+    Parameters
+    ----------
+    max_memory_mb
+        Memory budget of the cached outputs, in megabytes. The least recently used outputs are
+        evicted once the budget is exceeded.
+    spill_path
+        If not ``None``, directory where evicted outputs are pickled instead of being dropped.
+        Outputs read back from disk are moved back into memory.
+    """
+
+    def __init__(self, max_memory_mb: float = 1024, spill_path: str | os.PathLike | None = None):
+        self.max_bytes = int(max_memory_mb * 1024**2)
+        self.spill_path = None if spill_path is None else Path(spill_path)
+        self._version = None
+        self._memory = OrderedDict()
+        self._sizes = {}
+        self._disk = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the outputs cached in memory, in bytes."""
+        return sum(self._sizes.values())
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._disk)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._memory or key in self._disk
+
+    def clear(self):
+        """Remove all entries from memory and disk."""
+        self._memory.clear()
+        self._sizes.clear()
+        for path in self._disk.values():
+            path.unlink(missing_ok=True)
+        self._disk.clear()
+
+    def _check_version(self, version: Hashable):
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: Hashable):
+        """Cached output of ``key`` computed with weights of ``version``, or ``None``."""
+        self._check_version(version)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            value = self._memory[key]
+        elif key in self._disk:
+            path = self._disk.pop(key)
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            path.unlink(missing_ok=True)
+            self._insert(key, value)
+        else:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value, version: Hashable):
+        """Cache the output of ``key`` computed with weights of ``version``."""
+        self._check_version(version)
+        self._insert(key, copy.deepcopy(value))
+
+    def _insert(self, key: Hashable, value):
+        self._memory[key] = value
+        self._sizes[key] = _nbytes(value)
+        while len(self._memory) > 1 and self.nbytes > self.max_bytes:
+            self._evict()
+        if self.nbytes > self.max_bytes:
+            # a single output above the budget is not kept in memory
+            self._evict()
+
+    def _evict(self):
+        key, value = self._memory.popitem(last=False)
+        self._sizes.pop(key)
+        if self.spill_path is None:
+            return
+        self.spill_path.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".pkl", dir=self.spill_path)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._disk[key] = Path(path)
+
+    def __del__(self):
+        # spilled outputs are only readable through this instance
+        for path in getattr(self, "_disk", {}).values():
+            path.unlink(missing_ok=True)
+
+
+def cache_inference_output(fn: Callable) -> Callable:
+    """Decorator to cache the outputs of a model method in the model's inference cache.
+
+    Outputs are keyed by the method, the UUID of the AnnData object, the indices and the other
+    arguments, and are only cached once the cache is enabled with
+    :meth:`~scvi.model.base.BaseModelClass.enable_inference_cache`. Calls with a ``dataloader``
+    or an ``output_path``, or with arguments that cannot be hashed, are not cached.
+    """
+    fn_signature = signature(fn)
+
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, "_inference_cache", None)
+        if cache is None:
+            return fn(self, *args, **kwargs)
+
+        bound = fn_signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop("self")
+        extra_kwargs = {
+            name: arguments.pop(name)
+            for name, parameter in fn_signature.parameters.items()
+            if parameter.kind == parameter.VAR_KEYWORD
+        }
+        for kwarg in extra_kwargs.values():
+            arguments.update(kwarg)
+        if any(arguments.get(name) is not None for name in _UNCACHEABLE_ARGUMENTS):
+            return fn(self, *args, **kwargs)
+
+        adata = self._validate_anndata(arguments.pop("adata", None))
+        try:
+            key = (
+                fn.__qualname__,
+                adata.uns[_SCVI_UUID_KEY],
+                tuple(sorted((name, _freeze(value)) for name, value in arguments.items())),
+            )
+        except TypeError:
+            return fn(self, *args, **kwargs)
+
+        version = _module_version(self.module)
+        output = cache.get(key, version)
+        if output is None:
+            output = fn(self, *args, **kwargs)
+            cache.put(key, output, version)
+        return output
+
+    return wrapper
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
     from torch import Tensor
 
+    from scvi.model.base._chunk_planner import ChunkPlanner
     from scvi.module.base import LossOutput
 
 
@@ -18,6 +19,7 @@ def compute_elbo(
     module: Callable[[dict[str, Tensor | None], dict], tuple[Any, Any, LossOutput]],
     dataloader: Iterator[dict[str, Tensor | None]],
     return_mean: bool = True,
+    chunk_planner: ChunkPlanner | None = None,
     **kwargs,
 ) -> float:
     """Compute the evidence lower bound (ELBO) on the data.
@@ -43,17 +45,21 @@ def compute_elbo(
     return_mean
         If ``True``, return the mean ELBO across the dataset. If ``False``, return the ELBO for
         each cell individually.
+    chunk_planner
+        If not ``None``, minibatches are split into chunks of
+        :attr:`~scvi.model.base._chunk_planner.ChunkPlanner.batch_size` cells, which are shrunk
+        if the forward pass runs out of memory.
 
     Returns
     -------
     The evidence lower bound (ELBO) of the data.
     """
-    elbo = []
     if "full_forward_pass" in signature(module._get_inference_input).parameters:
         get_inference_input_kwargs = {"full_forward_pass": True}
     else:
         get_inference_input_kwargs = {}
-    for tensors in dataloader:
+
+    def _elbo(tensors: dict[str, Tensor | None], *args) -> Tensor:
         _, _, losses = module(
             tensors, **kwargs, get_inference_input_kwargs=get_inference_input_kwargs
         )
@@ -65,7 +71,14 @@ def compute_elbo(
             kl_local = torch.stack(list(losses.kl_local.values())).sum(dim=0)
         else:
             kl_local = losses.kl_local
-        elbo.append(reconstruction_loss + kl_local)
+        return reconstruction_loss + kl_local
+
+    elbo = []
+    for tensors in dataloader:
+        if chunk_planner is None:
+            elbo.append(_elbo(tensors))
+        else:
+            elbo.extend(chunk_planner.map(_elbo, tensors))
 
     elbo = torch.cat(elbo, dim=0)
     if return_mean:
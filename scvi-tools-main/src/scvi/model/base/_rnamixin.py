@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import inspect
 import logging
 import warnings
@@ -10,19 +11,29 @@ import numpy as np
 import pandas as pd
 import torch
 import torch.distributions as db
+import torch.nn.functional as F
 from pyro.distributions.util import deep_to
 
 from scvi import REGISTRY_KEYS, settings
+from scvi.distributions import NegativeBinomial, ZeroInflatedNegativeBinomial
 from scvi.distributions._utils import DistributionConcatenator, subset_distribution
 from scvi.model._utils import _get_batch_code_from_category, scrna_raw_counts_properties
+from scvi.model.base._chunk_planner import ChunkPlanner
 from scvi.model.base._de_core import _de_core
+from scvi.model.base._feature_correlation import FeatureCorrelation, top_k_correlations
+from scvi.model.base._inference_cache import cache_inference_output
+from scvi.model.base._streaming_output import StreamingOutput
+from scvi.module._constants import MODULE_KEYS
 from scvi.module.base._decorators import _move_data_to_device
 from scvi.utils import de_dsp, dependencies, unsupported_if_adata_minified
 
 if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Iterator
     from typing import Literal
 
     from anndata import AnnData
+    from scipy.sparse import csr_matrix
 
     from scvi._types import Number
 
@@ -43,6 +54,49 @@ class RNASeqMixin:
         else:
             raise NotImplementedError("Transforming batches is not implemented for this model.")
 
+    def _decode_transform_batches(
+        self,
+        tensors: dict[str, torch.Tensor],
+        transform_batch: list[int],
+        n_samples: int = 1,
+    ) -> tuple[dict, dict] | None:
+        """Encode a minibatch once and decode it for several batch categories in one call.
+
+        The generative inputs are repeated along the observation axis once per category in
+        ``transform_batch``, with the batch index of each block set to its category, so that
+        the encoder runs once and the decoder once for all categories. The outputs of the
+        generative process have ``len(transform_batch) * n_obs`` observations, ordered by
+        category.
+
+        Returns
+        -------
+        The inference and generative outputs, or ``None`` if the generative inputs of the
+        module cannot be repeated along the observation axis.
+        """
+        tensors = _move_data_to_device(tensors, self.device)
+        inference_inputs = self.module._get_inference_input(tensors)
+        inference_outputs = self.module.inference(**inference_inputs, n_samples=n_samples)
+        generative_inputs = self.module._get_generative_input(tensors, inference_outputs)
+
+        batch_index = generative_inputs.get(MODULE_KEYS.BATCH_INDEX_KEY)
+        if not isinstance(batch_index, torch.Tensor):
+            return None
+        n_obs = batch_index.shape[0]
+        repeated_inputs = {}
+        for key, value in generative_inputs.items():
+            if isinstance(value, torch.Tensor):
+                # observations are along the second-to-last axis, after any sample axis
+                if value.dim() < 2 or value.shape[-2] != n_obs:
+                    return None
+                value = torch.cat([value] * len(transform_batch), dim=-2)
+            repeated_inputs[key] = value
+        codes = torch.as_tensor(
+            transform_batch, dtype=batch_index.dtype, device=batch_index.device
+        )
+        repeated_inputs[MODULE_KEYS.BATCH_INDEX_KEY] = codes.repeat_interleave(n_obs).unsqueeze(-1)
+
+        return inference_outputs, self.module.generative(**repeated_inputs)
+
     def _get_importance_weights(
         self,
         adata: AnnData | None,
@@ -53,7 +107,8 @@ class RNASeqMixin:
         max_cells: int = 1024,
         truncation: bool = False,
         n_mc_samples: int = 500,
-        n_mc_samples_per_pass: int = 250,
+        n_mc_samples_per_pass: int | None = None,
+        max_block_memory_mb: float = 64,
     ) -> np.ndarray:
         """Computes importance weights for the given samples.
 
@@ -86,7 +141,12 @@ class RNASeqMixin:
             Number of Monte Carlo samples to use for estimating the importance weights, by default
             500
         n_mc_samples_per_pass
-            Number of Monte Carlo samples to use for each pass, by default 250
+            Number of Monte Carlo samples to use for each pass. If `None`, it is picked so that
+            the samples of each pass fit in the free memory of the device.
+        max_block_memory_mb
+            Approximate memory budget, in megabytes, of the likelihoods of the samples under a
+            block of anchor cells, which are evaluated in one vectorized pass. Larger values
+            trade memory for speed.
 
         Returns
         -------
@@ -117,18 +177,22 @@ class RNASeqMixin:
         qz_anchor = subset_distribution(qz, mask, 0)  # n_anchors, n_latent
         log_qz = qz_anchor.log_prob(zs.unsqueeze(-2)).sum(dim=-1)  # n_samples, n_cells, n_anchors
 
-        log_px_z = []
         distributions_px = deep_to(px, device=device)
+        # likelihoods hold a few temporaries of shape (n_samples, n_cells, n_anchors, n_genes)
+        bytes_per_anchor = (
+            4 * distributions_px.scale.numel() * distributions_px.scale.element_size()
+        )
+        anchors_per_block = max(1, int(max_block_memory_mb * 1024**2 // bytes_per_anchor))
         scdl_anchor = self._make_data_loader(
-            adata=adata, indices=indices[anchor_cells], batch_size=1
+            adata=adata, indices=indices[anchor_cells], batch_size=anchors_per_block
         )
+        log_px_z = []
         for tensors_anchor in scdl_anchor:
             tensors_anchor = _move_data_to_device(tensors_anchor, device)
-            x_anchor = tensors_anchor[REGISTRY_KEYS.X_KEY]  # 1, n_genes
-            distributions_px.mu = distributions_px.scale * x_anchor.sum(-1)
+            x_anchor = tensors_anchor[REGISTRY_KEYS.X_KEY]  # n_anchors_block, n_genes
             log_px_z.append(
-                distributions_px.log_prob(x_anchor).sum(dim=-1)[..., None].cpu()
-            )  # n_samples, n_cells, 1
+                _anchor_log_likelihoods(distributions_px, x_anchor).cpu()
+            )  # n_samples, n_cells, n_anchors_block
         log_px_z = torch.cat(log_px_z, dim=-1)  # n_samples, n_cells, n_anchors
 
         log_pz = log_pz.reshape(-1, 1)
@@ -147,6 +211,7 @@ class RNASeqMixin:
         log_probs = importance_weight - torch.logsumexp(importance_weight, 0)
         return log_probs.exp().numpy()
 
+    @cache_inference_output
     @torch.inference_mode()
     def get_normalized_expression(
         self,
@@ -161,6 +226,8 @@ class RNASeqMixin:
         batch_size: int | None = None,
         return_mean: bool = True,
         return_numpy: bool | None = None,
+        output_path: str | os.PathLike | None = None,
+        output_dtype: np.dtype | str | None = None,
         **importance_weighting_kwargs,
     ) -> np.ndarray | pd.DataFrame:
         r"""Returns the normalized (decoded) gene expression.
@@ -195,13 +262,24 @@ class RNASeqMixin:
         weights
             Weights to use for sampling. If `None`, defaults to `"uniform"`.
         batch_size
-            Minibatch size for data loading into model. Defaults to `scvi.settings.batch_size`.
+            Minibatch size for data loading into model. If `None`, it is picked so that the
+            `n_samples` samples of a minibatch fit in the free memory of the device, up to
+            `scvi.settings.batch_size`, and shrunk if the forward pass runs out of memory.
         return_mean
             Whether to return the mean of the samples.
         return_numpy
             Return a :class:`~numpy.ndarray` instead of a :class:`~pandas.DataFrame`. DataFrame
             includes gene names as columns. If either `n_samples=1` or `return_mean=True`, defaults
             to `False`. Otherwise, it defaults to `True`.
+        output_path
+            If not `None`, the expression of each minibatch is written to a preallocated array
+            named `"normalized_expression"` at this location instead of being kept in memory, so
+            that memory usage is bounded by `batch_size`. Paths ending in `.zarr` are written as
+            a zarr group, paths ending in `.h5` or `.hdf5` as an HDF5 file, and other paths as a
+            directory of `.npy` files. Cannot be used with `n_samples_overall`.
+        output_dtype
+            Data type of the array written to `output_path`, e.g. `"float16"`. Defaults to
+            `float32`.
         importance_weighting_kwargs
             Keyword arguments passed into
             :meth:`~scvi.model.base.RNASeqMixin._get_importance_weights`.
@@ -215,19 +293,31 @@ class RNASeqMixin:
         In this case, return type is :class:`~pandas.DataFrame` unless `return_numpy` is True.
         Otherwise, the method expects `n_samples_overall` to be provided and returns a 2d tensor
         of shape (n_samples_overall, n_genes).
+        If `output_path` is provided, returns the array written to it, loaded lazily as a
+        :class:`~numpy.memmap`, a :class:`zarr.Array` or a :class:`h5py.Dataset`.
         """
         adata = self._validate_anndata(adata)
 
         if indices is None:
             indices = np.arange(adata.n_obs)
         if n_samples_overall is not None:
+            if output_path is not None:
+                raise ValueError("`output_path` cannot be used with `n_samples_overall`.")
             assert n_samples == 1  # default value
             n_samples = n_samples_overall // len(indices) + 1
-        scdl = self._make_data_loader(adata=adata, indices=indices, batch_size=batch_size)
 
         transform_batch = _get_batch_code_from_category(
             self.get_anndata_manager(adata, required=True), transform_batch
         )
+        planner = None
+        if batch_size is None:
+            planner = ChunkPlanner.from_module(
+                self.module, self.summary_stats.get("n_vars", adata.n_vars), device=self.device
+            )
+            # all samples of all batch categories are decoded in the same pass
+            n_decoded = n_samples * len(transform_batch)
+            batch_size, _ = planner.plan(n_decoded, samples_per_pass=n_decoded)
+        scdl = self._make_data_loader(adata=adata, indices=indices, batch_size=batch_size)
 
         gene_mask = slice(None) if gene_list is None else adata.var_names.isin(gene_list)
 
@@ -254,11 +344,37 @@ class RNASeqMixin:
                 "batches."
             )
 
+        output = (
+            None
+            if output_path is None
+            else StreamingOutput(output_path, n_obs=len(indices), dtype=output_dtype)
+        )
         exprs = []
         zs = []
         qz_store = DistributionConcatenator()
         px_store = DistributionConcatenator()
-        for tensors in scdl:
+        # the encoder runs once per minibatch for all batch categories if the module allows it
+        decode_jointly = (
+            len(transform_batch) > 1
+            and None not in transform_batch
+            and "transform_batch" in inspect.signature(self.module.generative).parameters
+        )
+
+        def _decode(tensors: dict[str, torch.Tensor], *args) -> tuple[np.ndarray, dict, dict]:
+            nonlocal decode_jointly
+            outputs = None
+            if decode_jointly:
+                outputs = self._decode_transform_batches(tensors, transform_batch, n_samples)
+                decode_jointly = outputs is not None
+            if outputs is not None:
+                inference_outputs, generative_outputs = outputs
+                exp_ = generative_outputs["px"].get_normalized(generative_output_key)
+                # (..., n_batches * n_obs, n_genes) -> (..., n_obs, n_genes)
+                exp_ = exp_.unflatten(-2, (len(transform_batch), -1)).mean(-3)
+                exp_ = exp_[..., gene_mask]
+                exp_ *= scaling
+                return exp_.cpu().numpy(), inference_outputs, generative_outputs
+
             per_batch_exprs = []
             for batch in transform_batch:
                 generative_kwargs = self._get_transform_batch_gen_kwargs(batch)
@@ -273,13 +389,29 @@ class RNASeqMixin:
                 exp_ = exp_[..., gene_mask]
                 exp_ *= scaling
                 per_batch_exprs.append(exp_[None].cpu())
+            per_batch_exprs = torch.cat(per_batch_exprs, dim=0).mean(0).numpy()
+            return per_batch_exprs, inference_outputs, generative_outputs
+
+        for tensors in scdl:
+            chunks = [_decode(tensors)] if planner is None else planner.map(_decode, tensors)
+            for per_batch_exprs, inference_outputs, generative_outputs in chunks:
                 if store_distributions:
                     qz_store.store_distribution(inference_outputs["qz"])
                     px_store.store_distribution(generative_outputs["px"])
+                if output is not None:
+                    if n_samples > 1 and return_mean:
+                        per_batch_exprs = per_batch_exprs.mean(0)
+                    output.append(
+                        "normalized_expression",
+                        per_batch_exprs,
+                        axis=1 if per_batch_exprs.ndim == 3 else 0,
+                    )
+                    continue
+                zs.append(inference_outputs["z"].cpu())
+                exprs.append(per_batch_exprs)
 
-            zs.append(inference_outputs["z"].cpu())
-            per_batch_exprs = torch.cat(per_batch_exprs, dim=0).mean(0).numpy()
-            exprs.append(per_batch_exprs)
+        if output is not None:
+            return output.close()["normalized_expression"]
 
         cell_axis = 1 if n_samples > 1 else 0
         exprs = np.concatenate(exprs, axis=cell_axis)
@@ -338,6 +470,8 @@ class RNASeqMixin:
         weights: Literal["uniform", "importance"] | None = "uniform",
         filter_outlier_cells: bool = False,
         importance_weighting_kwargs: dict | None = None,
+        cache_samples: bool = False,
+        cache_kwargs: dict | None = None,
         **kwargs,
     ) -> pd.DataFrame:
         r"""A unified method for differential expression analysis.
@@ -369,6 +503,14 @@ class RNASeqMixin:
         importance_weighting_kwargs
             Keyword arguments passed into
             :meth:`~scvi.model.base.RNASeqMixin._get_importance_weights`.
+        cache_samples
+            Whether to compute posterior samples of all compared cells once per batch condition
+            and share them across comparisons, instead of running the model on both groups of
+            every comparison. Speeds up comparing many groups, e.g., each group against the rest.
+            Requires `weights="uniform"`.
+        cache_kwargs
+            Keyword arguments passed into :class:`~scvi.model.base.PosteriorSampleCache`, e.g.,
+            `n_samples_per_cell`, or `path` to keep the samples on disk.
         **kwargs
             Keyword args for :meth:`scvi.model.base.DifferentialComputation.get_bayes_factors`
 
@@ -378,6 +520,8 @@ class RNASeqMixin:
         """
         adata = self._validate_anndata(adata)
         col_names = adata.var_names
+        if cache_samples and weights == "importance":
+            raise ValueError("`cache_samples` cannot be used with importance weights.")
         importance_weighting_kwargs = importance_weighting_kwargs or {}
         model_fn = partial(
             self.get_normalized_expression,
@@ -408,6 +552,8 @@ class RNASeqMixin:
             batch_correction,
             fdr_target,
             silent,
+            cache_samples=cache_samples,
+            cache_kwargs=cache_kwargs,
             **kwargs,
         )
 
@@ -421,6 +567,8 @@ class RNASeqMixin:
         n_samples: int = 1,
         gene_list: list[str] | None = None,
         batch_size: int | None = None,
+        output_path: str | os.PathLike | None = None,
+        output_dtype: np.dtype | str | None = None,
     ) -> GCXS:
         r"""Generate predictive samples from the posterior predictive distribution.
 
@@ -449,11 +597,20 @@ class RNASeqMixin:
             Minibatch size to use for data loading and model inference. Defaults to
             ``scvi.settings.batch_size``. Passed into
             :meth:`~scvi.model.base.BaseModelClass._make_data_loader`.
+        output_path
+            If not ``None``, the samples of each minibatch are written to a preallocated dense
+            array named ``"posterior_predictive_sample"`` at this location instead of being kept
+            in memory. See
+            :meth:`~scvi.model.base.RNASeqMixin.get_normalized_expression` for the supported
+            formats.
+        output_dtype
+            Data type of the array written to ``output_path``. Defaults to ``float32``.
 
         Returns
         -------
         Sparse multidimensional array of shape ``(n_obs, n_vars)`` if ``n_samples == 1``, else
-        ``(n_obs, n_vars, n_samples)``.
+        ``(n_obs, n_vars, n_samples)``. If ``output_path`` is provided, the array written to it,
+        loaded lazily.
         """
         import sparse
 
@@ -469,12 +626,23 @@ class RNASeqMixin:
                     "None of the provided genes in ``gene_list`` were detected in the data."
                 )
 
+        output = (
+            None
+            if output_path is None
+            else StreamingOutput(output_path, n_obs=len(dataloader.indices), dtype=output_dtype)
+        )
         x_hat = []
         for tensors in dataloader:
             # (batch_size, n_vars) if n_samples == 1, else (batch_size, n_vars, n_samples)
             samples = self.module.sample(tensors, n_samples=n_samples)[:, gene_mask]
+            if output is not None:
+                output.append("posterior_predictive_sample", samples.numpy())
+                continue
             x_hat.append(sparse.GCXS.from_numpy(samples.numpy()))
 
+        if output is not None:
+            return output.close()["posterior_predictive_sample"]
+
         # (n_minibatches, batch_size, n_vars) -> (n_obs, n_vars) if n_samples == 1, else
         # (n_minibatches, batch_size, n_vars, n_samples) -> (n_obs, n_vars, n_samples)
         return sparse.concatenate(x_hat, axis=0)
@@ -511,10 +679,34 @@ class RNASeqMixin:
         -------
         denoised_samples
         """
+        return np.concatenate(
+            list(
+                self._iter_denoised_samples(
+                    adata=adata,
+                    indices=indices,
+                    n_samples=n_samples,
+                    batch_size=batch_size,
+                    rna_size_factor=rna_size_factor,
+                    transform_batch=transform_batch,
+                )
+            ),
+            axis=0,
+        )
+
+    @torch.inference_mode()
+    def _iter_denoised_samples(
+        self,
+        adata: AnnData | None = None,
+        indices: list[int] | None = None,
+        n_samples: int = 25,
+        batch_size: int = 64,
+        rna_size_factor: int = 1000,
+        transform_batch: list[int] | None = None,
+    ) -> Iterator[np.ndarray]:
+        """Yield the samples of :meth:`_get_denoised_samples` one minibatch at a time."""
         adata = self._validate_anndata(adata)
         scdl = self._make_data_loader(adata=adata, indices=indices, batch_size=batch_size)
 
-        data_loader_list = []
         for tensors in scdl:
             x = tensors[REGISTRY_KEYS.X_KEY]
             generative_kwargs = self._get_transform_batch_gen_kwargs(transform_batch)
@@ -549,12 +741,81 @@ class RNASeqMixin:
                 else torch.distributions.Gamma(r, (1 - p) / p).sample().cpu()
             )
             data = l_train.numpy()
-            data_loader_list += [data]
-
             if n_samples > 1:
-                data_loader_list[-1] = np.transpose(data_loader_list[-1], (1, 2, 0))
+                data = np.transpose(data, (1, 2, 0))
+            yield data
+
+    def _get_feature_correlations(
+        self,
+        adata: AnnData,
+        indices: list[int] | None,
+        n_samples: int,
+        batch_size: int,
+        rna_size_factor: int,
+        transform_batch: list[int | None],
+        correlation_type: Literal["spearman", "pearson"],
+        top_k: int | None,
+        rank_reference_size: int,
+        transform_fn: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> np.ndarray | csr_matrix:
+        """Accumulate the correlations of the denoised samples one minibatch at a time."""
+        if correlation_type not in ("spearman", "pearson"):
+            raise ValueError("Unknown correlation type. Choose one of 'spearman', 'pearson'.")
+        sample_kwargs = {
+            "adata": adata,
+            "n_samples": n_samples,
+            "batch_size": batch_size,
+            "rna_size_factor": rna_size_factor,
+        }
+
+        def flatten(data: np.ndarray) -> np.ndarray:
+            # (n_obs, n_features, n_samples) -> (n_samples * n_obs, n_features)
+            if data.ndim == 3:
+                data = np.transpose(data, (2, 0, 1)).reshape(-1, data.shape[1])
+            return data if transform_fn is None else transform_fn(data)
+
+        indices = np.arange(adata.n_obs) if indices is None else np.asarray(indices)
+        n_reference_cells = max(1, rank_reference_size // n_samples)
+        reference_indices = None
+        if correlation_type == "spearman" and len(indices) > n_reference_cells:
+            reference_indices = np.sort(
+                np.random.choice(indices, n_reference_cells, replace=False)
+            )
 
-        return np.concatenate(data_loader_list, axis=0)
+        correlations = []
+        for b in transform_batch:
+            reference = None
+            if correlation_type == "spearman":
+                reference = np.concatenate(
+                    [
+                        flatten(data)
+                        for data in self._iter_denoised_samples(
+                            indices=indices if reference_indices is None else reference_indices,
+                            transform_batch=b,
+                            **sample_kwargs,
+                        )
+                    ]
+                )
+            correlation = None
+            if reference_indices is None and reference is not None:
+                # all samples fit in the reference, which gives exact ranks
+                correlation = FeatureCorrelation(reference.shape[1], correlation_type, reference)
+                correlation.update(reference)
+            else:
+                for data in self._iter_denoised_samples(
+                    indices=indices, transform_batch=b, **sample_kwargs
+                ):
+                    data = flatten(data)
+                    if correlation is None:
+                        correlation = FeatureCorrelation(
+                            data.shape[1], correlation_type, reference
+                        )
+                    correlation.update(data)
+            correlations.append(correlation)
+
+        if top_k is not None:
+            return top_k_correlations(correlations, top_k)
+        return np.mean([correlation.correlation() for correlation in correlations], axis=0)
 
     @torch.inference_mode()
     def get_feature_correlation_matrix(
@@ -566,9 +827,14 @@ class RNASeqMixin:
         rna_size_factor: int = 1000,
         transform_batch: list[Number | str] | None = None,
         correlation_type: Literal["spearman", "pearson"] = "spearman",
+        top_k: int | None = None,
+        rank_reference_size: int = 5000,
     ) -> pd.DataFrame:
         """Generate gene-gene correlation matrix using scvi uncertainty and expression.
 
+        Correlations are accumulated one minibatch of samples at a time, so that memory usage
+        does not depend on the number of cells and samples.
+
         Parameters
         ----------
         adata
@@ -591,48 +857,41 @@ class RNASeqMixin:
             - list of int, then values are averaged over provided batches.
         correlation_type
             One of "pearson", "spearman".
+        top_k
+            If not `None`, only the `top_k` strongest correlations of each gene with other genes,
+            by absolute value, are returned, as a sparse :class:`~pandas.DataFrame`.
+        rank_reference_size
+            Only used if `correlation_type` is "spearman". Maximum number of samples used as a
+            reference to rank the samples of each gene. If the samples of all cells exceed it,
+            they are ranked among the samples of a random subset of cells, which approximates
+            the Spearman correlation.
 
         Returns
         -------
         Gene-gene correlation matrix
         """
-        from scipy.stats import spearmanr
-
         adata = self._validate_anndata(adata)
 
         transform_batch = _get_batch_code_from_category(
             self.get_anndata_manager(adata, required=True), transform_batch
         )
 
-        corr_mats = []
-        for b in transform_batch:
-            denoised_data = self._get_denoised_samples(
-                adata=adata,
-                indices=indices,
-                n_samples=n_samples,
-                batch_size=batch_size,
-                rna_size_factor=rna_size_factor,
-                transform_batch=b,
-            )
-            flattened = np.zeros((denoised_data.shape[0] * n_samples, denoised_data.shape[1]))
-            for i in range(n_samples):
-                if n_samples == 1:
-                    flattened[denoised_data.shape[0] * (i) : denoised_data.shape[0] * (i + 1)] = (
-                        denoised_data[:, :]
-                    )
-                else:
-                    flattened[denoised_data.shape[0] * (i) : denoised_data.shape[0] * (i + 1)] = (
-                        denoised_data[:, :, i]
-                    )
-            if correlation_type == "pearson":
-                corr_matrix = np.corrcoef(flattened, rowvar=False)
-            elif correlation_type == "spearman":
-                corr_matrix, _ = spearmanr(flattened)
-            else:
-                raise ValueError("Unknown correlation type. Choose one of 'spearman', 'pearson'.")
-            corr_mats.append(corr_matrix)
-        corr_matrix = np.mean(np.stack(corr_mats), axis=0)
+        corr_matrix = self._get_feature_correlations(
+            adata=adata,
+            indices=indices,
+            n_samples=n_samples,
+            batch_size=batch_size,
+            rna_size_factor=rna_size_factor,
+            transform_batch=transform_batch,
+            correlation_type=correlation_type,
+            top_k=top_k,
+            rank_reference_size=rank_reference_size,
+        )
         var_names = adata.var_names
+        if top_k is not None:
+            return pd.DataFrame.sparse.from_spmatrix(
+                corr_matrix, index=var_names, columns=var_names
+            )
         return pd.DataFrame(corr_matrix, index=var_names, columns=var_names)
 
     @torch.inference_mode()
@@ -643,6 +902,8 @@ class RNASeqMixin:
         n_samples: int | None = 1,
         give_mean: bool | None = False,
         batch_size: int | None = None,
+        output_path: str | os.PathLike | None = None,
+        output_dtype: np.dtype | str | None = None,
     ) -> dict[str, np.ndarray]:
         r"""Estimates for the parameters of the likelihood :math:`p(x \mid z)`.
 
@@ -659,11 +920,29 @@ class RNASeqMixin:
             Return expected value of parameters or a samples
         batch_size
             Minibatch size for data loading into model. Defaults to `scvi.settings.batch_size`.
+        output_path
+            If not `None`, the parameters of each minibatch are written to preallocated arrays
+            named after the returned keys at this location instead of being kept in memory. See
+            :meth:`~scvi.model.base.RNASeqMixin.get_normalized_expression` for the supported
+            formats.
+        output_dtype
+            Data type of the arrays written to `output_path`. Defaults to `float32`.
+
+        Returns
+        -------
+        Dictionary with the `"mean"`, `"dispersions"` and `"dropout"` parameters of the
+        likelihood, depending on `gene_likelihood`. If `output_path` is provided, the values
+        are the arrays written to it, loaded lazily.
         """
         adata = self._validate_anndata(adata)
 
         scdl = self._make_data_loader(adata=adata, indices=indices, batch_size=batch_size)
 
+        output = (
+            None
+            if output_path is None
+            else StreamingOutput(output_path, n_obs=len(scdl.indices), dtype=output_dtype)
+        )
         dropout_list = []
         mean_list = []
         dispersion_list = []
@@ -680,7 +959,6 @@ class RNASeqMixin:
             if self.module.gene_likelihood == "zinb":
                 px_dropout = px.zi_probs
                 dropout_list += [px_dropout.cpu().numpy()]
-                dropout = np.concatenate(dropout_list, axis=-2)
 
             n_batch = px_rate.size(0) if n_samples == 1 else px_rate.size(1)
             if self.module.gene_likelihood != "poisson":
@@ -691,8 +969,26 @@ class RNASeqMixin:
                     dispersion_list += [px_r]
             mean_list += [px_rate.cpu().numpy()]
 
+            if output is not None:
+                for key, values in [
+                    ("mean", mean_list),
+                    ("dispersions", dispersion_list),
+                    ("dropout", dropout_list),
+                ]:
+                    if len(values) == 0:
+                        continue
+                    batch_values = values.pop()
+                    if give_mean and n_samples > 1 and batch_values.ndim == 3:
+                        batch_values = batch_values.mean(0)
+                    output.append(key, batch_values, axis=batch_values.ndim - 2)
+
+        if output is not None:
+            return output.close()
+
         means = np.concatenate(mean_list, axis=-2)
         dispersions = np.concatenate(dispersion_list, axis=-2)
+        if self.module.gene_likelihood == "zinb":
+            dropout = np.concatenate(dropout_list, axis=-2)
 
         if give_mean and n_samples > 1:
             if self.module.gene_likelihood == "zinb":
@@ -711,6 +1007,7 @@ class RNASeqMixin:
 
         return return_dict
 
+    @cache_inference_output
     @torch.inference_mode()
     @unsupported_if_adata_minified
     def get_latent_library_size(
@@ -759,3 +1056,80 @@ class RNASeqMixin:
                 library = torch.distributions.LogNormal(ql.loc, ql.scale).mean
             libraries += [library.cpu()]
         return torch.cat(libraries).numpy()
+
+
+def _anchor_log_likelihoods(px: db.Distribution, x_anchor: torch.Tensor) -> torch.Tensor:
+    """Log-likelihoods of anchor cells under the count distributions of all samples.
+
+    The counts of each anchor cell are evaluated under ``px`` with its mean rescaled to the
+    library size of the anchor, for all anchors at once.
+
+    For negative binomial and zero-inflated negative binomial distributions, the terms of the
+    log-likelihood that only depend on the samples are computed once, the terms of zero counts
+    are computed densely, and the remaining terms only for the nonzero counts of the anchors.
+    Other distributions are evaluated with a broadcasted ``log_prob``.
+
+    Parameters
+    ----------
+    px
+        Count distributions with parameters of shape ``(..., n_genes)``.
+    x_anchor
+        Counts of the anchor cells, of shape ``(n_anchors, n_genes)``.
+
+    Returns
+    -------
+    Tensor of shape ``(..., n_anchors)``.
+    """
+    library = x_anchor.sum(-1)
+    if not isinstance(px, NegativeBinomial):
+        # parameters get an anchor axis before the gene axis
+        anchor_px = copy.copy(px)
+        for name in px.arg_constraints:
+            value = px.__dict__.get(name)
+            if isinstance(value, torch.Tensor) and value.dim() >= 2:
+                setattr(anchor_px, name, value.unsqueeze(-2))
+        anchor_px.mu = anchor_px.scale * library[:, None]
+        return anchor_px.log_prob(x_anchor).sum(dim=-1)
+
+    eps = 1e-8
+    batch_shape, n_genes = px.scale.shape[:-1], px.scale.shape[-1]
+    scale = px.scale.reshape(-1, n_genes)
+    theta = px.theta.expand(*batch_shape, n_genes).reshape(-1, n_genes)
+    theta_log_theta = theta * torch.log(theta + eps)
+    zero_inflated = isinstance(px, ZeroInflatedNegativeBinomial)
+
+    # log-likelihoods of zero counts: n_samples * n_cells, n_anchors, n_genes
+    log_theta_mu_eps = torch.log(theta[:, None] + scale[:, None] * library[:, None] + eps)
+    if zero_inflated:
+        pi = px.zi_logits.expand(*batch_shape, n_genes).reshape(-1, n_genes)
+        softplus_pi = F.softplus(-pi)
+        pi_theta_log = (-pi + theta_log_theta)[:, None] - theta[:, None] * log_theta_mu_eps
+        log_prob = (F.softplus(pi_theta_log) - softplus_pi[:, None]).sum(-1)
+    else:
+        log_prob = theta_log_theta.sum(-1, keepdim=True) - torch.einsum(
+            "rag,rg->ra", log_theta_mu_eps, theta
+        )
+    del log_theta_mu_eps
+
+    # corrections for nonzero counts: n_samples * n_cells, n_nonzero
+    anchors, genes = torch.nonzero(x_anchor > eps, as_tuple=True)
+    x = x_anchor[anchors, genes]
+    theta_nz = theta[:, genes]
+    mu_nz = scale[:, genes] * library[anchors]
+    log_theta_mu_eps_nz = torch.log(theta_nz + mu_nz + eps)
+    # dispersions shared by all samples, e.g. with `dispersion="gene"`, need one row of lgamma
+    theta_rows = theta[:1] if bool((theta == theta[:1]).all()) else theta
+    correction = (
+        x * (torch.log(mu_nz + eps) - log_theta_mu_eps_nz)
+        + torch.lgamma(x + theta_rows[:, genes])
+        - torch.lgamma(theta_rows)[:, genes]
+        - torch.lgamma(x + 1)
+    )
+    if zero_inflated:
+        pi_theta_log_nz = (
+            -pi[:, genes] + theta_log_theta[:, genes] - theta_nz * log_theta_mu_eps_nz
+        )
+        correction += pi_theta_log_nz - F.softplus(pi_theta_log_nz)
+    log_prob.index_add_(1, anchors, correction)
+
+    return log_prob.reshape(*batch_shape, -1)
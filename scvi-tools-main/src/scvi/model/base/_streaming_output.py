@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+
+from scvi.utils import error_on_missing_dependencies
+
+if TYPE_CHECKING:
+    import os
+
+
+class StreamingOutput:
+    """On-disk arrays that the outputs of minibatches are written into as they are computed.
+
+    Each output is preallocated with ``n_obs`` observations along its observation axis when its
+    first minibatch is appended, and minibatches are written at consecutive offsets, so that
+    memory usage is bounded by the minibatch size instead of the number of observations.
+
+    Parameters
+    ----------
+    path
+        Location of the outputs. Paths ending in ``.zarr`` are written as a zarr group and
+        paths ending in ``.h5`` or ``.hdf5`` as an HDF5 file, with one array per output. Other
+        paths are written as a directory with one ``.npy`` file per output, which are read back
+        as memory maps. Existing outputs are overwritten.
+    n_obs
+        Number of observations of each output.
+    dtype
+        Data type of the stored arrays, e.g. ``"float16"`` to halve the size of the outputs. If
+        ``None``, uses the data type of the first minibatch of each output.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        n_obs: int,
+        dtype: np.dtype | str | None = None,
+    ):
+        self.path = Path(path)
+        self.n_obs = n_obs
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        suffix = self.path.suffix.lower()
+        if suffix == ".zarr":
+            error_on_missing_dependencies("zarr")
+            self.format = "zarr"
+        elif suffix in (".h5", ".hdf5"):
+            self.format = "hdf5"
+        else:
+            self.format = "npy"
+        self._arrays = {}
+        self._offsets = {}
+        self._store = None
+
+    def _open_store(self):
+        if self.format == "zarr":
+            import zarr
+
+            self._store = zarr.open_group(str(self.path), mode="w")
+        elif self.format == "hdf5":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._store = h5py.File(self.path, "w")
+        else:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path.mkdir(parents=True)
+            self._store = self.path
+
+    def _create(self, key: str, shape: tuple[int, ...], dtype: np.dtype, axis: int):
+        if self._store is None:
+            self._open_store()
+        # chunks span a minibatch of observations and all other dimensions
+        chunks = tuple(
+            max(1, min(size, self.n_obs)) if i == axis else max(1, size)
+            for i, size in enumerate(shape)
+        )
+        shape = tuple(self.n_obs if i == axis else size for i, size in enumerate(shape))
+        if self.format == "zarr":
+            create = getattr(self._store, "create_array", None) or self._store.create_dataset
+            return create(key, shape=shape, chunks=chunks, dtype=dtype)
+        if self.format == "hdf5":
+            return self._store.create_dataset(
+                key, shape=shape, chunks=chunks if 0 not in chunks else None, dtype=dtype
+            )
+        return np.lib.format.open_memmap(
+            self._store / f"{key}.npy", mode="w+", dtype=dtype, shape=shape
+        )
+
+    def append(self, key: str, values: np.ndarray, axis: int = 0):
+        """Write the next minibatch of an output.
+
+        Parameters
+        ----------
+        key
+            Name of the output.
+        values
+            Values of the minibatch, with observations along ``axis``.
+        axis
+            Observation axis of the output.
+        """
+        values = np.asarray(values)
+        if key not in self._arrays:
+            dtype = self.dtype if self.dtype is not None else values.dtype
+            self._arrays[key] = self._create(key, values.shape, dtype, axis)
+            self._offsets[key] = 0
+
+        start = self._offsets[key]
+        stop = start + values.shape[axis]
+        if stop > self.n_obs:
+            raise ValueError(f"More than {self.n_obs} observations were written to `{key}`.")
+        index = (slice(None),) * axis + (slice(start, stop),)
+        array = self._arrays[key]
+        array[index] = values.astype(array.dtype, copy=False)
+        self._offsets[key] = stop
+
+    def close(self) -> dict:
+        """Finish writing and reopen the outputs read-only.
+
+        Returns
+        -------
+        Dictionary mapping the name of each output to a lazily loaded array: a
+        :class:`~numpy.memmap`, a :class:`zarr.Array` or a :class:`h5py.Dataset`.
+        """
+        for key, offset in self._offsets.items():
+            if offset != self.n_obs:
+                raise ValueError(
+                    f"Only {offset} of {self.n_obs} observations were written to `{key}`."
+                )
+
+        if self.format == "zarr":
+            import zarr
+
+            group = zarr.open_group(str(self.path), mode="r")
+            return {key: group[key] for key in self._arrays}
+        if self.format == "hdf5":
+            if self._store is not None:
+                self._store.close()
+            file = h5py.File(self.path, "r")
+            return {key: file[key] for key in self._arrays}
+        for array in self._arrays.values():
+            array.flush()
+        return {key: np.load(self.path / f"{key}.npy", mmap_mode="r") for key in self._arrays}
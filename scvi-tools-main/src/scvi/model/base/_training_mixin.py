@@ -8,6 +8,8 @@ from scvi.train import TrainingPlan, TrainRunner
 from scvi.utils._docstrings import devices_dsp
 
 if TYPE_CHECKING:
+    from typing import Literal
+
     from lightning import LightningDataModule
 
 
@@ -33,6 +35,7 @@ class UnsupervisedTrainingMixin:
         datasplitter_kwargs: dict | None = None,
         plan_kwargs: dict | None = None,
         datamodule: LightningDataModule | None = None,
+        autocast_dtype: Literal["float32", "bfloat16"] | None = None,
         **trainer_kwargs,
     ):
         """Train the model.
@@ -81,6 +84,10 @@ class UnsupervisedTrainingMixin:
             ``EXPERIMENTAL`` A :class:`~lightning.pytorch.core.LightningDataModule` instance to use
             for training in place of the default :class:`~scvi.dataloaders.DataSplitter`. Can only
             be passed in if the model was not initialized with :class:`~anndata.AnnData`.
+        autocast_dtype
+            Data type of the forward passes, one of ``"float32"`` or ``"bfloat16"``. Passed into
+            :class:`~scvi.train.TrainingPlan`, overriding the value in ``plan_kwargs``. If
+            ``None``, the value in ``plan_kwargs`` is used.
         **kwargs
            Additional keyword arguments passed into :class:`~scvi.train.Trainer`.
         """
@@ -127,6 +134,8 @@ class UnsupervisedTrainingMixin:
             )
 
         plan_kwargs = plan_kwargs or {}
+        if autocast_dtype is not None:
+            plan_kwargs = {**plan_kwargs, "autocast_dtype": autocast_dtype}
         training_plan = self._training_plan_cls(self.module, **plan_kwargs)
 
         es = "early_stopping"
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 import torch
 
+from scvi.model.base._inference_cache import cache_inference_output
 from scvi.utils import unsupported_if_adata_minified
 
 if TYPE_CHECKING:
@@ -51,8 +52,9 @@ class VAEMixin:
             Indices of observations in ``adata`` to use. If ``None``, defaults to all observations.
             Ignored if ``dataloader`` is not ``None``.
         batch_size
-            Minibatch size for the forward pass. If ``None``, defaults to
-            ``scvi.settings.batch_size``. Ignored if ``dataloader`` is not ``None``.
+            Minibatch size for the forward pass. If ``None``, it is picked so that a minibatch
+            fits in the free memory of the device, up to ``scvi.settings.batch_size``, and shrunk
+            if the forward pass runs out of memory. Ignored if ``dataloader`` is not ``None``.
         dataloader
             An iterator over minibatches of data on which to compute the metric. The minibatches
             should be formatted as a dictionary of :class:`~torch.Tensor` with keys as expected by
@@ -70,17 +72,28 @@ class VAEMixin:
         -----
         This is not the negative ELBO, so higher is better.
         """
+        from scvi.model.base._chunk_planner import ChunkPlanner
         from scvi.model.base._log_likelihood import compute_elbo
 
+        planner = None
         if adata is not None and dataloader is not None:
             raise ValueError("Only one of `adata` or `dataloader` can be provided.")
         elif dataloader is None:
             adata = self._validate_anndata(adata)
+            if batch_size is None:
+                planner = ChunkPlanner.from_module(
+                    self.module,
+                    self.summary_stats.get("n_vars", adata.n_vars),
+                    device=self.device,
+                )
+                batch_size, _ = planner.plan(samples_per_pass=1)
             dataloader = self._make_data_loader(
                 adata=adata, indices=indices, batch_size=batch_size
             )
 
-        return -compute_elbo(self.module, dataloader, return_mean=return_mean, **kwargs)
+        return -compute_elbo(
+            self.module, dataloader, return_mean=return_mean, chunk_planner=planner, **kwargs
+        )
 
     @torch.inference_mode()
     @unsupported_if_adata_minified
@@ -111,8 +124,10 @@ class VAEMixin:
             Number of Monte Carlo samples to use for the estimator. Passed into the module's
             ``marginal_ll`` method.
         batch_size
-            Minibatch size for the forward pass. If ``None``, defaults to
-            ``scvi.settings.batch_size``. Ignored if ``dataloader`` is not ``None``.
+            Minibatch size for the forward pass. If ``None``, it is picked so that the Monte Carlo
+            samples of a minibatch fit in the free memory of the device, up to
+            ``scvi.settings.batch_size``, and shrunk if the forward pass runs out of memory.
+            Ignored if ``dataloader`` is not ``None``.
         return_mean
             Whether to return the mean of the marginal log-likelihood or the marginal-log
             likelihood for each observation.
@@ -121,7 +136,9 @@ class VAEMixin:
             should be formatted as a dictionary of :class:`~torch.Tensor` with keys as expected by
             the model. If ``None``, a dataloader is created from ``adata``.
         **kwargs
-            Additional keyword arguments to pass into the module's ``marginal_ll`` method.
+            Additional keyword arguments to pass into the module's ``marginal_ll`` method. If the
+            module supports ``n_mc_samples_per_pass`` and it is not passed, or is ``None``, it is
+            picked together with ``batch_size``.
 
         Returns
         -------
@@ -132,8 +149,12 @@ class VAEMixin:
         -----
         This is not the negative log-likelihood, so higher is better.
         """
+        from inspect import signature
+
         from numpy import mean
 
+        from scvi.model.base._chunk_planner import ChunkPlanner
+
         if not hasattr(self.module, "marginal_ll"):
             raise NotImplementedError(
                 "The model's module must implement `marginal_ll` to compute the marginal "
@@ -144,9 +165,35 @@ class VAEMixin:
 
         if dataloader is None:
             adata = self._validate_anndata(adata)
+            chunk_samples = (
+                "n_mc_samples_per_pass" in signature(self.module.marginal_ll).parameters
+            )
+            samples_per_pass = (
+                kwargs.pop("n_mc_samples_per_pass", None) if chunk_samples else n_mc_samples
+            )
+            planner = ChunkPlanner.from_module(
+                self.module, self.summary_stats.get("n_vars", adata.n_vars), device=self.device
+            )
+            planner.plan(
+                n_mc_samples,
+                batch_size=batch_size,
+                samples_per_pass=samples_per_pass,
+            )
             dataloader = self._make_data_loader(
-                adata=adata, indices=indices, batch_size=batch_size
+                adata=adata, indices=indices, batch_size=planner.batch_size
+            )
+
+            def marginal_ll(tensors: dict[str, Tensor | None], n_per_pass: int) -> Tensor:
+                if chunk_samples:
+                    kwargs["n_mc_samples_per_pass"] = n_per_pass
+                return self.module.marginal_ll(
+                    tensors, n_mc_samples=n_mc_samples, return_mean=False, **kwargs
+                )
+
+            log_likelihoods = torch.cat(
+                [ll for tensors in dataloader for ll in planner.map(marginal_ll, tensors)], dim=0
             )
+            return mean(log_likelihoods.numpy()) if return_mean else log_likelihoods
 
         log_likelihoods: list[float | Tensor] = [
             self.module.marginal_ll(
@@ -223,6 +270,7 @@ class VAEMixin:
             self.module, dataloader, return_mean=return_mean, **kwargs
         )
 
+    @cache_inference_output
     @torch.inference_mode()
     def get_latent_representation(
         self,
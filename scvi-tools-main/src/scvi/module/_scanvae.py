@@ -5,11 +5,11 @@ from typing import TYPE_CHECKING
 import numpy as np
 import torch
 from torch.distributions import Categorical, Normal
-from torch.distributions import kl_divergence as kl
 from torch.nn import functional as F
 
 from scvi import REGISTRY_KEYS
 from scvi.data import _constants
+from scvi.distributions._utils import kl_divergence as kl
 from scvi.module.base import LossOutput, auto_move_data
 from scvi.nn import Decoder, Encoder
 
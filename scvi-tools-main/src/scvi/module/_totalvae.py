@@ -7,7 +7,6 @@ import numpy as np
 import torch
 import torch.nn.functional as F
 from torch.distributions import Normal
-from torch.distributions import kl_divergence as kl
 from torch.nn.functional import one_hot
 
 from scvi import REGISTRY_KEYS
@@ -18,6 +17,7 @@ from scvi.distributions import (
     NegativeBinomialMixture,
     ZeroInflatedNegativeBinomial,
 )
+from scvi.distributions._utils import kl_divergence as kl
 from scvi.model.base import BaseModelClass
 from scvi.module._constants import MODULE_KEYS
 from scvi.module.base import BaseMinifiedModeModuleClass, LossOutput, auto_move_data
@@ -771,6 +771,8 @@ class TOTALVAE(BaseMinifiedModeModuleClass):
         batch_log_lkl = torch.logsumexp(to_sum, dim=-1) - np.log(n_mc_samples)
         if return_mean:
             log_lkl = torch.mean(batch_log_lkl).item()
+        else:
+            log_lkl = batch_log_lkl.cpu()
         return log_lkl
 
     def on_load(self, model: BaseModelClass, **kwargs):
@@ -553,7 +553,8 @@ class VAE(EmbeddingModuleMixin, BaseMinifiedModeModuleClass):
         kl_weight: torch.tensor | float = 1.0,
     ) -> LossOutput:
         """Compute the loss."""
-        from torch.distributions import kl_divergence
+        from scvi.distributions import NegativeBinomial
+        from scvi.distributions._utils import kl_divergence
 
         x = tensors[REGISTRY_KEYS.X_KEY]
         kl_divergence_z = kl_divergence(
@@ -566,7 +567,11 @@ class VAE(EmbeddingModuleMixin, BaseMinifiedModeModuleClass):
         else:
             kl_divergence_l = torch.zeros_like(kl_divergence_z)
 
-        reconst_loss = -generative_outputs[MODULE_KEYS.PX_KEY].log_prob(x).sum(-1)
+        px = generative_outputs[MODULE_KEYS.PX_KEY]
+        if isinstance(px, NegativeBinomial) and REGISTRY_KEYS.X_SPARSE_KEY in tensors:
+            # only the nonzero counts of sparse minibatches are evaluated elementwise
+            x = tensors[REGISTRY_KEYS.X_SPARSE_KEY]
+        reconst_loss = -px.log_prob(x).sum(-1)
 
         kl_local_for_warmup = kl_divergence_z
         kl_local_no_warmup = kl_divergence_l
@@ -45,6 +45,15 @@ class FCLayers(nn.Module):
         Whether to inject covariates in each layer, or just the first (default).
     activation_fn
         Which activation function to use
+    covariate_injection
+        How categorical covariates are injected into the linear layers. One of the following:
+
+        * ``"concat"``: concatenate their one-hot encodings to the layer inputs.
+        * ``"embedding"``: add the weight columns of their categories, stored as one
+          :class:`~torch.nn.Embedding` per covariate, to the layer outputs. This is equivalent
+          to ``"concat"`` but avoids the one-hot encodings, which is faster for covariates with
+          many categories. Inputs with three dimensions are batch normalized as one batch
+          instead of per sample. Weights saved in either mode can be loaded in the other.
     """
 
     def __init__(
@@ -61,9 +70,16 @@ class FCLayers(nn.Module):
         bias: bool = True,
         inject_covariates: bool = True,
         activation_fn: nn.Module = nn.ReLU,
+        covariate_injection: Literal["concat", "embedding"] = "concat",
     ):
         super().__init__()
+        if covariate_injection not in ("concat", "embedding"):
+            raise ValueError(
+                f"`covariate_injection` must be 'concat' or 'embedding', got "
+                f"{covariate_injection}."
+            )
         self.inject_covariates = inject_covariates
+        self.covariate_injection = covariate_injection
         layers_dim = [n_in] + (n_layers - 1) * [n_hidden] + [n_out]
 
         if n_cat_list is not None:
@@ -102,6 +118,60 @@ class FCLayers(nn.Module):
                 ]
             )
         )
+        if covariate_injection == "embedding":
+            self._split_covariate_weights()
+
+    def _split_covariate_weights(self):
+        """Move the covariate columns of the injected linear layers into embeddings.
+
+        The linear layers are built for one-hot concatenation first, so that both modes are
+        initialized identically.
+        """
+        n_cats = [n_cat for n_cat in self.n_cat_list if n_cat > 1]
+        self.covariate_embeddings = nn.ModuleDict()
+        for i, layers in enumerate(self.fc_layers):
+            if not self.inject_into_layer(i) or len(n_cats) == 0:
+                continue
+            # reuse the initialized parameters, so that the random state is not advanced
+            linear = layers[0]
+            n_in = linear.in_features - sum(n_cats)
+            cat_weights = linear.weight.detach()[:, n_in:].split(n_cats, dim=1)
+            linear.weight = nn.Parameter(linear.weight.detach()[:, :n_in].clone())
+            linear.in_features = n_in
+            embeddings = nn.ModuleList(
+                [
+                    nn.Embedding.from_pretrained(weight.T.clone(), freeze=False)
+                    for weight in cat_weights
+                ]
+            )
+            self.covariate_embeddings[f"Layer {i}"] = embeddings
+
+    def _load_from_state_dict(
+        self, state_dict: dict[str, torch.Tensor], prefix: str, *args, **kwargs
+    ):
+        """Load from a state dict, converting weights saved with the other covariate injection."""
+        n_cats = [n_cat for n_cat in self.n_cat_list if n_cat > 1]
+        for i, layers in enumerate(self.fc_layers):
+            weight_key = f"{prefix}fc_layers.Layer {i}.0.weight"
+            if not self.inject_into_layer(i) or len(n_cats) == 0 or weight_key not in state_dict:
+                continue
+            embedding_keys = [
+                f"{prefix}covariate_embeddings.Layer {i}.{j}.weight" for j in range(len(n_cats))
+            ]
+            weight = state_dict[weight_key]
+            n_in = layers[0].in_features
+            if self.covariate_injection == "embedding" and weight.size(1) == n_in + sum(n_cats):
+                state_dict[weight_key] = weight[:, :n_in]
+                cat_weights = weight[:, n_in:].split(n_cats, dim=1)
+                for key, cat_weight in zip(embedding_keys, cat_weights, strict=True):
+                    state_dict[key] = cat_weight.T.contiguous()
+            elif self.covariate_injection == "concat" and all(
+                key in state_dict for key in embedding_keys
+            ):
+                state_dict[weight_key] = torch.cat(
+                    [weight, *(state_dict.pop(key).T for key in embedding_keys)], dim=1
+                )
+        return super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
 
     def inject_into_layer(self, layer_num) -> bool:
         """Helper to determine if covariates should be injected."""
@@ -127,7 +197,8 @@ class FCLayers(nn.Module):
                 if i == 0 and not hook_first_layer:
                     continue
                 if isinstance(layer, nn.Linear):
-                    if self.inject_into_layer(i):
+                    # covariate embeddings are kept trainable
+                    if self.inject_into_layer(i) and self.covariate_injection == "concat":
                         w = layer.weight.register_hook(_hook_fn_weight)
                     else:
                         w = layer.weight.register_hook(_hook_fn_zero_out)
@@ -150,6 +221,8 @@ class FCLayers(nn.Module):
         :class:`torch.Tensor`
             tensor of shape ``(n_out,)``
         """
+        if self.covariate_injection == "embedding":
+            return self._forward_embedding(x, *cat_list)
         one_hot_cat_list = []  # for generality in this list many indices useless.
 
         if len(self.n_cat_list) > len(cat_list):
@@ -193,6 +266,37 @@ class FCLayers(nn.Module):
                         x = layer(x)
         return x
 
+    def _forward_embedding(self, x: torch.Tensor, *cat_list: int):
+        """Forward computation with covariates injected through embeddings."""
+        if len(self.n_cat_list) > len(cat_list):
+            raise ValueError("nb. categorical args provided doesn't match init. params.")
+        cats = []
+        for n_cat, cat in zip(self.n_cat_list, cat_list, strict=False):
+            if n_cat and cat is None:
+                raise ValueError("cat not provided while n_cat != 0 in init. params.")
+            if n_cat > 1:  # n_cat = 1 will be ignored - no additional information
+                cats.append(cat)
+
+        for i, layers in enumerate(self.fc_layers):
+            for layer in layers:
+                if layer is None:
+                    continue
+                if isinstance(layer, nn.BatchNorm1d) and x.dim() == 3:
+                    x = layer(x.reshape(-1, x.size(-1))).reshape(x.shape)
+                    continue
+                x = layer(x)
+                if isinstance(layer, nn.Linear) and f"Layer {i}" in self.covariate_embeddings:
+                    for cat, embedding in zip(
+                        cats, self.covariate_embeddings[f"Layer {i}"], strict=True
+                    ):
+                        if cat.size(1) != embedding.num_embeddings:
+                            cat_bias = embedding(cat.squeeze(-1).long())
+                        else:  # cat has already been one_hot encoded
+                            cat_bias = cat.to(embedding.weight.dtype) @ embedding.weight
+                        # broadcasts over the samples of three-dimensional inputs
+                        x = x + cat_bias.to(x.dtype)
+        return x
+
 
 # Encoder
 class Encoder(nn.Module):
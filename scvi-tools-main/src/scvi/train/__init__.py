@@ -1,9 +1,16 @@
-from ._callbacks import JaxModuleInit, LoudEarlyStopping, SaveBestState, SaveCheckpoint
+from ._callbacks import (
+    AsyncCheckpoint,
+    JaxModuleInit,
+    LoudEarlyStopping,
+    SaveBestState,
+    SaveCheckpoint,
+)
 from ._constants import METRIC_KEYS
 from ._trainer import Trainer
 from ._trainingplans import (
     AdversarialTrainingPlan,
     ClassifierTrainingPlan,
+    EnsembleTrainingPlan,
     JaxTrainingPlan,
     LowLevelPyroTrainingPlan,
     PyroTrainingPlan,
@@ -20,10 +27,12 @@ __all__ = [
     "SemiSupervisedTrainingPlan",
     "AdversarialTrainingPlan",
     "ClassifierTrainingPlan",
+    "EnsembleTrainingPlan",
     "TrainRunner",
     "LoudEarlyStopping",
     "SaveBestState",
     "SaveCheckpoint",
+    "AsyncCheckpoint",
     "JaxModuleInit",
     "JaxTrainingPlan",
     "METRIC_KEYS",
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+import queue
+import threading
 import warnings
 from collections.abc import Callable
 from copy import deepcopy
@@ -18,9 +20,12 @@ from lightning.pytorch.utilities import rank_zero_info
 
 from scvi import settings
 from scvi.model.base import BaseModelClass
-from scvi.model.base._save_load import _load_saved_files
+from scvi.model.base._constants import SAVE_KEYS
+from scvi.model.base._save_load import _get_var_names, _load_saved_files
 
 if TYPE_CHECKING:
+    from typing import Literal
+
     import lightning.pytorch as pl
 
     from scvi.dataloaders import AnnDataLoader
@@ -162,6 +167,218 @@ class SaveCheckpoint(ModelCheckpoint):
             pyro.get_param_store().set_state(pyro_param_store)
 
 
+class AsyncCheckpoint(Callback):
+    """``BETA`` Saves the best module state without blocking training.
+
+    Improving module states are copied into preallocated CPU buffers, pinned if the module is on
+    a GPU, with non-blocking copies. A background thread then writes them to disk in the format of
+    :meth:`~scvi.model.base.BaseModelClass.save`, without the AnnData. Writes wait in a queue of
+    at most ``max_queue_size`` states. If a state improves while the queue is full, the oldest
+    pending write is dropped, as it is superseded by the newer state, so that a slow filesystem
+    never blocks training.
+
+    The best module state and best score based on ``monitor`` can be accessed post-training with
+    the ``best_model_path`` and ``best_model_score`` attributes, respectively. The saved model can
+    be loaded with :meth:`~scvi.model.base.BaseModelClass.load`.
+
+    Parameters
+    ----------
+    dirpath
+        Directory to save the best model state into. If ``None``, defaults to a subdirectory in
+        :attr:``scvi.settings.logging_dir`` formatted with the current date, time, and monitor.
+    monitor
+        Metric to monitor for checkpointing.
+    mode
+        One of ``"min"`` or ``"max"``, whether the monitored metric improves by decreasing or
+        increasing.
+    max_queue_size
+        Maximum number of module states waiting to be written to disk.
+    load_best_on_end
+        If ``True``, loads the best module state into the model at the end of training. The state
+        is taken from memory and does not wait for disk writes.
+    """
+
+    def __init__(
+        self,
+        dirpath: str | None = None,
+        monitor: str = "validation_loss",
+        mode: Literal["min", "max"] = "min",
+        max_queue_size: int = 1,
+        load_best_on_end: bool = False,
+    ):
+        super().__init__()
+        if mode not in ["min", "max"]:
+            raise ValueError(f"AsyncCheckpoint mode {mode} is unknown")
+        if max_queue_size < 1:
+            raise ValueError("`max_queue_size` must be at least 1.")
+        if dirpath is None:
+            dirpath = os.path.join(
+                settings.logging_dir,
+                datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + f"_{monitor}",
+            )
+        self.dirpath = dirpath
+        self.monitor = monitor
+        self.mode = mode
+        self.monitor_op = np.less if mode == "min" else np.greater
+        self.max_queue_size = max_queue_size
+        self.load_best_on_end = load_best_on_end
+
+        self.best_model_path = None
+        self.best_model_score = None
+        self.n_dropped_writes = 0
+
+    def _monitor_improved(self, current: float) -> bool:
+        return self.best_model_score is None or self.monitor_op(current, self.best_model_score)
+
+    def on_train_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule) -> None:
+        """Allocate the CPU buffers and start the writer thread."""
+        state_dict = pl_module.module.state_dict()
+        self._pin_memory = torch.cuda.is_available() and any(
+            tensor.is_cuda for tensor in state_dict.values()
+        )
+        # the best state, the state being written and the queued states can all be distinct
+        self._buffers = [
+            {
+                key: torch.empty_like(tensor, device="cpu", pin_memory=self._pin_memory)
+                for key, tensor in state_dict.items()
+            }
+            for _ in range(self.max_queue_size + 2)
+        ]
+        # number of uses of each buffer as the best, a queued or the written state
+        self._buffer_uses = [0] * len(self._buffers)
+        self._best_buffer = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._write_error = None
+        self.best_model_score = None
+        self.n_dropped_writes = 0
+
+        model = getattr(trainer, "_model", None)
+        self._metadata = {}
+        if model is not None and model.adata is not None:
+            # same attributes as the saves of a trained model
+            user_attributes = {a[0]: a[1] for a in model._get_user_attributes() if a[0][-1] == "_"}
+            user_attributes["is_trained_"] = True
+            self._metadata = {
+                SAVE_KEYS.VAR_NAMES_KEY: _get_var_names(model.adata),
+                SAVE_KEYS.ATTR_DICT_KEY: user_attributes,
+            }
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def on_validation_epoch_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule) -> None:
+        """Snapshot the module state if the monitored metric improved."""
+        if trainer.sanity_checking:
+            return
+        current = trainer.callback_metrics.get(self.monitor)
+        if current is None:
+            warnings.warn(
+                f"Can save best module state only with {self.monitor} available, skipping.",
+                RuntimeWarning,
+                stacklevel=settings.warnings_stacklevel,
+            )
+            return
+        if isinstance(current, torch.Tensor):
+            current = current.item()
+        if not self._monitor_improved(current):
+            return
+        self.best_model_score = current
+
+        with self._lock:
+            if self._best_buffer is not None:
+                self._release(self._best_buffer)
+            index = self._buffer_uses.index(0)
+            # used as the best and as a queued state
+            self._buffer_uses[index] = 2
+            self._best_buffer = index
+        buffers = self._buffers[index]
+        for key, tensor in pl_module.module.state_dict().items():
+            buffers[key].copy_(tensor, non_blocking=True)
+        event = None
+        if self._pin_memory:
+            event = torch.cuda.Event()
+            event.record()
+        pyro_param_store = deepcopy(pyro.get_param_store().get_state())
+        self._best_pyro_param_store = pyro_param_store
+
+        item = (index, event, pyro_param_store)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    dropped_index, _, _ = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                self.n_dropped_writes += 1
+                with self._lock:
+                    self._release(dropped_index)
+
+    def _release(self, index: int) -> None:
+        """Release one use of a buffer. Requires the lock."""
+        self._buffer_uses[index] -= 1
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            index, event, pyro_param_store = item
+            try:
+                if event is not None:
+                    event.synchronize()
+                if self._write_error is None:
+                    self._write(self._buffers[index], pyro_param_store)
+            except Exception as e:  # noqa: BLE001
+                self._write_error = e
+            finally:
+                with self._lock:
+                    self._release(index)
+
+    def _write(self, state_dict: dict[str, torch.Tensor], pyro_param_store: dict) -> None:
+        """Write a module state atomically, so that the last complete save is never lost."""
+        os.makedirs(self.dirpath, exist_ok=True)
+        model_save_path = os.path.join(self.dirpath, SAVE_KEYS.MODEL_FNAME)
+        model_state_dict = dict(state_dict)
+        model_state_dict["pyro_param_store"] = pyro_param_store
+        torch.save(
+            {SAVE_KEYS.MODEL_STATE_DICT_KEY: model_state_dict, **self._metadata},
+            model_save_path + ".tmp",
+        )
+        os.replace(model_save_path + ".tmp", model_save_path)
+        self.best_model_path = self.dirpath
+
+    def _stop_writer(self) -> None:
+        """Wait for the pending writes and stop the writer thread."""
+        if getattr(self, "_writer", None) is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def on_train_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule) -> None:
+        """Wait for the pending writes and load the best module state into the model."""
+        self._stop_writer()
+        if self._write_error is not None:
+            raise RuntimeError("Could not save the best module state.") from self._write_error
+        if self.load_best_on_end and self._best_buffer is not None:
+            pl_module.module.load_state_dict(self._buffers[self._best_buffer])
+            if self._best_pyro_param_store:
+                pyro.get_param_store().set_state(self._best_pyro_param_store)
+
+    def teardown(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        stage: str | None = None,
+    ) -> None:
+        """Stop the writer thread if training was interrupted and free the buffers."""
+        self._stop_writer()
+        self._buffers = None
+
+
 class SubSampleLabels(Callback):
     """Subsample labels."""
 
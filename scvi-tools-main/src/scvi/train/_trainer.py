@@ -10,6 +10,7 @@ from lightning.pytorch.loggers import Logger
 from scvi import settings
 
 from ._callbacks import (
+    AsyncCheckpoint,
     LoudEarlyStopping,
     SaveCheckpoint,
 )
@@ -137,6 +138,8 @@ class Trainer(pl.Trainer):
             # check if user provided already provided the callback
             enable_checkpointing = True
             check_val_every_n_epoch = 1
+        if any(isinstance(c, AsyncCheckpoint) for c in callbacks):
+            check_val_every_n_epoch = 1
 
         if learning_rate_monitor and not any(
             isinstance(c, LearningRateMonitor) for c in callbacks
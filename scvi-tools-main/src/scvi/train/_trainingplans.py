@@ -136,6 +136,12 @@ class TrainingPlan(pl.LightningModule):
         Minimum scaling factor on KL divergence during training.
     compile
         Whether to compile the model using torch.compile.
+    autocast_dtype
+        Data type of the forward passes of the module. One of ``"float32"`` or ``"bfloat16"``,
+        which runs them under :func:`torch.autocast` with ``bfloat16`` while likelihoods and KL
+        divergences are still computed in float32. Parameters and optimizer states are kept in
+        float32 in both cases. Unlike the ``precision`` of :class:`~scvi.train.Trainer`, this
+        leaves the data and the optimization in float32.
     **loss_kwargs
         Keyword args to pass to the loss method of the `module`.
         `kl_weight` should not be passed here and is handled automatically.
@@ -165,6 +171,7 @@ class TrainingPlan(pl.LightningModule):
         min_kl_weight: float = 0.0,
         compile: bool = False,
         compile_kwargs: dict | None = None,
+        autocast_dtype: Literal["float32", "bfloat16"] = "float32",
         **loss_kwargs,
     ):
         super().__init__()
@@ -189,6 +196,12 @@ class TrainingPlan(pl.LightningModule):
 
         if self.optimizer_name == "Custom" and self.optimizer_creator is None:
             raise ValueError("If optimizer is 'Custom', `optimizer_creator` must be provided.")
+        if autocast_dtype not in ("float32", "bfloat16"):
+            raise ValueError(
+                "`autocast_dtype` must be one of 'float32' or 'bfloat16', got "
+                f"{autocast_dtype!r}."
+            )
+        self.autocast_dtype = autocast_dtype
 
         self._n_obs_training = None
         self._n_obs_validation = None
@@ -289,13 +302,20 @@ class TrainingPlan(pl.LightningModule):
         self._n_obs_validation = n_obs
         self.initialize_val_metrics()
 
+    def autocast(self) -> torch.autocast:
+        """Autocast context of the forward passes, enabled if ``autocast_dtype="bfloat16"``."""
+        return torch.autocast(
+            self.device.type, dtype=torch.bfloat16, enabled=self.autocast_dtype == "bfloat16"
+        )
+
     def forward(self, *args, **kwargs):
         """Passthrough to the module's forward method."""
-        return self.module(
-            *args,
-            **kwargs,
-            get_inference_input_kwargs={"full_forward_pass": not self.update_only_decoder},
-        )
+        with self.autocast():
+            return self.module(
+                *args,
+                **kwargs,
+                get_inference_input_kwargs={"full_forward_pass": not self.update_only_decoder},
+            )
 
     @torch.inference_mode()
     def compute_and_log_metrics(
@@ -449,6 +469,263 @@ class TrainingPlan(pl.LightningModule):
         )
 
 
+def _per_member(value: float | Iterable[float], n_members: int, name: str) -> list[float]:
+    """Broadcast a hyperparameter to all members of an ensemble."""
+    if isinstance(value, int | float):
+        return [float(value)] * n_members
+    values = [float(v) for v in value]
+    if len(values) != n_members:
+        raise ValueError(f"`{name}` must have one value per member, got {len(values)}.")
+    return values
+
+
+class EnsembleTrainingPlan(TrainingPlan):
+    """``BETA`` Train several modules on the same minibatches.
+
+    Every training and validation step feeds the same minibatch to all members. Each member has
+    its own parameter group in the optimizer, and so its own optimizer state and learning rate,
+    and its own maximum KL weight. The metrics of member ``k`` are logged with the ``_k`` suffix,
+    e.g. ``elbo_validation_0``, and ``train_loss`` and ``validation_loss`` are summed over members.
+
+    Parameters
+    ----------
+    modules
+        Module instances from class ``BaseModuleClass``.
+    lr
+        Learning rate, or learning rates of the members, when `optimizer_creator` is None.
+    max_kl_weight
+        Maximum scaling factor on KL divergence, or maximum scaling factors of the members.
+    vectorize
+        Whether to evaluate all members at once with :func:`torch.func.vmap` over their stacked
+        parameters, which reduces the number of kernel launches on GPUs. Requires members with
+        identical architectures, including dropout rates. Members then share the random draws,
+        e.g. of latent samples and dropout masks, of each step.
+    **kwargs
+        Keyword args for :class:`~scvi.train.TrainingPlan`. ``reduce_lr_on_plateau`` and
+        ``compile`` are not supported.
+    """
+
+    def __init__(
+        self,
+        modules: Iterable[BaseModuleClass],
+        *,
+        lr: float | Iterable[float] = 1e-3,
+        max_kl_weight: float | Iterable[float] = 1.0,
+        vectorize: bool = False,
+        **kwargs,
+    ):
+        modules = list(modules)
+        if len(modules) == 0:
+            raise ValueError("`modules` must contain at least one module.")
+        if kwargs.get("reduce_lr_on_plateau", False) or kwargs.get("compile", False):
+            raise ValueError(
+                "`reduce_lr_on_plateau` and `compile` are not supported by EnsembleTrainingPlan."
+            )
+        if vectorize and any(str(module) != str(modules[0]) for module in modules[1:]):
+            raise ValueError(
+                "Members must have identical architectures to be vectorized. Use "
+                "`vectorize=False` for members with different architectures or dropout rates."
+            )
+        self.n_members = len(modules)
+        self.vectorize = vectorize
+        self.member_lrs = _per_member(lr, self.n_members, "lr")
+        self.member_max_kl_weights = _per_member(max_kl_weight, self.n_members, "max_kl_weight")
+        # the schedule is shared, the maximum KL weights are applied per member
+        super().__init__(
+            modules[0],
+            lr=self.member_lrs[0],
+            max_kl_weight=max(max(self.member_max_kl_weights), kwargs.get("min_kl_weight", 0.0)),
+            **kwargs,
+        )
+        # the first module only provides the signature of the loss
+        self.module = torch.nn.ModuleList(modules)
+
+    def _create_member_metrics(self, mode: str, n_total: int | None) -> list[dict]:
+        collections = []
+        for k in range(self.n_members):
+            *_, collection = self._create_elbo_metric_components(f"{mode}_{k}", n_total)
+            collection[f"elbo_{mode}_{k}"].reset()
+            collections.append(collection)
+        # registered as submodules, so that metrics are moved to the device of the module
+        setattr(
+            self,
+            f"_{mode}_metric_modules",
+            torch.nn.ModuleList([torch.nn.ModuleDict(c) for c in collections]),
+        )
+        return collections
+
+    def initialize_train_metrics(self):
+        """Initialize train related metrics of each member."""
+        self.train_metrics = self._create_member_metrics("train", self.n_obs_training)
+
+    def initialize_val_metrics(self):
+        """Initialize val related metrics of each member."""
+        self.val_metrics = self._create_member_metrics("validation", self.n_obs_validation)
+
+    @property
+    def kl_weight(self):
+        """Scaling factors on KL divergence of the members during training."""
+        max_kl_weights = torch.tensor(self.member_max_kl_weights, device=self.device)
+        progress = _compute_kl_weight(
+            self.current_epoch,
+            self.global_step,
+            self.n_epochs_kl_warmup,
+            self.n_steps_kl_warmup,
+        )
+        return self.min_kl_weight + (max_kl_weights - self.min_kl_weight) * progress
+
+    def forward(self, tensors: dict[str, torch.Tensor]) -> dict[str, torch.Tensor]:
+        """Losses and ELBO components of the members, stacked along the first dimension."""
+        full_forward_pass = not self.update_only_decoder
+        kwargs = {"get_inference_input_kwargs": {"full_forward_pass": full_forward_pass}}
+        kl_weights = self.loss_kwargs.get("kl_weight", [None] * self.n_members)
+        with self.autocast():
+            if self.vectorize:
+                return self._vectorized_forward(tensors, kwargs)
+            outputs = []
+            for member, kl_weight in zip(self.module, kl_weights, strict=True):
+                loss_kwargs = dict(self.loss_kwargs)
+                if kl_weight is not None:
+                    loss_kwargs["kl_weight"] = kl_weight
+                _, _, loss_output = member(tensors, loss_kwargs=loss_kwargs, **kwargs)
+                outputs.append(loss_output)
+        return {
+            "loss": torch.stack([output.loss for output in outputs]),
+            "reconstruction_loss": torch.stack(
+                [output.reconstruction_loss_sum for output in outputs]
+            ),
+            "kl_local": torch.stack([output.kl_local_sum for output in outputs]),
+            "kl_global": torch.stack(
+                [torch.as_tensor(output.kl_global_sum, device=self.device) for output in outputs]
+            ),
+            "n_obs_minibatch": outputs[0].n_obs_minibatch,
+        }
+
+    def _vectorized_forward(
+        self, tensors: dict[str, torch.Tensor], kwargs: dict
+    ) -> dict[str, torch.Tensor]:
+        """Evaluate all members at once on their stacked parameters and buffers."""
+        template = self.module[0]
+        # the sparse likelihood kernels use autograd functions that do not support vmap
+        tensors = {
+            key: value for key, value in tensors.items() if key != REGISTRY_KEYS.X_SPARSE_KEY
+        }
+        # stacking is differentiable, so gradients flow back to the parameters of each member
+        params = {
+            name: torch.stack([member.get_parameter(name) for member in self.module])
+            for name, _ in template.named_parameters()
+        }
+        buffers = {
+            name: torch.stack([member.get_buffer(name) for member in self.module])
+            for name, _ in template.named_buffers()
+        }
+        loss_kwargs = {key: value for key, value in self.loss_kwargs.items() if key != "kl_weight"}
+        use_kl_weight = "kl_weight" in self.loss_kwargs
+        kl_weights = self.loss_kwargs.get("kl_weight", torch.zeros(self.n_members))
+
+        def member_loss(member_params, member_buffers, kl_weight):
+            member_loss_kwargs = dict(loss_kwargs)
+            if use_kl_weight:
+                member_loss_kwargs["kl_weight"] = kl_weight
+            _, _, loss_output = torch.func.functional_call(
+                template,
+                (member_params, member_buffers),
+                (tensors,),
+                {"loss_kwargs": member_loss_kwargs, **kwargs},
+            )
+            return (
+                loss_output.loss,
+                loss_output.reconstruction_loss_sum,
+                loss_output.kl_local_sum,
+                torch.as_tensor(loss_output.kl_global_sum, device=loss_output.loss.device),
+            )
+
+        loss, reconstruction_loss, kl_local, kl_global = torch.func.vmap(
+            member_loss, randomness="same"
+        )(params, buffers, kl_weights.to(self.device))
+        if self.training:
+            # e.g. running statistics of batch normalization
+            with torch.no_grad():
+                for name, stacked in buffers.items():
+                    for member, buffer in zip(self.module, stacked, strict=True):
+                        member.get_buffer(name).copy_(buffer)
+        return {
+            "loss": loss,
+            "reconstruction_loss": reconstruction_loss,
+            "kl_local": kl_local,
+            "kl_global": kl_global,
+            "n_obs_minibatch": tensors[REGISTRY_KEYS.X_KEY].shape[0],
+        }
+
+    @torch.inference_mode()
+    def compute_and_log_metrics(
+        self,
+        outputs: dict[str, torch.Tensor],
+        metrics: list[dict[str, ElboMetric]],
+        mode: str,
+    ):
+        """Computes and logs the metrics of each member.
+
+        Parameters
+        ----------
+        outputs
+            Stacked losses and ELBO components of the members.
+        metrics
+            Dictionaries of metrics of each member to update
+        mode
+            Postfix string to add to the metric name of
+            extra metrics
+        """
+        n_obs_minibatch = outputs["n_obs_minibatch"]
+        for k, member_metrics in enumerate(metrics):
+            member_metrics[f"elbo_{mode}_{k}"].update(
+                reconstruction_loss=outputs["reconstruction_loss"][k],
+                kl_local=outputs["kl_local"][k],
+                kl_global=outputs["kl_global"][k],
+                n_obs_minibatch=n_obs_minibatch,
+            )
+            self.log_dict(
+                member_metrics,
+                on_step=False,
+                on_epoch=True,
+                batch_size=n_obs_minibatch,
+                sync_dist=self.use_sync_dist,
+            )
+
+    def _log_losses(self, losses: torch.Tensor, mode: str, **kwargs):
+        sync_dist = self.use_sync_dist
+        self.log(f"{mode}_loss", losses.sum(), on_epoch=True, sync_dist=sync_dist, **kwargs)
+        for k, loss in enumerate(losses):
+            self.log(f"{mode}_loss_{k}", loss, on_epoch=True, sync_dist=sync_dist)
+
+    def training_step(self, batch, batch_idx):
+        """Training step for the members."""
+        if "kl_weight" in self.loss_kwargs:
+            kl_weight = self.kl_weight
+            self.loss_kwargs.update({"kl_weight": kl_weight})
+            for k, member_kl_weight in enumerate(kl_weight):
+                self.log(f"kl_weight_{k}", member_kl_weight, on_step=True, on_epoch=False)
+        outputs = self.forward(batch)
+        self._log_losses(outputs["loss"], "train", prog_bar=True)
+        self.compute_and_log_metrics(outputs, self.train_metrics, "train")
+        # parameters of the members are disjoint, so each one receives its own gradient
+        return outputs["loss"].sum()
+
+    def validation_step(self, batch, batch_idx):
+        """Validation step for the members."""
+        outputs = self.forward(batch)
+        self._log_losses(outputs["loss"], "validation")
+        self.compute_and_log_metrics(outputs, self.val_metrics, "validation")
+
+    def configure_optimizers(self):
+        """Configure one parameter group per member, with the learning rate of the member."""
+        param_groups = [
+            {"params": [p for p in member.parameters() if p.requires_grad], "lr": lr}
+            for member, lr in zip(self.module, self.member_lrs, strict=True)
+        ]
+        return {"optimizer": self.get_optimizer_creator()(param_groups)}
+
+
 class AdversarialTrainingPlan(TrainingPlan):
     """Train vaes with adversarial loss option to encourage latent space mixing.
 
@@ -496,6 +773,8 @@ class AdversarialTrainingPlan(TrainingPlan):
         kl warmup.
     compile
         Whether to compile the model for faster training
+    autocast_dtype
+        Data type of the forward passes, see :class:`~scvi.train.TrainingPlan`.
     **loss_kwargs
         Keyword args to pass to the loss method of the `module`.
         `kl_weight` should not be passed here and is handled automatically.
@@ -523,6 +802,7 @@ class AdversarialTrainingPlan(TrainingPlan):
         scale_adversarial_loss: float | Literal["auto"] = "auto",
         compile: bool = False,
         compile_kwargs: dict | None = None,
+        autocast_dtype: Literal["float32", "bfloat16"] = "float32",
         **loss_kwargs,
     ):
         super().__init__(
@@ -541,6 +821,7 @@ class AdversarialTrainingPlan(TrainingPlan):
             lr_min=lr_min,
             compile=compile,
             compile_kwargs=compile_kwargs,
+            autocast_dtype=autocast_dtype,
             **loss_kwargs,
         )
         if adversarial_classifier is True:
@@ -606,7 +887,8 @@ class AdversarialTrainingPlan(TrainingPlan):
         loss = scvi_loss.loss
         # fool classifier if doing adversarial training
         if kappa > 0 and self.adversarial_classifier is not False:
-            fool_loss = self.loss_adversarial_classifier(z, batch_tensor, False)
+            with self.autocast():
+                fool_loss = self.loss_adversarial_classifier(z, batch_tensor, False)
             loss += fool_loss * kappa
 
         self.log("train_loss", loss, on_epoch=True, prog_bar=True)
@@ -618,7 +900,8 @@ class AdversarialTrainingPlan(TrainingPlan):
         # train adversarial classifier
         # this condition will not be met unless self.adversarial_classifier is not False
         if opt2 is not None:
-            loss = self.loss_adversarial_classifier(z.detach(), batch_tensor, True)
+            with self.autocast():
+                loss = self.loss_adversarial_classifier(z.detach(), batch_tensor, True)
             loss *= kappa
             opt2.zero_grad()
             self.manual_backward(loss)
@@ -738,6 +1021,7 @@ class SemiSupervisedTrainingPlan(TrainingPlan):
         ] = "elbo_validation",
         compile: bool = False,
         compile_kwargs: dict | None = None,
+        autocast_dtype: Literal["float32", "bfloat16"] = "float32",
         **loss_kwargs,
     ):
         super().__init__(
@@ -753,6 +1037,7 @@ class SemiSupervisedTrainingPlan(TrainingPlan):
             lr_scheduler_metric=lr_scheduler_metric,
             compile=compile,
             compile_kwargs=compile_kwargs,
+            autocast_dtype=autocast_dtype,
             **loss_kwargs,
         )
         self.loss_kwargs.update({"classification_ratio": classification_ratio})
@@ -8,6 +8,8 @@ from sparse import GCXS
 from xarray import Dataset
 
 from scvi.criticism import PosteriorPredictiveCheck as PPC
+from scvi.criticism._constants import DEFAULT_CALIBRATION_QUANTILES
+from scvi.criticism._streaming import OnlinePPCStatistics
 from scvi.data import synthetic_iid
 from scvi.model import SCVI
 
@@ -15,7 +17,9 @@ if TYPE_CHECKING:
     from anndata import AnnData
 
 
-def get_ppc_with_samples(adata: AnnData, n_samples: int = 2, indices: list[int] | None = None):
+def get_ppc_with_samples(
+    adata: AnnData, n_samples: int = 2, indices: list[int] | None = None, **kwargs
+):
     # create and train models
     SCVI.setup_anndata(
         adata,
@@ -34,7 +38,7 @@ def get_ppc_with_samples(adata: AnnData, n_samples: int = 2, indices: list[int]
     model2.train(1)
 
     models_dict = {"model1": model1, "model2": model2}
-    ppc = PPC(adata, models_dict, n_samples=n_samples, indices=indices)
+    ppc = PPC(adata, models_dict, n_samples=n_samples, indices=indices, **kwargs)
     return ppc, models_dict
 
 
@@ -107,3 +111,64 @@ def test_ppc_de(n_genes: int = 200):
 
     # Use a high thresh for simulated data
     ppc.differential_expression(de_groupby="labels", p_val_thresh=0.7)
+
+
+def test_online_ppc_statistics():
+    adata = synthetic_iid(n_genes=10)
+    ppc, _ = get_ppc_with_samples(adata, n_samples=4)
+    ppc.coefficient_of_variation("cells")
+    ppc.coefficient_of_variation("features")
+    ppc.zero_fraction()
+    ppc.calibration_error()
+
+    samples = ppc.samples_dataset.model1.data.todense()
+    raw = ppc.raw_counts.todense()
+    statistics = OnlinePPCStatistics(
+        adata.n_obs, adata.n_vars, n_samples=4, quantiles=DEFAULT_CALIBRATION_QUANTILES
+    )
+    raw_statistics = OnlinePPCStatistics(adata.n_obs, adata.n_vars)
+    for start in range(0, adata.n_obs, 150):
+        statistics.update(samples[start : start + 150], observed=raw[start : start + 150])
+        raw_statistics.update(raw[start : start + 150])
+
+    np.testing.assert_allclose(
+        statistics.coefficient_of_variation("cells"), ppc.metrics["cv_gene"]["model1"], rtol=1e-5
+    )
+    np.testing.assert_allclose(
+        statistics.coefficient_of_variation("features"),
+        ppc.metrics["cv_cell"]["model1"],
+        rtol=1e-5,
+    )
+    np.testing.assert_allclose(
+        np.nan_to_num(raw_statistics.coefficient_of_variation("cells")),
+        ppc.metrics["cv_gene"]["Raw"],
+    )
+    np.testing.assert_allclose(
+        statistics.nonzero_fraction(), ppc.metrics["zero_fraction"]["model1"]
+    )
+    np.testing.assert_allclose(
+        raw_statistics.nonzero_fraction(), ppc.metrics["zero_fraction"]["Raw"]
+    )
+    np.testing.assert_allclose(
+        statistics.calibration_error(), ppc.metrics["calibration"]["model1"]["features"]
+    )
+
+
+def test_ppc_streaming():
+    adata = synthetic_iid(n_genes=50)
+    ppc, _ = get_ppc_with_samples(adata, n_samples=4, streaming=True, chunk_size=150)
+    assert ppc.samples_dataset is None
+    assert ppc.stored_samples["model1"][0].shape == (adata.n_obs, 50)
+
+    ppc.coefficient_of_variation("cells")
+    ppc.coefficient_of_variation("features")
+    ppc.zero_fraction()
+    ppc.calibration_error()
+    for key, index in [
+        ("cv_gene", adata.var_names),
+        ("cv_cell", adata.obs_names),
+        ("zero_fraction", adata.var_names),
+    ]:
+        assert ppc.metrics[key].columns.tolist() == ["model1", "model2", "Raw"]
+        assert ppc.metrics[key].index.equals(index)
+    assert ppc.metrics["calibration"].columns.tolist() == ["model1", "model2"]
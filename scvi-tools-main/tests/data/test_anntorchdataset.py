@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import gc
 import os
+import pickle
 
 import anndata
 import numpy as np
@@ -171,3 +173,74 @@ def test_load_sparse_tensor_backed(save_path: str, n_genes: int = 50):
     assert isinstance(data[REGISTRY_KEYS.BATCH_KEY], np.ndarray)
     assert data[REGISTRY_KEYS.BATCH_KEY].dtype == np.int64
     assert data[REGISTRY_KEYS.BATCH_KEY].shape == (1, 1)
+
+
+@pytest.mark.parametrize("sparse_format", ["csr_matrix", "csc_matrix", None])
+def test_shared_memory(sparse_format: str | None):
+    adata = scvi.data.synthetic_iid(sparse_format=sparse_format)
+    manager = generic_setup_adata_manager(adata, batch_key="batch", labels_key="labels")
+    expected = manager.create_torch_dataset()[np.arange(0, 100, 3)]
+
+    dataset = manager.create_torch_dataset(shared_memory=True)
+    x = dataset.data[REGISTRY_KEYS.X_KEY]
+    x_data = x if sparse_format is None else x.data
+    assert x_data.dtype == np.float32
+    assert not x_data.flags.writeable
+    if sparse_format is not None:
+        assert x.format == adata.X.format
+    paths = [array.path for field in dataset._shared_data.values() for array in field.arrays]
+    assert all(os.path.exists(path) for path in paths)
+
+    # segments are published once per manager
+    other = manager.create_torch_dataset(indices=np.arange(10), shared_memory=True)
+    other_paths = [
+        array.path for field in other.dataset._shared_data.values() for array in field.arrays
+    ]
+    assert other_paths == paths
+
+    # workers receive the location of the segments instead of the data
+    state = pickle.dumps(dataset)
+    assert len(state) < adata.X.data.nbytes // 10
+    unpickled = pickle.loads(state)
+    assert unpickled.adata_manager is None
+    assert len(unpickled) == adata.n_obs
+    unpickled_x = unpickled.data[REGISTRY_KEYS.X_KEY]
+    unpickled_x_data = unpickled_x if sparse_format is None else unpickled_x.data
+    assert isinstance(unpickled_x_data, np.memmap)
+    for data in [dataset[np.arange(0, 100, 3)], unpickled[np.arange(0, 100, 3)]]:
+        for key, value in expected.items():
+            np.testing.assert_array_equal(data[key], value)
+            assert data[key].dtype == value.dtype
+
+    # segments are kept with the manager and republished if the data changes
+    del dataset, other, x, x_data
+    gc.collect()
+    assert all(os.path.exists(path) for path in paths)
+    manager.adata.obs["_scvi_batch"] = manager.adata.obs["_scvi_batch"].iloc[::-1].to_numpy()
+    batch_paths = [
+        array.path
+        for array in manager.create_torch_dataset(shared_memory=True)
+        ._shared_data[REGISTRY_KEYS.BATCH_KEY]
+        .arrays
+    ]
+    assert batch_paths[0] not in paths
+
+    # segments are removed with the manager that published them
+    del manager
+    gc.collect()
+    assert not any(os.path.exists(path) for path in paths)
+    # attached processes keep their mapping
+    np.testing.assert_array_equal(
+        unpickled[[0, 3]][REGISTRY_KEYS.X_KEY], expected[REGISTRY_KEYS.X_KEY][:2]
+    )
+
+
+def test_shared_memory_backed(save_path: str):
+    adata = scvi.data.synthetic_iid()
+    adata_path = os.path.join(save_path, "shared_memory_backed.h5ad")
+    adata.write_h5ad(adata_path)
+    adata = anndata.read_h5ad(adata_path, backed="r")
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+
+    with pytest.raises(ValueError):
+        _ = manager.create_torch_dataset(shared_memory=True)
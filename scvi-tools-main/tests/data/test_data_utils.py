@@ -1,9 +1,13 @@
+import os
+
+import anndata
 import numpy as np
 import pytest
 import torch
+from scipy.sparse import csr_matrix
 
 import scvi
-from scvi.data._utils import scipy_to_torch_sparse
+from scvi.data._utils import csr_gather_rows, scipy_to_torch_sparse
 
 
 @pytest.mark.parametrize("sparse_format", ["csr_matrix", "csc_matrix", None])
@@ -30,3 +34,32 @@ def test_scipy_to_torch_sparse(sparse_format: str):
         torch_sparse.to_dense().numpy(),
         scipy_sparse.toarray(),
     )
+
+
+@pytest.mark.parametrize("as_sparse_tensor", [True, False])
+@pytest.mark.parametrize("backed", [True, False])
+def test_csr_gather_rows(save_path: str, as_sparse_tensor: bool, backed: bool):
+    adata = scvi.data.synthetic_iid(sparse_format="csr_matrix")
+    X = adata.X.toarray()
+    if backed:
+        adata_path = os.path.join(save_path, f"adata_csr_gather_{as_sparse_tensor}.h5ad")
+        adata.write(adata_path)
+        adata = anndata.read_h5ad(adata_path, backed="r")
+
+    rows_list = [np.array([3, 4, 5, 10, 11, 40, 40, 41]), np.array([], dtype=int)]
+    if not backed:
+        rows_list.append(np.array([40, 3, 11, 3]))
+    for rows in rows_list:
+        gathered = csr_gather_rows(adata.X, rows, as_sparse_tensor=as_sparse_tensor)
+        if as_sparse_tensor:
+            assert isinstance(gathered, torch.Tensor)
+            assert gathered.layout is torch.sparse_csr
+            gathered = gathered.to_dense().numpy()
+        assert gathered.dtype == np.float32
+        np.testing.assert_array_equal(gathered, X[rows])
+
+
+def test_csr_gather_rows_duplicate_entries():
+    x = csr_matrix((np.array([1.0, 2.0, 3.0]), np.array([1, 1, 0]), np.array([0, 2, 3])))
+    x.has_canonical_format = False
+    np.testing.assert_array_equal(csr_gather_rows(x, [1, 0]), x.toarray()[[1, 0]])
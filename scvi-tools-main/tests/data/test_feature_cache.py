@@ -0,0 +1,117 @@
+import os
+import pickle
+
+import h5py
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+import scvi
+from scvi import REGISTRY_KEYS
+from scvi.data import FeatureCache
+
+from .utils import generic_setup_adata_manager
+
+
+@pytest.mark.parametrize("sparse_format", ["csr_matrix", "csc_matrix", None])
+def test_feature_cache(save_path: str, sparse_format: str | None):
+    adata = scvi.data.synthetic_iid(sparse_format=sparse_format)
+    manager = generic_setup_adata_manager(adata, batch_key="batch", labels_key="labels")
+    expected = manager.create_torch_dataset()[np.arange(0, 100, 3)]
+
+    cache_dir = os.path.join(save_path, f"feature_cache_{sparse_format}")
+    cache = manager.compile_feature_cache(cache_dir=cache_dir)
+    assert isinstance(cache, FeatureCache)
+    assert manager.feature_cache is cache
+    assert cache.is_valid(manager)
+
+    x = cache[REGISTRY_KEYS.X_KEY]
+    assert x.dtype == np.float32
+    assert cache[REGISTRY_KEYS.BATCH_KEY].dtype == np.int64
+    if sparse_format is None:
+        assert isinstance(x, np.memmap)
+    else:
+        assert isinstance(x, csr_matrix)
+        assert not x.data.flags.writeable
+
+    dataset = manager.create_torch_dataset()
+    assert dataset.data[REGISTRY_KEYS.X_KEY] is x
+    data = dataset[np.arange(0, 100, 3)]
+    for key, value in expected.items():
+        np.testing.assert_array_equal(data[key], value)
+        assert data[key].dtype == value.dtype
+
+    # the dataset reopens memory maps after pickling
+    unpickled = pickle.loads(pickle.dumps(dataset))
+    np.testing.assert_array_equal(
+        unpickled[[0, 1]][REGISTRY_KEYS.X_KEY], dataset[[0, 1]][REGISTRY_KEYS.X_KEY]
+    )
+
+
+def test_feature_cache_reuse_and_invalidation(save_path: str):
+    adata = scvi.data.synthetic_iid()
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+    cache_dir = os.path.join(save_path, "feature_cache_invalidation")
+    cache = manager.compile_feature_cache(cache_dir=cache_dir)
+
+    # a new manager with the same setup reuses the cache
+    other_manager = generic_setup_adata_manager(adata, batch_key="batch")
+    other_cache = other_manager.compile_feature_cache(cache_dir=cache_dir)
+    assert other_cache.path == cache.path
+    assert len(os.listdir(cache_dir)) == 1
+
+    # a different registry is written to a different cache
+    labels_manager = generic_setup_adata_manager(adata, batch_key="batch", labels_key="labels")
+    assert not cache.is_valid(labels_manager)
+    labels_cache = labels_manager.compile_feature_cache(cache_dir=cache_dir)
+    assert labels_cache.path != cache.path
+
+    # modified data invalidates the cache and is read from the AnnData object
+    adata.X[0, 0] += 1
+    assert not cache.is_valid(manager)
+    with pytest.warns(UserWarning, match="feature cache"):
+        data = manager.create_torch_dataset()[[0]]
+    assert data[REGISTRY_KEYS.X_KEY][0, 0] == adata.X[0, 0]
+
+    cache = manager.compile_feature_cache(cache_dir=cache_dir)
+    assert cache.is_valid(manager)
+    assert cache[REGISTRY_KEYS.X_KEY][0, 0] == adata.X[0, 0]
+
+
+@pytest.mark.parametrize("sparse_format", ["csr_matrix", None])
+def test_feature_cache_backed(save_path: str, sparse_format: str | None):
+    adata = scvi.data.synthetic_iid(sparse_format=sparse_format)
+    path = os.path.join(save_path, f"feature_cache_backed_{sparse_format}.h5ad")
+    adata.write_h5ad(path)
+    adata = scvi.data.read_h5ad(path, backed="r")
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+
+    cache = manager.compile_feature_cache(
+        cache_dir=os.path.join(save_path, f"feature_cache_backed_{sparse_format}"),
+        chunk_size=33,
+    )
+    x = adata.X[...] if sparse_format is None else adata.X.to_memory().toarray()
+    x_cache = cache[REGISTRY_KEYS.X_KEY]
+    np.testing.assert_array_equal(x_cache if sparse_format is None else x_cache.toarray(), x)
+    assert cache.is_valid(manager)
+
+    # values edited in place anywhere in the file invalidate the cache
+    adata.file.close()
+    with h5py.File(path, "r+") as f:
+        if sparse_format is None:
+            f["X"][adata.n_obs // 2, 1] += 1
+        else:
+            f["X/data"][f["X/data"].shape[0] // 2] += 1
+    adata.file.open()
+    assert not cache.is_valid(manager)
+
+
+def test_feature_cache_train(save_path: str):
+    adata = scvi.data.synthetic_iid()
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    model = scvi.model.SCVI(adata)
+    model.adata_manager.compile_feature_cache(
+        cache_dir=os.path.join(save_path, "feature_cache_train")
+    )
+    model.train(max_epochs=1)
+    model.get_latent_representation()
@@ -0,0 +1,96 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, vstack
+
+import scvi
+from scvi.data import ShardedCSRDataset, read_h5ad_shards
+from scvi.dataloaders import AnnDataLoader
+
+from .utils import generic_setup_adata_manager
+
+
+def _write_shards(save_path: str, prefix: str, n_shards: int = 3, sparse_format="csr_matrix"):
+    paths, shards = [], []
+    for i in range(n_shards):
+        adata = scvi.data.synthetic_iid(batch_size=20 + 10 * i, sparse_format=sparse_format)
+        path = os.path.join(save_path, f"{prefix}_shard_{i}.h5ad")
+        adata.write_h5ad(path)
+        paths.append(path)
+        shards.append(adata)
+    return paths, shards
+
+
+@pytest.mark.parametrize("sparse_format", ["csr_matrix", None])
+def test_read_h5ad_shards(save_path: str, sparse_format: str | None):
+    prefix = f"read_{sparse_format}"
+    paths, shards = _write_shards(save_path, prefix, sparse_format=sparse_format)
+    adata = read_h5ad_shards(paths, label="shard", max_open_files=1)
+    expected = vstack([csr_matrix(shard.X) for shard in shards], format="csr")
+
+    assert isinstance(adata.X, ShardedCSRDataset)
+    assert adata.shape == expected.shape
+    assert adata.obs_names.is_unique
+    assert adata.obs["shard"].cat.categories.tolist() == [0, 1, 2]
+
+    indexes = np.random.default_rng(0).choice(adata.n_obs, size=50)
+    np.testing.assert_array_equal(adata.X[indexes].toarray(), expected[indexes].toarray())
+    np.testing.assert_array_equal(adata.X[-5:].toarray(), expected[-5:].toarray())
+    np.testing.assert_array_equal(
+        adata.X[indexes, :10].toarray(), expected[indexes][:, :10].toarray()
+    )
+    assert len(adata.X._handles) == 1
+
+    np.testing.assert_array_equal(adata[indexes].X.toarray(), expected[indexes].toarray())
+    np.testing.assert_array_equal(adata.X.to_memory().toarray(), expected.toarray())
+    adata.X.close()
+
+
+def test_read_h5ad_shards_var_mismatch(save_path: str):
+    paths, shards = _write_shards(save_path, "mismatch", n_shards=2)
+    shards[1].var_names = [f"other_{i}" for i in range(shards[1].n_vars)]
+    shards[1].write_h5ad(paths[1])
+
+    with pytest.raises(ValueError):
+        _ = read_h5ad_shards(paths)
+
+
+def test_sharded_csr_dataset_pickle(save_path: str):
+    paths, _ = _write_shards(save_path, "pickle")
+    adata = read_h5ad_shards(paths)
+    _ = adata.X[[0, 100]]
+    assert len(adata.X._handles) == 2
+
+    unpickled = pickle.loads(pickle.dumps(adata.X))
+    assert len(unpickled._handles) == 0
+    np.testing.assert_array_equal(unpickled[[0, 100]].toarray(), adata.X[[0, 100]].toarray())
+    adata.X.close()
+
+
+def test_sharded_anndataloader(save_path: str):
+    paths, _ = _write_shards(save_path, "loader")
+    adata = read_h5ad_shards(paths)
+    manager = generic_setup_adata_manager(adata, batch_key="batch", labels_key="labels")
+
+    n_obs = 0
+    for batch in AnnDataLoader(manager, batch_size=32, shuffle=True, num_workers=1):
+        n_obs += batch["X"].shape[0]
+    assert n_obs == adata.n_obs
+
+
+def test_sharded_train(save_path: str):
+    paths, _ = _write_shards(save_path, "train")
+    adata = read_h5ad_shards(paths)
+
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch", labels_key="labels")
+    model = scvi.model.SCVI(adata)
+    model.train(max_epochs=1)
+    assert model.get_latent_representation().shape == (adata.n_obs, model.module.n_latent)
+
+    scvi.model.SCANVI.setup_anndata(
+        adata, batch_key="batch", labels_key="labels", unlabeled_category="label_0"
+    )
+    model = scvi.model.SCANVI(adata)
+    model.train(max_epochs=1)
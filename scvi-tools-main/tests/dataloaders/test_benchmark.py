@@ -0,0 +1,65 @@
+import json
+import os
+import signal
+import sys
+
+import benchmarks.dataloaders
+import pytest
+from benchmarks.dataloaders import (
+    BenchmarkCase,
+    BenchmarkConfig,
+    compare,
+    default_cases,
+    main,
+    run_benchmarks,
+)
+
+
+def test_dataloader_benchmark():
+    config = BenchmarkConfig(n_obs=200, n_vars=50, n_epochs=1, num_workers=[0])
+    cases = [
+        BenchmarkCase("csr", load_sparse_tensor=True),
+        BenchmarkCase("csr", backed=True),
+        BenchmarkCase("dense", loader="DeviceBackedDataSplitter"),
+    ]
+    results = run_benchmarks(config, cases=cases, isolate=False)
+
+    assert results["config"]["n_obs"] == 200
+    assert [result["name"] for result in results["results"]] == [case.name for case in cases]
+    for result in results["results"]:
+        assert result["n_cells"] == 200
+        assert result["cells_per_sec"] > 0
+        assert result["peak_rss_mb"] > 0
+
+    assert compare(results, results) == []
+    slower = json.loads(json.dumps(results))
+    slower["results"][0]["cells_per_sec"] /= 2
+    assert len(compare(results, slower, tolerance=0.2)) == 1
+
+    names = [case.name for case in default_cases(BenchmarkConfig(num_workers=[0, 2]))]
+    assert len(names) == len(set(names))
+
+
+def test_dataloader_benchmark_main(save_path: str):
+    output = os.path.join(save_path, "dataloader_benchmarks.json")
+    args = ["--n-obs", "100", "--n-vars", "20", "--n-epochs", "1", "--num-workers", "0"]
+    assert main([*args, "--no-isolate", "--output", output]) == 0
+    with open(output) as f:
+        assert len(json.load(f)["results"]) == len(default_cases(BenchmarkConfig(num_workers=[0])))
+    # throughput varies between runs, so only check that the comparison runs
+    assert main([*args, "--no-isolate", "--output", output, "--baseline", output]) in (0, 1)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="cases are forked on Linux only")
+def test_dataloader_benchmark_killed_case(monkeypatch):
+    # cases killed without posting a result are reported instead of blocking the suite
+    monkeypatch.setattr(
+        benchmarks.dataloaders, "run_case", lambda *args: os.kill(os.getpid(), signal.SIGKILL)
+    )
+    config = BenchmarkConfig(n_obs=100, n_vars=20, n_epochs=1, num_workers=[0])
+    cases = [BenchmarkCase("csr"), BenchmarkCase("dense")]
+    results = run_benchmarks(config, cases=cases, isolate=True)
+
+    assert [result["name"] for result in results["results"]] == [case.name for case in cases]
+    for result in results["results"]:
+        assert result["error"] == f"exit code {-signal.SIGKILL}"
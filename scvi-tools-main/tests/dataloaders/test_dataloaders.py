@@ -1,5 +1,7 @@
 import os
+from itertools import islice
 
+import anndata
 import numpy as np
 import pytest
 import torch
@@ -82,6 +84,42 @@ def test_semisuperviseddataloader_subsampling(
     scvi.model.SCANVI._training_plan_cls = original_training_plan_cls
 
 
+def test_semisuperviseddataloader_resample_labels():
+    adata = scvi.data.synthetic_iid(n_labels=4)
+    adata.obs["indices"] = np.arange(adata.n_obs)
+    SCANVI.setup_anndata(
+        adata, batch_key="indices", labels_key="labels", unlabeled_category="label_0"
+    )
+    dl = scvi.dataloaders.SemiSupervisedDataLoader(
+        SCANVI(adata).adata_manager,
+        n_samples_per_label=5,
+        shuffle=True,
+        batch_size=8,
+        num_workers=1,
+        persistent_workers=True,
+    )
+    labelled_dl = dl.dataloaders[1]
+
+    epoch_indices = []
+    for _ in range(2):
+        dl.resample_labels()
+        indices = np.concatenate(
+            [
+                labelled[REGISTRY_KEYS.BATCH_KEY].numpy().ravel()
+                for _, labelled in islice(dl, len(dl))
+            ]
+        )
+        _, counts = np.unique(
+            adata.obs["labels"].to_numpy()[np.unique(indices)], return_counts=True
+        )
+        np.testing.assert_array_equal(counts, [5, 5, 5])
+        epoch_indices.append(np.unique(indices))
+
+    # the labelled data loader and its workers are reused across epochs
+    assert dl.dataloaders[1] is labelled_dl
+    assert not np.array_equal(epoch_indices[0], epoch_indices[1])
+
+
 def test_anndataloader_distributed_sampler_init():
     adata = scvi.data.synthetic_iid()
     manager = generic_setup_adata_manager(adata)
@@ -94,6 +132,124 @@ def test_anndataloader_distributed_sampler_init():
         )
 
 
+@pytest.mark.parametrize("sparse_format", [None, "csr_matrix"])
+def test_anndataloader_chunk_size_backed(save_path: str, sparse_format: str | None):
+    adata = scvi.data.synthetic_iid(sparse_format=sparse_format)
+    adata_path = os.path.join(save_path, f"adata_chunked_{sparse_format}.h5ad")
+    adata.write(adata_path)
+    X = adata.X.toarray() if sparse_format is not None else adata.X
+
+    adata = anndata.read_h5ad(adata_path, backed="r")
+    adata.obs["indices"] = np.arange(adata.n_obs)
+    manager = generic_setup_adata_manager(adata, batch_key="indices")
+    indices = np.random.default_rng(0).permutation(adata.n_obs)[:300]
+
+    dl = scvi.dataloaders.AnnDataLoader(
+        manager,
+        indices=indices,
+        batch_size=32,
+        shuffle=True,
+        chunk_size=50,
+        chunks_per_buffer=2,
+        iter_ndarray=True,
+    )
+    seen = []
+    for batch in dl:
+        obs_indices = batch[REGISTRY_KEYS.BATCH_KEY].ravel()
+        np.testing.assert_array_equal(batch[REGISTRY_KEYS.X_KEY], X[obs_indices])
+        seen.append(obs_indices)
+    np.testing.assert_array_equal(np.sort(np.concatenate(seen)), np.sort(indices))
+
+    with pytest.raises(ValueError):
+        _ = scvi.dataloaders.AnnDataLoader(manager, chunk_size=50, distributed_sampler=True)
+
+
+def test_scvi_train_chunk_size_backed(save_path: str):
+    adata = scvi.data.synthetic_iid(sparse_format="csr_matrix")
+    adata_path = os.path.join(save_path, "adata_chunked_train.h5ad")
+    adata.write(adata_path)
+
+    adata = anndata.read_h5ad(adata_path, backed="r")
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    model = scvi.model.SCVI(adata)
+    model.train(max_epochs=1, datasplitter_kwargs={"chunk_size": 64, "chunks_per_buffer": 2})
+
+
+@pytest.mark.parametrize("load_sparse_tensor", [True, False])
+def test_anndataloader_prefetch(load_sparse_tensor: bool):
+    adata = scvi.data.synthetic_iid(sparse_format="csr_matrix")
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+
+    dl = scvi.dataloaders.AnnDataLoader(manager, batch_size=32)
+    prefetch_dl = scvi.dataloaders.AnnDataLoader(
+        manager, batch_size=32, load_sparse_tensor=load_sparse_tensor, prefetch_depth=2
+    )
+    for _ in range(2):
+        for batch, prefetch_batch in zip(dl, prefetch_dl, strict=True):
+            assert prefetch_batch[REGISTRY_KEYS.X_KEY].layout is torch.strided
+            for key, value in batch.items():
+                torch.testing.assert_close(prefetch_batch[key], value)
+
+    statistics = prefetch_dl.prefetch_statistics
+    assert statistics.n_batches == 2 * len(prefetch_dl)
+    assert statistics.n_starved <= statistics.n_batches
+    assert statistics.starved_time >= 0
+
+    # stopping early must not leave the background thread blocked
+    iterator = iter(prefetch_dl)
+    next(iterator)
+    assert len(list(prefetch_dl)) == len(prefetch_dl)
+    assert not iterator._thread.is_alive()
+
+
+def test_scvi_train_prefetch():
+    adata = scvi.data.synthetic_iid()
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    model = scvi.model.SCVI(adata)
+    model.train(max_epochs=1, datasplitter_kwargs={"prefetch_depth": 2})
+    # None falls back to `scvi.settings.dl_prefetch_depth`
+    model.train(max_epochs=1, datasplitter_kwargs={"prefetch_depth": None})
+    assert model._make_data_loader(adata=adata, prefetch_depth=None).prefetch_depth == 0
+
+    latent = model.get_latent_representation()
+    scvi.settings.dl_prefetch_depth = 2
+    try:
+        np.testing.assert_allclose(model.get_latent_representation(), latent, rtol=1e-5)
+    finally:
+        scvi.settings.dl_prefetch_depth = 0
+
+
+@pytest.mark.parametrize("multiprocessing_context", ["fork", "spawn"])
+def test_anndataloader_shared_memory(multiprocessing_context: str):
+    adata = scvi.data.synthetic_iid(sparse_format="csr_matrix")
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+
+    dl = scvi.dataloaders.AnnDataLoader(manager, batch_size=32)
+    shared_dl = scvi.dataloaders.AnnDataLoader(
+        manager,
+        batch_size=32,
+        shared_memory=True,
+        num_workers=2,
+        multiprocessing_context=multiprocessing_context,
+    )
+    assert shared_dl.dataset.dataset.shared_memory
+    for batch, shared_batch in zip(dl, shared_dl, strict=True):
+        for key, value in batch.items():
+            torch.testing.assert_close(shared_batch[key], value)
+
+    # loaders of the same manager attach to the same segments
+    subset_dl = scvi.dataloaders.AnnDataLoader(
+        manager, indices=np.arange(50), shared_memory=True, num_workers=2
+    )
+    shared_data = shared_dl.dataset.dataset._shared_data
+    for key, value in subset_dl.dataset.dataset._shared_data.items():
+        assert value is shared_data[key]
+    # nothing is published without workers
+    assert not scvi.dataloaders.AnnDataLoader(
+        manager, shared_memory=True
+    ).dataset.dataset.shared_memory
+
+
 def multiprocessing_worker(
     rank: int,
     world_size: int,
@@ -166,3 +322,53 @@ def test_scanvi_with_distributed_sampler(num_processes: int, save_path: str):
     model.train(1, datasplitter_kwargs=datasplitter_kwargs)
 
     torch.distributed.destroy_process_group()
+
+
+def contiguous_shards_worker(rank: int, world_size: int, save_path: str):
+    torch.distributed.init_process_group(
+        "gloo",
+        init_method=f"file://{save_path}/dist_file_gloo",
+        rank=rank,
+        world_size=world_size,
+    )
+    adata = anndata.read_h5ad(os.path.join(save_path, "contiguous_shards.h5ad"), backed="r")
+    manager = generic_setup_adata_manager(adata)
+    dl = scvi.dataloaders.AnnDataLoader(
+        manager,
+        batch_size=32,
+        shuffle=True,
+        distributed_sampler=True,
+        contiguous_shards=True,
+        shuffle_buffer_size=64,
+    )
+    rows = [dl.indices[batch] for batch in dl.sampler]
+    for batch, batch_rows in zip(dl, rows, strict=True):
+        expected = adata.X[np.sort(batch_rows)].toarray()
+        np.testing.assert_array_equal(batch[REGISTRY_KEYS.X_KEY].numpy(), expected)
+    np.save(os.path.join(save_path, f"contiguous_shards_{rank}.npy"), np.concatenate(rows))
+
+    torch.distributed.destroy_process_group()
+
+
+def test_anndataloader_distributed_contiguous_shards(save_path: str, num_processes: int = 2):
+    adata = scvi.data.synthetic_iid(sparse_format="csr_matrix")
+    adata.write_h5ad(os.path.join(save_path, "contiguous_shards.h5ad"))
+    file_path = os.path.join(save_path, "dist_file_gloo")
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+    torch.multiprocessing.spawn(
+        contiguous_shards_worker,
+        args=(num_processes, save_path),
+        nprocs=num_processes,
+        join=True,
+    )
+
+    shards = [
+        np.load(os.path.join(save_path, f"contiguous_shards_{rank}.npy"))
+        for rank in range(num_processes)
+    ]
+    n_obs_per_replica = adata.n_obs // num_processes
+    for rank, shard in enumerate(shards):
+        start = rank * n_obs_per_replica
+        np.testing.assert_array_equal(np.sort(shard), np.arange(start, start + n_obs_per_replica))
@@ -4,10 +4,15 @@ from math import ceil, floor
 
 import numpy as np
 import pytest
+import torch
+from scipy.sparse import csr_matrix
 from sparse_utils import TestSparseModel
 from tests.data.utils import generic_setup_adata_manager
+from torch.utils.data import BatchSampler
 
 import scvi
+from scvi import REGISTRY_KEYS
+from scvi.dataloaders._data_splitting import _DeviceBatchSampler
 
 
 class TestDataSplitters:
@@ -206,3 +211,84 @@ def test_datasplitter_load_sparse_tensor(
         devices=devices,
         expected_sparse_layout=sparse_format.split("_")[0],
     )
+
+
+@pytest.mark.parametrize("sparse_format", ["csr_matrix", "csc_matrix", None])
+def test_device_backed_datasplitter_sparse(sparse_format: str | None):
+    adata = scvi.data.synthetic_iid(sparse_format=sparse_format)
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+    splitter = scvi.dataloaders.DeviceBackedDataSplitter(
+        manager, accelerator="cpu", batch_size=32, shuffle=True, load_sparse_tensor=True
+    )
+    splitter.setup()
+    assert splitter.device_backed
+    x = splitter.train_tensor_dict[REGISTRY_KEYS.X_KEY]
+    expected_layout = torch.strided if sparse_format is None else torch.sparse_csr
+    assert x.layout is expected_layout
+
+    dense_x = np.asarray(adata.X.toarray() if sparse_format is not None else adata.X)
+    train_dl = splitter.train_dataloader()
+    assert len(train_dl) == ceil(len(splitter.train_idx) / 32)
+    # dense data keeps the minibatch order of the host samplers
+    expected_sampler = BatchSampler if sparse_format is None else _DeviceBatchSampler
+    assert isinstance(train_dl.sampler, expected_sampler)
+    seen = []
+    for batch in train_dl:
+        assert batch[REGISTRY_KEYS.X_KEY].layout is torch.strided
+        seen.append(batch[REGISTRY_KEYS.X_KEY].numpy())
+    seen = np.concatenate(seen)
+    np.testing.assert_array_equal(
+        np.sort(seen, axis=0), np.sort(dense_x[splitter.train_idx], axis=0)
+    )
+
+
+def test_device_backed_datasplitter_memory_budget():
+    adata = scvi.data.synthetic_iid()
+    x = adata.X.copy()
+    x[:, 5:] = 0
+    adata.X = csr_matrix(x)
+    manager = generic_setup_adata_manager(adata, batch_key="batch")
+
+    dense = scvi.dataloaders.DeviceBackedDataSplitter(manager, accelerator="cpu")
+    sparse = scvi.dataloaders.DeviceBackedDataSplitter(
+        manager, accelerator="cpu", load_sparse_tensor=True
+    )
+    assert sparse.expected_device_memory() < dense.expected_device_memory()
+
+    splitter = scvi.dataloaders.DeviceBackedDataSplitter(
+        manager,
+        accelerator="cpu",
+        batch_size=32,
+        load_sparse_tensor=True,
+        max_device_memory=sparse.expected_device_memory() // 2,
+    )
+    with pytest.warns(UserWarning, match="max_device_memory"):
+        splitter.setup()
+    assert not splitter.device_backed
+    train_dl = splitter.train_dataloader()
+    assert isinstance(train_dl, scvi.dataloaders.AnnDataLoader)
+    batch = next(iter(train_dl))
+    assert batch[REGISTRY_KEYS.X_KEY].shape[0] == 32
+
+
+def test_device_backed_datasplitter_train():
+    adata = scvi.data.synthetic_iid(sparse_format="csr_matrix")
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    model = scvi.model.SCVI(adata)
+    splitter = scvi.dataloaders.DeviceBackedDataSplitter(
+        model.adata_manager,
+        accelerator="cpu",
+        batch_size=64,
+        shuffle=True,
+        load_sparse_tensor=True,
+    )
+    training_plan = scvi.train.TrainingPlan(model.module)
+    runner = scvi.train.TrainRunner(
+        model,
+        training_plan=training_plan,
+        data_splitter=splitter,
+        max_epochs=1,
+        accelerator="cpu",
+    )
+    runner()
+    assert model.is_trained
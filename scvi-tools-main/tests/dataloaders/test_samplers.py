@@ -3,9 +3,14 @@ from math import ceil, floor
 import numpy as np
 import pytest
 from tests.data.utils import generic_setup_adata_manager
+from torch.utils.data import DistributedSampler
 
 import scvi
-from scvi.dataloaders import BatchDistributedSampler
+from scvi.dataloaders import (
+    BatchDistributedSampler,
+    ChunkedBatchSampler,
+    StratifiedBatchSampler,
+)
 
 
 def test_batchdistributedsampler_init(
@@ -145,3 +150,130 @@ def test_batchdistributedsampler_indices(
     # check that all indices are covered
     covered_indices = np.concatenate([np.array(list(indices)) for indices in sampler_indices])
     assert len(covered_indices) == len(dataset)
+
+
+@pytest.mark.parametrize("shuffle", [True, False])
+@pytest.mark.parametrize("drop_dataset_tail", [True, False])
+def test_batchdistributedsampler_matches_distributedsampler(
+    shuffle: bool, drop_dataset_tail: bool, num_replicas: int = 3
+):
+    adata = scvi.data.synthetic_iid()
+    manager = generic_setup_adata_manager(adata)
+    dataset = manager.create_torch_dataset()
+
+    for rank in range(num_replicas):
+        kwargs = {"num_replicas": num_replicas, "rank": rank, "shuffle": shuffle, "seed": 1}
+        sampler = BatchDistributedSampler(
+            dataset, batch_size=16, drop_dataset_tail=drop_dataset_tail, **kwargs
+        )
+        reference = DistributedSampler(dataset, drop_last=drop_dataset_tail, **kwargs)
+        for epoch in range(2):
+            sampler.set_epoch(epoch)
+            reference.set_epoch(epoch)
+            np.testing.assert_array_equal(np.concatenate(list(sampler)), list(reference))
+
+
+@pytest.mark.parametrize("shuffle", [True, False])
+@pytest.mark.parametrize("shuffle_buffer_size", [None, 20])
+def test_batchdistributedsampler_contiguous_shards(
+    shuffle: bool, shuffle_buffer_size: int | None, num_replicas: int = 3
+):
+    adata = scvi.data.synthetic_iid()
+    manager = generic_setup_adata_manager(adata)
+    indices = np.random.default_rng(0).permutation(adata.n_obs)[:300]
+    dataset = manager.create_torch_dataset(indices=indices)
+
+    shards = []
+    for rank in range(num_replicas):
+        sampler = BatchDistributedSampler(
+            dataset,
+            num_replicas=num_replicas,
+            rank=rank,
+            batch_size=16,
+            shuffle=shuffle,
+            contiguous_shards=True,
+            shuffle_buffer_size=shuffle_buffer_size,
+        )
+        rows = indices[np.concatenate(list(sampler))]
+        shards.append(np.sort(rows))
+        if not shuffle:
+            np.testing.assert_array_equal(rows, np.sort(rows))
+        elif shuffle_buffer_size is not None:
+            # observations only move within windows of consecutive rows of the shard
+            windows = np.searchsorted(np.sort(rows), rows) // shuffle_buffer_size
+            assert all(len(np.unique(w)) == 1 for w in np.split(windows, 100 // 20))
+
+    # each replica reads a contiguous block of the sorted rows
+    np.testing.assert_array_equal(np.concatenate(shards), np.sort(indices))
+
+
+@pytest.mark.parametrize("shuffle", [True, False])
+@pytest.mark.parametrize("drop_last", [True, False])
+def test_chunkedbatchsampler(
+    shuffle: bool,
+    drop_last: bool,
+    batch_size: int = 32,
+    chunk_size: int = 50,
+    chunks_per_buffer: int = 2,
+):
+    rng = np.random.default_rng(0)
+    indices = rng.permutation(1000)[:700]
+    sampler = ChunkedBatchSampler(
+        indices,
+        batch_size=batch_size,
+        chunk_size=chunk_size,
+        chunks_per_buffer=chunks_per_buffer,
+        shuffle=shuffle,
+        drop_last=drop_last,
+    )
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sampler.buffer_size == (chunk_size * chunks_per_buffer if shuffle else 1)
+
+    positions = np.concatenate(batches)
+    if drop_last:
+        assert all(len(batch) == batch_size for batch in batches)
+        assert len(np.unique(positions)) == floor(len(indices) / batch_size) * batch_size
+    else:
+        np.testing.assert_array_equal(np.sort(positions), np.arange(len(indices)))
+
+    if not shuffle:
+        np.testing.assert_array_equal(indices[positions], np.sort(indices)[: len(positions)])
+
+    # a minibatch spans at most the chunks of two consecutive buffers
+    for batch in batches:
+        assert len(np.unique(indices[batch] // chunk_size)) <= 2 * chunks_per_buffer
+
+
+def test_chunkedbatchsampler_seed():
+    indices = np.arange(1000)
+    batches = [
+        list(ChunkedBatchSampler(indices, chunk_size=100, shuffle=True, seed=0)) for _ in range(2)
+    ]
+    assert batches[0] == batches[1]
+
+    sampler = ChunkedBatchSampler(indices, chunk_size=100, shuffle=True, seed=0)
+    assert list(sampler) != list(sampler)
+
+
+@pytest.mark.parametrize("n_samples_per_label", [None, 5, 40])
+def test_stratifiedbatchsampler(n_samples_per_label: int | None):
+    labels = np.repeat(["a", "b", "c"], [10, 30, 60])
+    sampler = StratifiedBatchSampler(
+        labels, n_samples_per_label=n_samples_per_label, batch_size=16, shuffle=True
+    )
+
+    positions = np.concatenate(list(sampler))
+    assert len(list(sampler)) == len(sampler)
+    assert len(np.unique(positions)) == len(positions)
+    _, counts = np.unique(labels[positions], return_counts=True)
+    if n_samples_per_label is None:
+        np.testing.assert_array_equal(counts, [10, 30, 60])
+    else:
+        np.testing.assert_array_equal(counts, np.minimum([10, 30, 60], n_samples_per_label))
+
+    previous = sampler.positions
+    sampler.resample()
+    assert len(sampler.positions) == len(previous)
+    if n_samples_per_label == 5:
+        assert not np.array_equal(sampler.positions, previous)
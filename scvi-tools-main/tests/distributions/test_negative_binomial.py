@@ -1,8 +1,15 @@
 import pytest
 import torch
+from torch.distributions import Normal
 
 from scvi.distributions import NegativeBinomial, ZeroInflatedNegativeBinomial
-from scvi.distributions._negative_binomial import log_nb_positive, log_zinb_positive
+from scvi.distributions._negative_binomial import (
+    log_nb_positive,
+    log_nb_positive_sparse,
+    log_zinb_positive,
+    log_zinb_positive_sparse,
+)
+from scvi.distributions._utils import kl_divergence
 
 
 def test_zinb_distribution():
@@ -66,3 +73,67 @@ def test_zinb_distribution():
         dist1.log_prob(-x)
     with pytest.warns(UserWarning):
         dist2.log_prob(0.5 * x)
+
+
+def test_log_likelihoods_autocast():
+    torch.manual_seed(0)
+    mu = (10 * torch.rand(size=(8, 50))).bfloat16()
+    theta = (1 + torch.rand(size=(8, 50))).bfloat16()
+    pi = torch.randn(size=(8, 50)).bfloat16()
+    x = torch.randint_like(mu, high=20, dtype=torch.float32)
+
+    with torch.autocast("cpu", dtype=torch.bfloat16):
+        log_p_nb = log_nb_positive(x, mu, theta)
+        log_p_zinb = log_zinb_positive(x, mu, theta, pi)
+        qz = Normal(mu, theta)
+        kl_z = kl_divergence(qz, Normal(torch.zeros_like(mu), torch.ones_like(theta)))
+
+    # half precision inputs are upcast and the terms are computed in float32
+    assert log_p_nb.dtype == log_p_zinb.dtype == kl_z.dtype == torch.float32
+    torch.testing.assert_close(log_p_nb, log_nb_positive(x, mu.float(), theta.float()))
+    torch.testing.assert_close(
+        log_p_zinb, log_zinb_positive(x, mu.float(), theta.float(), pi.float())
+    )
+    torch.testing.assert_close(
+        kl_z,
+        torch.distributions.kl_divergence(
+            Normal(mu.float(), theta.float()), Normal(torch.zeros(8, 50), torch.ones(8, 50))
+        ),
+    )
+
+
+@pytest.mark.parametrize("layout", [torch.sparse_coo, torch.sparse_csr, torch.sparse_csc])
+@pytest.mark.parametrize("theta_shape", [(7,), (6, 7)])
+def test_sparse_log_likelihoods(layout, theta_shape):
+    torch.manual_seed(0)
+    x = torch.poisson(2 * torch.rand(6, 7, dtype=torch.float64)) * (torch.rand(6, 7) > 0.5)
+    x_sparse = x.to_sparse(layout=layout)
+    mu = (5 * torch.rand(6, 7, dtype=torch.float64) + 0.1).requires_grad_()
+    theta = (torch.rand(theta_shape, dtype=torch.float64) + 0.5).requires_grad_()
+    pi = torch.randn(6, 7, dtype=torch.float64).requires_grad_()
+
+    for dense, sparse, params in [
+        (log_nb_positive(x, mu, theta), log_nb_positive_sparse(x_sparse, mu, theta), [mu, theta]),
+        (
+            log_zinb_positive(x, mu, theta, pi),
+            log_zinb_positive_sparse(x_sparse, mu, theta, pi),
+            [mu, theta, pi],
+        ),
+    ]:
+        torch.testing.assert_close(sparse, dense)
+        grads = torch.autograd.grad(sparse.sum(), params)
+        for grad, grad_ref in zip(grads, torch.autograd.grad(dense.sum(), params), strict=True):
+            torch.testing.assert_close(grad, grad_ref)
+
+    assert torch.autograd.gradcheck(
+        lambda m, t: log_nb_positive_sparse(x_sparse, m, t), (mu, theta)
+    )
+    assert torch.autograd.gradcheck(
+        lambda m, t, p: log_zinb_positive_sparse(x_sparse, m, t, p), (mu, theta, pi)
+    )
+
+    # log_prob dispatches to the sparse kernels
+    nb = NegativeBinomial(mu=mu, theta=theta)
+    torch.testing.assert_close(nb.log_prob(x_sparse), nb.log_prob(x))
+    zinb = ZeroInflatedNegativeBinomial(mu=mu, theta=theta, zi_logits=pi)
+    torch.testing.assert_close(zinb.log_prob(x_sparse), zinb.log_prob(x))
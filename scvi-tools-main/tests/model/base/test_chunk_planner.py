@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+import torch
+
+from scvi import settings
+from scvi.data import synthetic_iid
+from scvi.model import SCVI, TOTALVI
+from scvi.model.base import _chunk_planner
+from scvi.model.base._chunk_planner import ChunkPlanner
+
+
+def test_chunk_planner_plan(monkeypatch):
+    monkeypatch.setattr(_chunk_planner, "_available_memory", lambda device: 2_000)
+    monkeypatch.setattr(settings, "inference_memory_fraction", 0.5)
+    # budget of 100 cell-samples
+    planner = ChunkPlanner(bytes_per_sample=10, max_batch_size=50)
+
+    assert planner.plan(n_samples=1) == (50, 1)
+    assert planner.plan(n_samples=10) == (50, 2)
+    assert planner.plan(n_samples=1_000) == (50, 2)
+    assert planner.plan(n_samples=10, batch_size=5) == (5, 10)
+    assert planner.plan(n_samples=25, samples_per_pass=25) == (4, 25)
+    assert planner.plan(n_samples=1_000, samples_per_pass=1_000) == (1, 1_000)
+
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata)
+    module = SCVI(adata, n_hidden=16, n_latent=4).module
+    small = ChunkPlanner.from_module(module, n_features=100)
+    large = ChunkPlanner.from_module(module, n_features=10)
+    assert small.bytes_per_sample > 0
+    assert large.bytes_per_sample < small.bytes_per_sample
+
+
+def test_chunk_planner_shrinks_on_out_of_memory(monkeypatch):
+    monkeypatch.setattr(_chunk_planner, "_available_memory", lambda device: 1_024)
+    monkeypatch.setattr(settings, "inference_memory_fraction", 0.5)
+    planner = ChunkPlanner(bytes_per_sample=1, max_batch_size=64)
+    assert planner.plan(n_samples=8) == (64, 8)
+    calls = []
+
+    def fn(tensors, samples_per_pass):
+        calls.append((len(tensors["x"]), samples_per_pass))
+        if len(tensors["x"]) * samples_per_pass > 40:
+            raise torch.OutOfMemoryError("CUDA out of memory.")
+        return tensors["x"] * 2
+
+    x = torch.arange(100)
+    outputs = planner.map(fn, {"x": x, "other": None})
+    assert torch.equal(torch.cat(outputs), x * 2)
+    assert calls[:5] == [(64, 8), (64, 4), (64, 2), (64, 1), (32, 1)]
+    assert (planner.batch_size, planner.samples_per_pass) == (32, 1)
+
+    def fail(tensors, samples_per_pass):
+        raise RuntimeError("unrelated")
+
+    with pytest.raises(RuntimeError, match="unrelated"):
+        planner.map(fail, {"x": x})
+
+    def out_of_memory(tensors, samples_per_pass):
+        raise torch.OutOfMemoryError("CUDA out of memory.")
+
+    planner.plan(n_samples=1, batch_size=8)
+    with pytest.raises(torch.OutOfMemoryError):
+        planner.map(out_of_memory, {"x": x})
+
+
+def test_chunk_planner_inference(monkeypatch):
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata)
+    model.train(1)
+
+    torch.manual_seed(0)
+    planned = model.get_normalized_expression(n_samples=3, return_mean=False)
+    torch.manual_seed(0)
+    manual = model.get_normalized_expression(
+        n_samples=3, return_mean=False, batch_size=settings.batch_size
+    )
+    np.testing.assert_allclose(planned, manual, rtol=1e-5)
+
+    # a tiny budget forces chunks of a few cells and samples
+    monkeypatch.setattr(_chunk_planner, "_available_memory", lambda device: 1)
+    assert model.get_marginal_ll(n_mc_samples=5, return_mean=False).shape == (adata.n_obs,)
+    assert np.isfinite(model.get_marginal_ll(n_mc_samples=5))
+    assert model.get_elbo(return_mean=False).shape == (adata.n_obs,)
+    assert model.get_normalized_expression(n_samples=2, return_mean=False).shape == (
+        2,
+        adata.n_obs,
+        adata.n_vars,
+    )
+
+
+@pytest.mark.parametrize("model_cls", [SCVI, TOTALVI])
+def test_chunk_planner_marginal_ll_mean(model_cls):
+    adata = synthetic_iid()
+    if model_cls is TOTALVI:
+        TOTALVI.setup_anndata(
+            adata,
+            batch_key="batch",
+            protein_expression_obsm_key="protein_expression",
+            protein_names_uns_key="protein_names",
+        )
+    else:
+        SCVI.setup_anndata(adata, batch_key="batch")
+    model = model_cls(adata)
+
+    # the mean is taken over cells rather than over minibatches
+    settings.seed = 0
+    marginal_ll = model.get_marginal_ll(n_mc_samples=3, return_mean=False)
+    settings.seed = 0
+    mean_marginal_ll = model.get_marginal_ll(n_mc_samples=3, return_mean=True)
+    assert marginal_ll.shape == (adata.n_obs,)
+    np.testing.assert_allclose(mean_marginal_ll, marginal_ll.mean().item(), rtol=1e-5)
+    # including when the last minibatch is smaller
+    settings.seed = 0
+    mean_marginal_ll = model.get_marginal_ll(n_mc_samples=3, batch_size=128)
+    np.testing.assert_allclose(mean_marginal_ll, marginal_ll.mean().item(), rtol=1e-5)
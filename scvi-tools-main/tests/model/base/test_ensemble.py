@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+
+import scvi
+from scvi.data import synthetic_iid
+from scvi.model import SCVI
+from scvi.model.base import ModelEnsemble
+
+
+@pytest.mark.parametrize("vectorize", [False, True])
+def test_model_ensemble_matches_single_training(vectorize: bool):
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    train_kwargs = {"max_epochs": 2, "check_val_every_n_epoch": 1}
+
+    scvi.settings.seed = 0
+    model = SCVI(adata)
+    model.train(plan_kwargs={"max_kl_weight": 0.5}, **train_kwargs)
+    scvi.settings.seed = 0
+    member = SCVI(adata)
+    ModelEnsemble([member]).train(max_kl_weight=0.5, vectorize=vectorize, **train_kwargs)
+
+    state_dict = model.module.state_dict()
+    for key, value in member.module.state_dict().items():
+        torch.testing.assert_close(value, state_dict[key], rtol=1e-5, atol=1e-6)
+    assert member.history.keys() == model.history.keys()
+    np.testing.assert_allclose(
+        member.history["elbo_validation"].to_numpy(dtype=float),
+        model.history["elbo_validation"].to_numpy(dtype=float),
+        rtol=1e-5,
+    )
+
+
+@pytest.mark.parametrize("vectorize", [False, True])
+def test_model_ensemble(save_path: str, vectorize: bool):
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    models = []
+    for seed in range(3):
+        scvi.settings.seed = seed
+        models.append(SCVI(adata, n_hidden=32))
+    ensemble = ModelEnsemble(models)
+    ensemble.train(
+        max_epochs=2,
+        check_val_every_n_epoch=1,
+        lr=[1e-3, 2e-3, 0.0],
+        max_kl_weight=[0.5, 1.0, 1.0],
+        vectorize=vectorize,
+        plan_kwargs={"n_epochs_kl_warmup": None},
+    )
+
+    optimizer = ensemble.trainer.optimizers[0]
+    assert [group["lr"] for group in optimizer.param_groups] == [1e-3, 2e-3, 0.0]
+    # members have their own optimizer states
+    first_params = {id(p) for p in optimizer.param_groups[0]["params"]}
+    assert first_params.isdisjoint(id(p) for p in optimizer.param_groups[1]["params"])
+    assert len(ensemble) == 3
+    for model in ensemble:
+        assert model.is_trained_
+        assert "elbo_validation" in model.history
+        assert model.get_latent_representation().shape == (adata.n_obs, 10)
+    # the member with a zero learning rate keeps its initialization
+    scvi.settings.seed = 2
+    initial = SCVI(adata, n_hidden=32)
+    torch.testing.assert_close(
+        ensemble[2].module.z_encoder.encoder.fc_layers[0][0].weight.cpu(),
+        initial.module.z_encoder.encoder.fc_layers[0][0].weight,
+    )
+
+    # members are exported as normal models
+    dir_path = os.path.join(save_path, "ensemble_member")
+    ensemble[1].save(dir_path, overwrite=True)
+    loaded = SCVI.load(dir_path, adata=adata)
+    np.testing.assert_allclose(
+        loaded.get_latent_representation(), ensemble[1].get_latent_representation(), rtol=1e-5
+    )
+
+
+def test_model_ensemble_errors():
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    other = synthetic_iid()
+    SCVI.setup_anndata(other, batch_key="batch")
+    with pytest.raises(ValueError):
+        ModelEnsemble([SCVI(adata), SCVI(other)])
+    with pytest.raises(ValueError):
+        ModelEnsemble([SCVI(adata), SCVI(adata, dropout_rate=0.2)]).train(1, vectorize=True)
+    with pytest.raises(ValueError):
+        ModelEnsemble([SCVI(adata), SCVI(adata)]).train(1, lr=[1e-3])
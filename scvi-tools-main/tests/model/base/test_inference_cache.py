@@ -0,0 +1,77 @@
+import numpy as np
+
+from scvi.data import synthetic_iid
+from scvi.model import SCVI
+
+
+def test_inference_cache():
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata)
+    model.train(1)
+    model.enable_inference_cache()
+    cache = model._inference_cache
+
+    latent = model.get_latent_representation(give_mean=False)
+    latent[:] = 0
+    np.testing.assert_array_equal(latent, 0)
+    cached = model.get_latent_representation(give_mean=False)
+    assert cache.hits == 1
+    assert not np.all(cached == 0)
+    np.testing.assert_array_equal(cached, model.get_latent_representation(give_mean=False))
+
+    indices = np.arange(10)
+    subset = model.get_latent_representation(indices=indices, give_mean=False)
+    assert subset.shape == (10, latent.shape[1])
+    np.testing.assert_array_equal(
+        subset, model.get_latent_representation(indices=list(indices), give_mean=False)
+    )
+    assert cache.misses == 2
+
+    library = model.get_latent_library_size(give_mean=False)
+    np.testing.assert_array_equal(library, model.get_latent_library_size(give_mean=False))
+    expression = model.get_normalized_expression(n_samples=2)
+    assert expression.equals(model.get_normalized_expression(n_samples=2))
+    assert len(cache) == 4
+
+    # training changes the weights and clears the cache
+    model.train(1)
+    assert not np.allclose(cached, model.get_latent_representation(give_mean=False))
+    assert len(cache) == 1
+
+    # loading weights clears the cache as well
+    before = model.get_latent_representation()
+    model.module.load_state_dict(SCVI(adata).module.state_dict())
+    assert not np.allclose(before, model.get_latent_representation())
+
+    model.disable_inference_cache()
+    assert model._inference_cache is None
+    assert not np.array_equal(
+        model.get_latent_representation(give_mean=False),
+        model.get_latent_representation(give_mean=False),
+    )
+
+
+def test_inference_cache_spill(tmp_path):
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata)
+    model = SCVI(adata)
+    model.is_trained_ = True
+    model.module.eval()
+    output_size = adata.n_obs * model.module.n_latent * 4
+    model.enable_inference_cache(max_memory_mb=1.5 * output_size / 1024**2, spill_path=tmp_path)
+    cache = model._inference_cache
+
+    first = model.get_latent_representation(give_mean=False)
+    second = model.get_latent_representation(give_mean=True)
+    assert cache.nbytes == output_size
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # the spilled output is read back and the other one is spilled in turn
+    np.testing.assert_array_equal(first, model.get_latent_representation(give_mean=False))
+    np.testing.assert_array_equal(second, model.get_latent_representation(give_mean=True))
+    assert cache.hits == 2
+    assert len(list(tmp_path.iterdir())) == 1
+
+    model.disable_inference_cache()
+    assert list(tmp_path.iterdir()) == []
@@ -1,13 +1,24 @@
+import os
 from functools import partial
 
 import numpy as np
 import pytest
+import torch
 
 from scvi.data import synthetic_iid
-from scvi.model import SCVI
+from scvi.model import SCVI, TOTALVI
+from scvi.model._utils import (
+    GroupMeans,
+    cite_seq_raw_counts_properties,
+    scatac_raw_counts_properties,
+    scrna_raw_counts_properties,
+)
 from scvi.model.base._de_core import _prepare_obs
 from scvi.model.base._differential import (
     DifferentialComputation,
+    PosteriorSampleCache,
+    _credible_intervals_sorted,
+    credible_intervals,
     estimate_delta,
     estimate_pseudocounts_offset,
 )
@@ -161,3 +172,145 @@ def test_differential_computation(save_path):
     model = SCVI(a)
     model.train(1)
     model.differential_expression(groupby="test", group1="0")
+
+
+@pytest.mark.parametrize("use_path", [False, True])
+def test_differential_sample_cache(save_path, use_path):
+    adata = synthetic_iid(batch_size=50, n_genes=30)
+    SCVI.setup_anndata(adata, batch_key="batch", labels_key="labels")
+    model = SCVI(adata, n_latent=5)
+    model.train(1)
+
+    calls = []
+
+    def model_fn(*args, **kwargs):
+        calls.append(kwargs["transform_batch"])
+        return model.get_normalized_expression(*args, return_numpy=True, **kwargs)
+
+    path = os.path.join(save_path, "de_cache") if use_path else None
+    cache = PosteriorSampleCache(
+        model_fn,
+        adata,
+        n_samples_per_cell=3,
+        path=path,
+        representation_fn=model.get_latent_representation,
+    )
+    dc = DifferentialComputation(
+        model_fn, model.get_latent_representation, model.adata_manager, sample_cache=cache
+    )
+    labels = adata.obs.labels.to_numpy()
+    for label in np.unique(labels):
+        cell_idx1 = labels == label
+        res = dc.get_bayes_factors(cell_idx1, ~cell_idx1, mode="change")
+        assert np.isfinite(res["lfc_mean"]).all()
+    # once per batch category
+    assert calls == ["batch_0", "batch_1"]
+
+    samples = cache.get_samples(np.arange(10), None, 100)
+    assert calls[-1] is None
+    assert samples.shape == (100, adata.n_vars)
+    cached = cache._samples["__observed__"]
+    assert cached.shape == (3, adata.n_obs, adata.n_vars)
+    assert np.isin(samples[:, 0], cached[:, :10, 0]).all()
+    np.testing.assert_allclose(
+        cache.get_representation(np.arange(10)),
+        model.get_latent_representation(indices=np.arange(10)),
+        rtol=1e-5,
+    )
+
+    # only cells of some comparison are cached
+    cache = PosteriorSampleCache(model_fn, adata, indices=np.arange(20))
+    with pytest.raises(ValueError):
+        cache.get_samples(np.arange(30), None, 10)
+
+    de_cached = model.differential_expression(
+        groupby="labels", cache_samples=True, cache_kwargs={"n_samples_per_cell": 2}
+    )
+    de = model.differential_expression(groupby="labels")
+    assert de_cached.shape == de.shape
+    with pytest.raises(ValueError):
+        model.differential_expression(groupby="labels", cache_samples=True, weights="importance")
+
+
+def test_credible_intervals_sorted():
+    samples = np.random.randn(2, 101, 7).astype(np.float32)
+    intervals = _credible_intervals_sorted(torch.from_numpy(samples).sort(dim=1).values, 0.9)
+    for i in range(2):
+        np.testing.assert_array_equal(
+            intervals[i].numpy().T, credible_intervals(samples[i], confidence_level=0.9)
+        )
+
+
+@pytest.mark.parametrize("test_mode", ["two", "three"])
+def test_differential_torch_backend(test_mode):
+    adata = synthetic_iid(batch_size=50, n_genes=30)
+    SCVI.setup_anndata(adata, batch_key="batch", labels_key="labels")
+    model = SCVI(adata, n_latent=5)
+    model.train(1)
+
+    model_fn = partial(model.get_normalized_expression, return_numpy=True)
+    dc = DifferentialComputation(model_fn, model.get_latent_representation, model.adata_manager)
+    labels = adata.obs.labels.to_numpy()
+    comparisons = [(labels == label, labels != label) for label in np.unique(labels)]
+    kwargs = {"test_mode": test_mode, "cred_interval_lvls": [0.5, 0.9], "n_samples_overall": 500}
+
+    for mode in ["vanilla", "change"]:
+        np.random.seed(0)
+        torch.manual_seed(0)
+        expected = [
+            dc.get_bayes_factors(idx1, idx2, mode=mode, **kwargs) for idx1, idx2 in comparisons
+        ]
+        np.random.seed(0)
+        torch.manual_seed(0)
+        # a small budget splits comparisons and genes into several blocks
+        results = dc.get_bayes_factors_batched(comparisons, mode=mode, max_memory_mb=0.1, **kwargs)
+        for res, exp in zip(results, expected, strict=True):
+            assert res.keys() == exp.keys()
+            for key in exp:
+                np.testing.assert_allclose(res[key], exp[key], rtol=1e-5, atol=1e-6)
+
+    with pytest.raises(ValueError):
+        dc.get_bayes_factors(*comparisons[0], backend="torch", change_fn=lambda x, y, z: x - y)
+    de = model.differential_expression(groupby="labels", backend="torch", delta=None)
+    assert de.shape == model.differential_expression(groupby="labels", delta=None).shape
+
+
+@pytest.mark.parametrize("sparse_format", [None, "csr_matrix"])
+def test_raw_counts_properties_group_means(sparse_format):
+    adata = synthetic_iid(batch_size=50, n_genes=30, n_proteins=20, sparse_format=sparse_format)
+    stats_fns = [
+        scrna_raw_counts_properties,
+        partial(scrna_raw_counts_properties, var_idx=np.arange(10)),
+        partial(scatac_raw_counts_properties, var_idx=np.arange(10)),
+    ]
+    if sparse_format is None:
+        TOTALVI.setup_anndata(
+            adata, batch_key="batch", protein_expression_obsm_key="protein_expression"
+        )
+        adata_manager = TOTALVI(adata).adata_manager
+        stats_fns.append(cite_seq_raw_counts_properties)
+    else:
+        SCVI.setup_anndata(adata, batch_key="batch")
+        adata_manager = SCVI(adata).adata_manager
+    labels = adata.obs.labels.astype("category")
+    group_means = GroupMeans(labels.cat.codes.to_numpy())
+
+    for stats_fn in stats_fns:
+        for label in labels.cat.categories[:2]:
+            cell_idx1 = (labels == label).to_numpy()
+            for cell_idx2 in [~cell_idx1, (labels == labels.cat.categories[2]).to_numpy()]:
+                expected = stats_fn(adata_manager, cell_idx1, cell_idx2)
+                grouped = stats_fn(adata_manager, cell_idx1, cell_idx2, group_means=group_means)
+                assert expected.keys() == grouped.keys()
+                for key in expected:
+                    np.testing.assert_allclose(
+                        np.ravel(grouped[key]), np.ravel(expected[key]), rtol=1e-5, atol=1e-8
+                    )
+
+    # populations that are not groups fall back to slicing the data
+    assert not group_means.has_groups(np.arange(10), ~cell_idx1)
+    mixed = np.zeros(adata.n_obs, dtype=bool)
+    mixed[:10] = True
+    expected = scrna_raw_counts_properties(adata_manager, mixed, ~mixed)
+    grouped = scrna_raw_counts_properties(adata_manager, mixed, ~mixed, group_means=group_means)
+    np.testing.assert_allclose(grouped["raw_mean1"], expected["raw_mean1"])
@@ -1293,3 +1293,272 @@ def test_scvi_num_workers():
     model.get_reconstruction_error()
     model.get_normalized_expression(transform_batch="batch_1")
     model.get_normalized_expression(n_samples=2)
+
+
+@pytest.mark.parametrize("suffix", ["", ".zarr", ".h5"])
+def test_scvi_streaming_output(save_path: str, suffix: str):
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata, gene_likelihood="zinb")
+    model.train(max_epochs=1)
+
+    def compare(kwargs, method, name, **output_kwargs):
+        torch.manual_seed(0)
+        expected = getattr(model, method)(**kwargs)
+        torch.manual_seed(0)
+        output_path = os.path.join(save_path, f"streaming_{method}_{name}{suffix}")
+        output = getattr(model, method)(output_path=output_path, **kwargs, **output_kwargs)
+        return expected, output
+
+    kwargs = {"indices": np.arange(150), "batch_size": 32, "return_numpy": True}
+    for name, extra_kwargs in [
+        ("mean", {}),
+        ("samples", {"n_samples": 3, "return_mean": False}),
+        ("averaged", {"n_samples": 3}),
+    ]:
+        expected, output = compare({**kwargs, **extra_kwargs}, "get_normalized_expression", name)
+        assert output.shape == expected.shape
+        np.testing.assert_allclose(output[:], expected, rtol=1e-6)
+
+    expected, output = compare(
+        kwargs, "get_normalized_expression", "float16", output_dtype="float16"
+    )
+    assert output.dtype == np.float16
+    np.testing.assert_allclose(output[:], expected, rtol=1e-2, atol=1e-4)
+
+    with pytest.raises(ValueError):
+        model.get_normalized_expression(n_samples_overall=10, output_path=save_path)
+
+    expected, output = compare(
+        {"n_samples": 2, "give_mean": True, "batch_size": 32}, "get_likelihood_parameters", "lp"
+    )
+    assert set(output) == set(expected) == {"mean", "dispersions", "dropout"}
+    for key, value in expected.items():
+        np.testing.assert_allclose(output[key][:], value, rtol=1e-6)
+
+    expected, output = compare(
+        {"n_samples": 2, "batch_size": 32}, "posterior_predictive_sample", "pps"
+    )
+    assert output.shape == expected.shape == (adata.n_obs, adata.n_vars, 2)
+    np.testing.assert_array_equal(output[:], expected.todense())
+
+
+@pytest.mark.parametrize("n_samples", [1, 3])
+def test_scvi_decode_transform_batches(n_samples: int):
+    adata = synthetic_iid(n_batches=3)
+    adata.obs["cont"] = np.random.default_rng(0).normal(size=adata.n_obs)
+    SCVI.setup_anndata(
+        adata,
+        batch_key="batch",
+        continuous_covariate_keys=["cont"],
+        categorical_covariate_keys=["labels"],
+    )
+    model = SCVI(adata)
+    model.train(max_epochs=1)
+
+    transform_batch = [0, 2]
+    tensors = next(iter(model._make_data_loader(adata, batch_size=32)))
+    inference_outputs, generative_outputs = model._decode_transform_batches(
+        tensors, transform_batch, n_samples=n_samples
+    )
+    generative_inputs = model.module._get_generative_input(tensors, inference_outputs)
+    scale = generative_outputs["px"].scale.unflatten(-2, (len(transform_batch), -1))
+    for i, batch in enumerate(transform_batch):
+        expected = model.module.generative(**generative_inputs, transform_batch=batch)["px"]
+        torch.testing.assert_close(scale[..., i, :, :], expected.scale)
+
+    # the encoder runs once per minibatch for all batches
+    with mock.patch.object(model.module, "inference", wraps=model.module.inference) as inference:
+        exprs = model.get_normalized_expression(
+            transform_batch=["batch_0", "batch_1", "batch_2"],
+            n_samples=n_samples,
+            batch_size=100,
+        )
+    assert inference.call_count == int(np.ceil(adata.n_obs / 100))
+    assert exprs.shape == (adata.n_obs, adata.n_vars)
+
+
+@pytest.mark.parametrize("gene_likelihood", ["zinb", "nb"])
+@pytest.mark.parametrize("n_samples", [1, 2])
+def test_scvi_importance_weights_blocks(gene_likelihood: str, n_samples: int):
+    from scvi.distributions._utils import DistributionConcatenator
+    from scvi.model.base._rnamixin import _anchor_log_likelihoods
+
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata, gene_likelihood=gene_likelihood)
+    model.train(max_epochs=1)
+
+    indices = np.arange(50)
+    qz_store, px_store, zs = DistributionConcatenator(), DistributionConcatenator(), []
+    with torch.inference_mode():
+        for tensors in model._make_data_loader(adata, indices=indices, batch_size=16):
+            inference_outputs, generative_outputs = model.module.forward(
+                tensors, inference_kwargs={"n_samples": n_samples}, compute_loss=False
+            )
+            qz_store.store_distribution(inference_outputs["qz"])
+            px_store.store_distribution(generative_outputs["px"])
+            zs.append(inference_outputs["z"])
+    cell_axis = 0 if n_samples == 1 else 1
+    qz = qz_store.get_concatenated_distributions(axis=0)
+    px = px_store.get_concatenated_distributions(axis=cell_axis)
+    zs = torch.cat(zs, dim=cell_axis)
+
+    @torch.inference_mode()
+    def weights(max_block_memory_mb):
+        torch.manual_seed(0)
+        return model._get_importance_weights(
+            adata,
+            indices,
+            qz=qz,
+            px=px,
+            zs=zs,
+            max_cells=20,
+            n_mc_samples=10,
+            n_mc_samples_per_pass=10,
+            max_block_memory_mb=max_block_memory_mb,
+        )
+
+    np.random.seed(0)
+    one_anchor_per_block = weights(1e-6)
+    np.random.seed(0)
+    all_anchors = weights(512)
+    assert one_anchor_per_block.shape == (len(indices) * n_samples,)
+    np.testing.assert_allclose(one_anchor_per_block.sum(), 1, rtol=1e-5)
+    np.testing.assert_allclose(one_anchor_per_block, all_anchors, rtol=1e-4)
+
+    # likelihoods of a block match evaluating each anchor separately
+    x = torch.as_tensor(adata.X[:5])
+    x[0] = 0
+    block = _anchor_log_likelihoods(px, x)
+    assert block.shape == (*px.scale.shape[:-1], 5)
+    for i in range(5):
+        px.mu = px.scale * x[i].sum(-1)
+        expected = px.log_prob(x[i : i + 1]).sum(-1)
+        torch.testing.assert_close(block[..., i], expected, rtol=1e-5, atol=1e-3)
+
+
+def test_scvi_feature_correlation_streaming():
+    from scipy.stats import spearmanr
+
+    from scvi.model.base._feature_correlation import FeatureCorrelation, top_k_correlations
+
+    rng = np.random.default_rng(0)
+    data = rng.gamma(2.0, size=(500, 20)) @ rng.normal(size=(20, 20))
+    data[:, 3] = data[:, 3].round()  # ties
+
+    pearson = FeatureCorrelation(20, "pearson")
+    spearman = FeatureCorrelation(20, "spearman", reference=data)
+    for batch in np.array_split(data, 7):
+        pearson.update(batch)
+        spearman.update(batch)
+    np.testing.assert_allclose(pearson.correlation(), np.corrcoef(data, rowvar=False), atol=1e-10)
+    np.testing.assert_allclose(spearman.correlation(), spearmanr(data)[0], atol=1e-10)
+    np.testing.assert_allclose(pearson.correlation(slice(5, 8)), pearson.correlation()[5:8])
+
+    # ranks among a subset of the observations approximate the Spearman correlation
+    approximate = FeatureCorrelation(20, "spearman", reference=data[::5])
+    approximate.update(data)
+    np.testing.assert_allclose(approximate.correlation(), spearmanr(data)[0], atol=0.05)
+
+    top = top_k_correlations([pearson, spearman], k=3, block_size=6).toarray()
+    mean = (pearson.correlation() + spearman.correlation()) / 2
+    assert (np.count_nonzero(top, axis=1) == 3).all()
+    assert (np.diag(top) == 0).all()
+    for i in range(20):
+        others = np.delete(np.abs(mean[i]), i)
+        np.testing.assert_allclose(
+            np.sort(np.abs(top[i][top[i] != 0])), np.sort(others)[-3:], atol=1e-12
+        )
+
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata)
+    model.train(1)
+    scvi.settings.seed = 0
+    corr = model.get_feature_correlation_matrix(
+        correlation_type="spearman", n_samples=2, rank_reference_size=100
+    )
+    assert corr.shape == (adata.n_vars, adata.n_vars)
+    np.testing.assert_allclose(np.diag(corr), 1)
+    corr = model.get_feature_correlation_matrix(
+        correlation_type="pearson", n_samples=2, transform_batch=["batch_0", "batch_1"], top_k=5
+    )
+    assert corr.shape == (adata.n_vars, adata.n_vars)
+    assert (corr.sparse.to_coo().tocsr().getnnz(axis=1) == 5).all()
+
+
+def test_scvi_covariate_embeddings(save_path: str):
+    adata = synthetic_iid()
+    SCVI.setup_anndata(adata, batch_key="batch", categorical_covariate_keys=["labels"])
+    scvi.settings.seed = 0
+    model = SCVI(adata)
+    scvi.settings.seed = 0
+    embedding_model = SCVI(
+        adata,
+        extra_encoder_kwargs={"covariate_injection": "embedding"},
+        extra_decoder_kwargs={"covariate_injection": "embedding"},
+    )
+    scvi.settings.seed = 0
+    elbo = model.get_elbo()
+    scvi.settings.seed = 0
+    np.testing.assert_allclose(embedding_model.get_elbo(), elbo, rtol=1e-5)
+
+    embedding_model.train(1)
+    dir_path = os.path.join(save_path, "saved_model/")
+    embedding_model.save(dir_path, overwrite=True)
+    loaded_model = SCVI.load(dir_path, adata=adata)
+    np.testing.assert_allclose(
+        loaded_model.get_latent_representation(),
+        embedding_model.get_latent_representation(),
+    )
+
+    # reference models with embeddings are extended to new batches
+    query = synthetic_iid()
+    query.obs["batch"] = query.obs.batch.cat.rename_categories(["batch_2", "batch_3"])
+    query_model = SCVI.load_query_data(query, dir_path)
+    embeddings = query_model.module.decoder.px_decoder.covariate_embeddings["Layer 0"]
+    assert embeddings[0].num_embeddings == 4
+    assert embeddings[0].weight.requires_grad
+    query_model.train(max_epochs=1, plan_kwargs={"weight_decay": 0.0})
+    np.testing.assert_equal(
+        query_model.module.decoder.px_decoder.fc_layers[0][0].weight.detach().cpu().numpy(),
+        embedding_model.module.decoder.px_decoder.fc_layers[0][0].weight.detach().cpu().numpy(),
+    )
+
+
+@pytest.mark.parametrize(
+    ("gene_likelihood", "kernel"),
+    [("nb", "log_nb_positive_sparse"), ("zinb", "log_zinb_positive_sparse")],
+)
+def test_scvi_train_sparse_likelihood(gene_likelihood: str, kernel: str):
+    from scvi import REGISTRY_KEYS
+    from scvi.distributions import _negative_binomial
+
+    adata = synthetic_iid(sparse_format="csr_matrix")
+    SCVI.setup_anndata(adata, batch_key="batch")
+    model = SCVI(adata, gene_likelihood=gene_likelihood)
+
+    # minibatches keep their sparse counts for the likelihood
+    with mock.patch.object(
+        _negative_binomial, kernel, wraps=getattr(_negative_binomial, kernel)
+    ) as sparse_kernel:
+        model.train(max_epochs=1, load_sparse_tensor=True, check_val_every_n_epoch=1)
+    n_batches = -(-len(model.train_indices) // 128) + -(-len(model.validation_indices) // 128)
+    assert sparse_kernel.call_count == n_batches
+    assert np.isfinite(model.history["elbo_validation"].to_numpy(dtype=float)).all()
+
+    # and evaluate the same loss as dense minibatches
+    splitter = scvi.dataloaders.DataSplitter(
+        model.adata_manager, train_size=1.0, batch_size=64, load_sparse_tensor=True
+    )
+    splitter.setup()
+    batch = splitter.on_after_batch_transfer(next(iter(splitter.train_dataloader())), 0)
+    assert batch[REGISTRY_KEYS.X_SPARSE_KEY].layout is torch.sparse_csr
+    model.module.eval()
+    scvi.settings.seed = 0
+    sparse_loss = model.module(batch)[2].reconstruction_loss_sum
+    del batch[REGISTRY_KEYS.X_SPARSE_KEY]
+    scvi.settings.seed = 0
+    dense_loss = model.module(batch)[2].reconstruction_loss_sum
+    torch.testing.assert_close(sparse_loss, dense_loss)
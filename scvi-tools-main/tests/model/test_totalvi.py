@@ -250,6 +250,26 @@ def test_totalvi(save_path):
     model.differential_expression(groupby="labels")
 
 
+def test_totalvi_marginal_ll():
+    adata = synthetic_iid()
+    TOTALVI.setup_anndata(
+        adata,
+        batch_key="batch",
+        protein_expression_obsm_key="protein_expression",
+        protein_names_uns_key="protein_names",
+    )
+    model = TOTALVI(adata)
+    model.train(1, train_size=0.5, reduce_lr_on_plateau=False)
+
+    marginal_ll = model.get_marginal_ll(
+        indices=model.validation_indices, n_mc_samples=3, return_mean=False
+    )
+    assert marginal_ll.shape == (len(model.validation_indices),)
+    assert torch.isfinite(marginal_ll).all()
+    mean_marginal_ll = model.get_marginal_ll(n_mc_samples=3)
+    assert np.isfinite(mean_marginal_ll)
+
+
 def test_totalvi_model_library_size(save_path):
     adata = synthetic_iid()
     TOTALVI.setup_anndata(
@@ -0,0 +1,79 @@
+import pytest
+import torch
+
+from scvi.nn import FCLayers
+
+
+def _fc_layers(covariate_injection: str, inject_covariates: bool = True) -> FCLayers:
+    torch.manual_seed(0)
+    layers = FCLayers(
+        10,
+        8,
+        n_cat_list=[3, 1, 5],
+        n_layers=2,
+        inject_covariates=inject_covariates,
+        covariate_injection=covariate_injection,
+    )
+    return layers.eval()
+
+
+@pytest.mark.parametrize("inject_covariates", [True, False])
+def test_fc_layers_covariate_embeddings(inject_covariates: bool):
+    concat = _fc_layers("concat", inject_covariates)
+    concat_state = torch.random.get_rng_state()
+    embedding = _fc_layers("embedding", inject_covariates)
+    # both modes draw the same initialization
+    assert torch.equal(concat_state, torch.random.get_rng_state())
+    assert embedding.fc_layers[0][0].in_features == 10
+    assert len(embedding.covariate_embeddings) == (2 if inject_covariates else 1)
+
+    x = torch.randn(4, 10)
+    cats = [
+        torch.randint(3, (4, 1)),
+        torch.zeros(4, 1, dtype=torch.long),
+        torch.randint(5, (4, 1)),
+    ]
+    torch.testing.assert_close(embedding(x, *cats), concat(x, *cats))
+    x_3d = torch.randn(2, 4, 10)
+    torch.testing.assert_close(embedding(x_3d, *cats), concat(x_3d, *cats))
+    one_hot_cats = [torch.nn.functional.one_hot(cats[0].squeeze(-1), 3), cats[1], cats[2]]
+    torch.testing.assert_close(embedding(x, *one_hot_cats), concat(x, *cats))
+
+    # weights saved in either mode are converted on load
+    converted = FCLayers(
+        10,
+        8,
+        n_cat_list=[3, 1, 5],
+        n_layers=2,
+        inject_covariates=inject_covariates,
+        covariate_injection="embedding",
+    ).eval()
+    converted.load_state_dict(concat.state_dict())
+    torch.testing.assert_close(converted(x, *cats), concat(x, *cats))
+    converted = FCLayers(
+        10, 8, n_cat_list=[3, 1, 5], n_layers=2, inject_covariates=inject_covariates
+    ).eval()
+    converted.load_state_dict(embedding.eval().state_dict())
+    torch.testing.assert_close(converted(x, *cats), concat(x, *cats))
+
+    # the batch norm of three-dimensional inputs normalizes all samples together
+    embedding.train()
+    torch.manual_seed(0)
+    output = embedding(x_3d, *cats)
+    torch.manual_seed(0)
+    flat_output = embedding(x_3d.reshape(8, 10), *(torch.cat([cat, cat]) for cat in cats))
+    torch.testing.assert_close(output.reshape(8, 8), flat_output)
+
+
+def test_fc_layers_covariate_embeddings_online_update():
+    layers = _fc_layers("embedding")
+    layers.set_online_update_hooks()
+    cats = [torch.randint(3, (4, 1)), None, torch.randint(5, (4, 1))]
+    layers(torch.randn(4, 10), *cats).sum().backward()
+    for i in range(2):
+        assert (layers.fc_layers[i][0].weight.grad == 0).all()
+        assert (layers.fc_layers[i][0].bias.grad == 0).all()
+    assert layers.covariate_embeddings["Layer 0"][0].weight.grad.abs().sum() > 0
+
+    with pytest.raises(ValueError):
+        FCLayers(10, 8, covariate_injection="one_hot")
@@ -83,3 +83,70 @@ def test_savecheckpoint(save_path: str, load_best_on_end: bool):
     test_model_cls(scvi.model.SCANVI, adata)
 
     scvi.settings.logging_dir = old_logging_dir
+
+
+@pytest.mark.parametrize("load_best_on_end", [True, False])
+def test_async_checkpoint(save_path: str, load_best_on_end: bool):
+    import numpy as np
+    import torch
+
+    from scvi.train import AsyncCheckpoint
+
+    adata = scvi.data.synthetic_iid()
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    model = scvi.model.SCVI(adata)
+    dirpath = os.path.join(save_path, "async_checkpoint")
+    callback = AsyncCheckpoint(
+        dirpath=dirpath, monitor="elbo_validation", load_best_on_end=load_best_on_end
+    )
+    model.train(max_epochs=5, callbacks=[callback])
+
+    elbo_validation = model.history["elbo_validation"].to_numpy(dtype=float)
+    np.testing.assert_allclose(callback.best_model_score, elbo_validation.min())
+    assert callback.best_model_path == dirpath
+
+    best_model = scvi.model.SCVI.load(dirpath, adata=adata)
+    assert best_model.is_trained_
+    if load_best_on_end or elbo_validation.argmin() == len(elbo_validation) - 1:
+        best_state_dict = best_model.module.state_dict()
+        for key, value in model.module.state_dict().items():
+            assert torch.equal(value, best_state_dict[key])
+
+
+def test_async_checkpoint_slow_writes(save_path: str):
+    import threading
+
+    import torch
+
+    from scvi.train import AsyncCheckpoint
+
+    class SlowAsyncCheckpoint(AsyncCheckpoint):
+        """Writes wait until released, as on a slow filesystem."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.release_writes = threading.Event()
+
+        def _write(self, *args, **kwargs):
+            self.release_writes.wait()
+            super()._write(*args, **kwargs)
+
+        def on_train_end(self, trainer, pl_module):
+            self.release_writes.set()
+            super().on_train_end(trainer, pl_module)
+
+    adata = scvi.data.synthetic_iid()
+    scvi.model.SCVI.setup_anndata(adata, batch_key="batch")
+    model = scvi.model.SCVI(adata)
+    dirpath = os.path.join(save_path, "slow_async_checkpoint")
+    # the monitored training metric improves every epoch
+    callback = SlowAsyncCheckpoint(
+        dirpath=dirpath, monitor="elbo_train", max_queue_size=1, load_best_on_end=True
+    )
+    model.train(max_epochs=6, check_val_every_n_epoch=1, callbacks=[callback])
+
+    # superseded states are dropped instead of blocking training
+    assert callback.n_dropped_writes > 0
+    best_model = scvi.model.SCVI.load(dirpath, adata=adata)
+    for key, value in model.module.state_dict().items():
+        assert torch.equal(value, best_model.module.state_dict()[key])
@@ -1,4 +1,6 @@
+import numpy as np
 import pytest
+import torch
 
 import scvi
 from scvi.data import synthetic_iid
@@ -92,3 +94,48 @@ def test_semisupervisedtrainingplan_metrics():
             METRIC_KEYS.CLASSIFICATION_LOSS_KEY,
         ]:
             assert f"{mode}_{metric}" in model.history_
+
+
+def test_trainingplan_precision():
+    adata = synthetic_iid()
+    adata.obs["cov"] = adata.obs["labels"]
+    SCVI.setup_anndata(adata, batch_key="batch", categorical_covariate_keys=["cov"])
+    model = SCVI(adata)
+    batch = next(iter(model._make_data_loader(adata, batch_size=128)))
+
+    with pytest.raises(ValueError):
+        TrainingPlan(model.module, autocast_dtype="float16")
+
+    plan = TrainingPlan(model.module, autocast_dtype="bfloat16")
+    inference_outputs, _, loss_output = plan.forward(batch)
+    assert inference_outputs["qz"].loc.dtype == torch.bfloat16
+    # likelihoods and KL divergences are computed in float32
+    assert loss_output.reconstruction_loss_sum.dtype == torch.float32
+    assert loss_output.kl_local_sum.dtype == torch.float32
+    assert loss_output.loss.dtype == torch.float32
+
+    model.train(max_epochs=2, autocast_dtype="bfloat16", check_val_every_n_epoch=1)
+    assert np.isfinite(model.history["elbo_train"].to_numpy(dtype=float)).all()
+    assert np.isfinite(model.history["elbo_validation"].to_numpy(dtype=float)).all()
+    assert next(model.module.parameters()).dtype == torch.float32
+
+    scanvi = scvi.model.SCANVI.from_scvi_model(
+        model, labels_key="labels", unlabeled_category="label_0"
+    )
+    scanvi.train(max_epochs=1, autocast_dtype="bfloat16")
+    assert np.isfinite(scanvi.history["elbo_train"].to_numpy(dtype=float)).all()
+
+    # the precision of the trainer is still passed to Lightning
+    model.train(max_epochs=1, precision="64-true")
+    assert model.trainer.precision == "64-true"
+
+
+def test_trainingplan_compile_graph_breaks():
+    adata = synthetic_iid()
+    adata.obs["cov"] = adata.obs["labels"]
+    SCVI.setup_anndata(adata, batch_key="batch", categorical_covariate_keys=["cov"])
+    model = SCVI(adata, use_observed_lib_size=False, deeply_inject_covariates=True)
+    batch = next(iter(model._make_data_loader(adata, batch_size=128)))
+
+    explanation = torch._dynamo.explain(lambda tensors: model.module(tensors)[2].loss)(batch)
+    assert explanation.graph_break_count == 0